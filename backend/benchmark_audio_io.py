@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Event-loop stall benchmark for voice audio I/O.
+
+Compares the old synchronous temp-file round trip (write, read back, unlink on
+the event loop) against the real transcribe_audio_whisper and synthesize_speech,
+with the Emergent provider stubbed in both of its shapes: file object / bytes
+(in memory) and file path (tmpfs). A ticker coroutine measures how late the
+loop wakes up while N concurrent "calls" move audio buffers around.
+
+Usage: python benchmark_audio_io.py [--calls 200] [--size-kb 512]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from server import AUDIO_TMP_DIR, synthesize_speech, transcribe_audio_whisper  # noqa: E402
+
+TICK_SECONDS = 0.001
+
+async def measure_stalls(stop: asyncio.Event) -> list:
+    """Record how far past its deadline each 1 ms tick wakes up"""
+    stalls = []
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        stalls.append(max(0.0, time.perf_counter() - expected))
+    return stalls
+
+TRANSCRIPT = "Ich möchte einen Termin am Montag."
+
+def stub_provider(audio_bytes: bytes, paths: bool):
+    """Install a fake emergentintegrations.llm.openai; paths=True mimics the file-path API.
+
+    The stubs only stand in for the network call (one loop yield); their own
+    file access runs in a thread so the stalls measured are the server's.
+    """
+    if paths:
+        async def transcribe_audio(emergent_api_key, audio_file_path):
+            await asyncio.sleep(0)
+            return TRANSCRIPT
+
+        async def text_to_speech(emergent_api_key, text, output_file_path, voice):
+            await asyncio.sleep(0)
+            await asyncio.to_thread(Path(output_file_path).write_bytes, audio_bytes)
+    else:
+        async def transcribe_audio(emergent_api_key, audio_file):
+            await asyncio.sleep(0)
+            return TRANSCRIPT
+
+        async def text_to_speech(emergent_api_key, text, voice):
+            await asyncio.sleep(0)
+            return audio_bytes
+
+    openai = types.ModuleType("emergentintegrations.llm.openai")
+    openai.transcribe_audio = transcribe_audio
+    openai.text_to_speech = text_to_speech
+    sys.modules["emergentintegrations"] = types.ModuleType("emergentintegrations")
+    sys.modules["emergentintegrations.llm"] = types.ModuleType("emergentintegrations.llm")
+    sys.modules["emergentintegrations.llm.openai"] = openai
+
+async def legacy_round_trip(audio_bytes: bytes):
+    """Baseline: blocking NamedTemporaryFile round trips on the loop thread (upload, then TTS read-back)"""
+    for suffix in (".webm", ".mp3"):
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            f.write(audio_bytes)
+            temp_path = f.name
+        await asyncio.sleep(0)  # provider call
+        with open(temp_path, "rb") as f:
+            f.read()
+        os.unlink(temp_path)
+
+async def server_round_trip(audio_bytes: bytes):
+    """The server's own STT upload and TTS download against the stubbed provider"""
+    if await transcribe_audio_whisper(audio_bytes) != TRANSCRIPT:
+        raise RuntimeError("transcription failed, see server log")
+    if len(await synthesize_speech(TRANSCRIPT)) != len(audio_bytes):
+        raise RuntimeError("synthesis returned unexpected audio")
+
+async def run_scenario(name: str, round_trip, calls: int, audio_bytes: bytes):
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_stalls(stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(round_trip(audio_bytes) for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    stalls = sorted(await ticker)
+    p99 = stalls[int(len(stalls) * 0.99) - 1] if stalls else 0.0
+    print(f"{name:<14} total={elapsed * 1000:8.1f} ms  "
+          f"max_stall={max(stalls, default=0) * 1000:7.2f} ms  p99_stall={p99 * 1000:6.2f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    audio_bytes = os.urandom(args.size_kb * 1024)
+    print(f"{args.calls} concurrent calls, {args.size_kb} KB audio, tmp dir: {AUDIO_TMP_DIR or tempfile.gettempdir()}")
+    await run_scenario("before (sync)", legacy_round_trip, args.calls, audio_bytes)
+    stub_provider(audio_bytes, paths=False)
+    await run_scenario("after (memory)", server_round_trip, args.calls, audio_bytes)
+    stub_provider(audio_bytes, paths=True)
+    await run_scenario("after (tmpfs)", server_round_trip, args.calls, audio_bytes)
+
+if __name__ == "__main__":
+    asyncio.run(main())
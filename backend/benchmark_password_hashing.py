@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Voice latency during a login storm.
+
+Simulated voice turns (short awaits plus a little CPU, like the real handler
+between provider calls) run continuously while a burst of logins verifies
+bcrypt passwords, first inline on the event loop (the old behavior) and then
+through verify_password_async. Prints p50/p99/max voice-turn latency for
+each mode next to an idle baseline.
+
+Usage: python benchmark_password_hashing.py [--logins 50] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from server import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, get_password_hash, verify_password, verify_password_async  # noqa: E402
+
+VOICE_CONCURRENCY = 20
+
+async def voice_turn() -> float:
+    started = time.perf_counter()
+    await asyncio.sleep(0.02)  # provider round trip
+    sum(range(2000))  # response handling
+    await asyncio.sleep(0.01)  # database write
+    return time.perf_counter() - started
+
+async def voice_load(stop: asyncio.Event, latencies: list):
+    async def worker():
+        while not stop.is_set():
+            latencies.append(await voice_turn())
+    await asyncio.gather(*(worker() for _ in range(VOICE_CONCURRENCY)))
+
+async def blocking_login(password: str, hashed: str):
+    verify_password(password, hashed)
+
+async def offloaded_login(password: str, hashed: str):
+    await verify_password_async(password, hashed)
+
+async def run_scenario(name: str, login, logins: int, duration: float, hashed: str):
+    stop = asyncio.Event()
+    latencies = []
+    load = asyncio.create_task(voice_load(stop, latencies))
+    await asyncio.sleep(0.1)  # let voice turns get going before the storm
+
+    if login is not None:
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            await asyncio.gather(*(login("secret-password", hashed) for _ in range(logins)))
+    else:
+        await asyncio.sleep(duration)
+
+    stop.set()
+    await load
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<22} turns={len(latencies):6d}  p50={statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p99={p99 * 1000:7.1f} ms  max={latencies[-1] * 1000:7.1f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50, help="concurrent logins per burst")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    args = parser.parse_args()
+
+    hashed = get_password_hash("secret-password")
+    print(f"bcrypt rounds={BCRYPT_ROUNDS}, hash workers={PASSWORD_HASH_WORKERS}, "
+          f"{VOICE_CONCURRENCY} concurrent voice turns, {args.logins} logins per burst")
+    await run_scenario("idle (no logins)", None, args.logins, args.duration, hashed)
+    await run_scenario("before (inline bcrypt)", blocking_login, args.logins, args.duration, hashed)
+    await run_scenario("after (thread pool)", offloaded_login, args.logins, args.duration, hashed)
+
+if __name__ == "__main__":
+    asyncio.run(main())
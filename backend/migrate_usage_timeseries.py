@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Backfill usage_records into the usage time-series collection.
+
+Creates the time-series collection (tenant_id as metaField, datetime
+timestamps) and copies every usage record into it in batches, converting the
+ISO string timestamps. Afterwards set USAGE_TIMESERIES=true in backend/.env and
+restart the backend, then run once more with --catch-up to copy records written
+in between. usage_records is left untouched, so switching back is just unsetting
+the flag (and running POST /api/admin/usage-rollups/rebuild if needed).
+
+Requires MongoDB 5.0+. Reads MONGO_URL / DB_NAME from backend/.env like the server.
+
+Usage: python migrate_usage_timeseries.py [--batch-size 1000] [--drop | --catch-up]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from server import USAGE_TIMESERIES_COLLECTION, client, db, ensure_usage_timeseries_collection  # noqa: E402
+
+def to_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+async def latest_migrated(target):
+    """Start of the second of the newest migrated record, and the ids already migrated from that second on"""
+    latest = await target.find_one({}, {"timestamp": 1}, sort=[("timestamp", -1)])
+    if not latest:
+        return None, set()
+    since = to_datetime(latest["timestamp"]).replace(microsecond=0)
+    ids = await target.distinct("id", {"timestamp": {"$gte": since}})
+    return since, set(ids)
+
+async def migrate(batch_size: int, drop: bool, catch_up: bool) -> int:
+    target = db[USAGE_TIMESERIES_COLLECTION]
+    exists = USAGE_TIMESERIES_COLLECTION in await db.list_collection_names(filter={"name": USAGE_TIMESERIES_COLLECTION})
+
+    if drop and exists:
+        await target.drop()
+        exists = False
+    if exists and not catch_up and await target.find_one({}, {"_id": 1}):
+        print(f"{USAGE_TIMESERIES_COLLECTION} already contains records; use --catch-up to copy newer ones or --drop to start over")
+        return 1
+    await ensure_usage_timeseries_collection()
+
+    query, skip_ids = {}, set()
+    if catch_up:
+        since, skip_ids = await latest_migrated(target)
+        if since:
+            # Compare on whole seconds: stored strings keep microseconds, datetimes only milliseconds
+            query = {"timestamp": {"$gte": since.isoformat()[:19]}}
+
+    total = await db.usage_records.count_documents(query)
+    print(f"Copying {total} usage records into {USAGE_TIMESERIES_COLLECTION}")
+
+    started = time.monotonic()
+    copied = 0
+    batch = []
+    cursor = db.usage_records.find(query, {"_id": 0}).sort("timestamp", 1).batch_size(batch_size)
+    async for record in cursor:
+        if record.get("id") in skip_ids:
+            continue
+        record["timestamp"] = to_datetime(record["timestamp"])
+        batch.append(record)
+        if len(batch) >= batch_size:
+            await target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+            print(f"  {copied}/{total}", end="\r", flush=True)
+    if batch:
+        await target.insert_many(batch, ordered=False)
+        copied += len(batch)
+
+    source_count = await db.usage_records.count_documents({})
+    target_count = await target.count_documents({})
+    print(f"Copied {copied} records in {time.monotonic() - started:.1f} s "
+          f"(usage_records: {source_count}, {USAGE_TIMESERIES_COLLECTION}: {target_count})")
+    if not catch_up:
+        print("Set USAGE_TIMESERIES=true in backend/.env, restart the backend, then run again with --catch-up")
+    return 0
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--drop", action="store_true", help="drop and recreate the time-series collection first")
+    mode.add_argument("--catch-up", action="store_true", help="copy only records newer than the last migrated one")
+    args = parser.parse_args()
+
+    try:
+        return await migrate(args.batch_size, args.drop, args.catch_up)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,38 +1,344 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status, Request, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Header, Query, status, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import httpx
 import io
+import re
+import inspect
+import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import random
+import importlib.util
+import time
+import hashlib
+import hmac
+import unicodedata
+from collections import OrderedDict
+import bisect
+import ipaddress
+import struct
+import threading
+import sys
+import sysconfig
+import traceback
+from collections import deque
+from contextlib import aclosing, contextmanager
+import json
+import csv
+import asyncio
 import base64
 from enum import Enum
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# ============= METRICS =============
+# In-process Prometheus-style collectors, exposed as text on /api/metrics.
+# Recording is a dict lookup plus a few additions under a lock (a few microseconds).
+
+# Bearer token for /api/metrics; without it the endpoint refuses every scrape
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Event loop lag is sampled at this interval whether or not the watchdog runs
+LOOP_LAG_SAMPLE_SECONDS = 0.5
+# Report code that keeps the event loop from running for longer than this (0 disables the watchdog)
+LOOP_BLOCK_THRESHOLD_SECONDS = float(os.environ.get('LOOP_BLOCK_THRESHOLD_SECONDS', '0.25'))
+LOOP_BLOCK_STACK_DEPTH = 15
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict = {}
+        self._lock = threading.Lock()  # pymongo reports command events from its worker threads
+        METRICS_REGISTRY.append(self)
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{format_labels(self.labels, key)} {value}" for key, value in values]
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+    
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+METRICS_REGISTRY: List[Metric] = []
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "endpoint", "status"))
+VOICE_STAGE_SECONDS = Histogram("voice_stage_duration_seconds", "Voice pipeline stage latency", ("stage",))
+MONGO_COMMAND_SECONDS = Histogram("mongodb_command_duration_seconds", "MongoDB command latency by collection", ("command", "collection"))
+MONGO_COMMAND_FAILURES = Counter("mongodb_command_failures_total", "Failed MongoDB commands", ("command", "collection"))
+PROVIDER_ERRORS = Counter("provider_errors_total", "Errors from external providers", ("provider",))
+EVENT_LOOP_LAG_SECONDS = Histogram("event_loop_lag_seconds", "Delay of event loop wake-ups past their deadline",
+                                   buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+USAGE_BUFFER_PENDING = Gauge("usage_buffer_pending_records", "Usage records waiting to be written")
+EVENT_LOOP_LAG_MAX = Gauge("event_loop_lag_max_seconds", "Largest event loop lag in the last sampling window")
+EVENT_LOOP_BLOCKS = Counter("event_loop_blocked_total", "Event loop stalls past the watchdog threshold by blocking code location", ("location",))
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times MongoDB commands per collection from pymongo's command monitoring events"""
+    
+    def __init__(self):
+        self._inflight: dict = {}
+    
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):  # getMore carries the cursor id, the collection is a separate field
+            target = event.command.get("collection", "")
+        collection = target if isinstance(target, str) else ""
+        self._inflight[(event.connection_id, event.request_id)] = collection
+    
+    def succeeded(self, event):
+        collection = self._inflight.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+    
+    def failed(self, event):
+        collection = self._inflight.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name, collection=collection)
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request, labelled by route template rather than raw path"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status_code = [500]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                endpoint=getattr(route, "path", "unmatched"),
+                status=str(status_code[0])
+            )
+
+LIBRARY_PATHS = tuple({sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+def blocking_location(stack: traceback.StackSummary) -> str:
+    """Innermost frame outside the standard library and installed packages, i.e. our own blocking call site"""
+    for frame in reversed(stack):
+        if not frame.filename.startswith(LIBRARY_PATHS):
+            return f"{Path(frame.filename).name}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{Path(frame.filename).name}:{frame.lineno} {frame.name}"
+
+async def run_loop_lag_monitor(interval: float = LOOP_LAG_SAMPLE_SECONDS):
+    """Record how late each wake-up of the event loop is, and the largest lag per 10s window"""
+    window_max, window_started = 0.0, time.monotonic()
+    while True:
+        expected = time.monotonic() + interval
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        lag = max(0.0, now - expected)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        window_max = max(window_max, lag)
+        if now - window_started >= 10:
+            EVENT_LOOP_LAG_MAX.set(window_max)
+            window_max, window_started = 0.0, now
+
+class LoopWatchdog:
+    """Captures the stack of code that blocks the event loop.
+    
+    A heartbeat task on the loop marks each wake-up; a daemon thread
+    checks the heartbeat and, once the loop has not run for longer than the threshold,
+    snapshots the loop thread's stack while the blocking call is still on it.
+    Also usable in tests: ``async with LoopWatchdog(0.05) as watchdog: ...``.
+    """
+    
+    def __init__(self, threshold: float = LOOP_BLOCK_THRESHOLD_SECONDS):
+        self.threshold = threshold
+        self.interval = min(0.5, threshold / 2)
+        self.blocks: deque = deque(maxlen=100)
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+    
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+    
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+    
+    async def __aenter__(self):
+        self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self._beat = time.monotonic()
+    
+    def _watch(self):
+        reported_beat = None
+        while not self._stopped.wait(self.interval / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled > self.threshold and beat != reported_beat:
+                reported_beat = beat  # one report per stall
+                self._report(stalled)
+    
+    def _report(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame, limit=LOOP_BLOCK_STACK_DEPTH)
+        location = blocking_location(stack)
+        formatted = "".join(stack.format())
+        self.blocks.append({"location": location, "stalled_seconds": stalled, "stack": formatted})
+        EVENT_LOOP_BLOCKS.inc(location=location)
+        logger.warning(f"Event loop blocked at {location} for at least {stalled * 1000:.0f} ms\n{formatted}")
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS_REGISTRY for line in metric.render()) + "\n"
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ['DB_NAME']]
 
+# Usage records: a plain collection with ISO string timestamps, or (opt-in, MongoDB 5.0+) a
+# time-series collection with tenant_id as metaField and datetime timestamps.
+# Switch with backend/migrate_usage_timeseries.py.
+USAGE_TIMESERIES = os.environ.get('USAGE_TIMESERIES', '').lower() in ('1', 'true', 'yes')
+USAGE_TIMESERIES_COLLECTION = os.environ.get('USAGE_TIMESERIES_COLLECTION', 'usage_series')
+usage_collection = db[USAGE_TIMESERIES_COLLECTION if USAGE_TIMESERIES else 'usage_records']
+USAGE_BUFFER_MAX_RECORDS = int(os.environ.get('USAGE_BUFFER_MAX_RECORDS', '500'))
+USAGE_BUFFER_MAX_DELAY_SECONDS = float(os.environ.get('USAGE_BUFFER_MAX_DELAY_SECONDS', '1.0'))
+METERING_RESERVE_SECONDS = int(os.environ.get('METERING_RESERVE_SECONDS', '120'))
+# Reservations not settled within the lease (crash, deploy, lost client) are returned by the sweeper
+METERING_LEASE_SECONDS = int(os.environ.get('METERING_LEASE_SECONDS', '900'))
+METERING_SWEEP_SECONDS = int(os.environ.get('METERING_SWEEP_SECONDS', '60'))
+
 # Security
 SECRET_KEY = os.environ['SECRET_KEY']
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+TENANT_CACHE_TTL_SECONDS = float(os.environ.get('TENANT_CACHE_TTL_SECONDS', '30'))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '10000'))
+PLATFORM_STATS_RECONCILE_SECONDS = float(os.environ.get('PLATFORM_STATS_RECONCILE_SECONDS', '3600'))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_BYTES = 64 * 1024
+QUERY_FANOUT_LIMIT = int(os.environ.get('QUERY_FANOUT_LIMIT', '8'))
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+LOGIN_MAX_FAILURES = int(os.environ.get('LOGIN_MAX_FAILURES', '5'))  # per account and client IP
+LOGIN_MAX_FAILURES_PER_IP = int(os.environ.get('LOGIN_MAX_FAILURES_PER_IP', '100'))
+LOGIN_THROTTLE_SECONDS = float(os.environ.get('LOGIN_THROTTLE_SECONDS', '900'))
+# Peers whose X-Forwarded-For is trusted (ingress / reverse proxy); defaults to loopback and private networks
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip())
+    for network in os.environ.get('TRUSTED_PROXIES', '127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16').split(',')
+    if network.strip()
+]
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 security = HTTPBearer()
 
 # API Keys
@@ -42,6 +348,22 @@ TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN', '')
 TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER', '')
 SIPGATE_API_TOKEN = os.environ.get('SIPGATE_API_TOKEN', '')
 LEXOFFICE_API_KEY = os.environ.get('LEXOFFICE_API_KEY', '')
+LEXOFFICE_BASE_URL = os.environ.get('LEXOFFICE_BASE_URL', 'https://api.lexoffice.io/v1')
+LEXOFFICE_RATE_LIMIT = float(os.environ.get('LEXOFFICE_RATE_LIMIT', '2'))  # requests per second
+LEXOFFICE_MAX_RETRIES = int(os.environ.get('LEXOFFICE_MAX_RETRIES', '4'))
+LEXOFFICE_MAX_RETRY_AFTER = float(os.environ.get('LEXOFFICE_MAX_RETRY_AFTER', '30'))  # seconds
+LEXOFFICE_OUTBOX_CONCURRENCY = int(os.environ.get('LEXOFFICE_OUTBOX_CONCURRENCY', '4'))
+LEXOFFICE_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('LEXOFFICE_OUTBOX_MAX_ATTEMPTS', '8'))
+
+# Scratch directory for provider APIs that only accept file paths (tmpfs when available)
+AUDIO_TMP_DIR = os.environ.get('AUDIO_TMP_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+# TTS phrase cache
+TTS_VOICE = "nova"
+TTS_FORMAT = "mp3"
+TTS_CACHE_DIR = Path(os.environ.get('TTS_CACHE_DIR', str(ROOT_DIR / 'tts_cache')))
+TTS_CACHE_MEMORY_BYTES = int(os.environ.get('TTS_CACHE_MEMORY_MB', '64')) * 1024 * 1024
+TTS_CACHE_DISK_BYTES = int(os.environ.get('TTS_CACHE_DISK_MB', '1024')) * 1024 * 1024
 
 # Create the main app
 app = FastAPI(title="BuchungsButler SaaS Platform")
@@ -61,6 +383,17 @@ class TenantStatus(str, Enum):
     REJECTED = "rejected"
     SUSPENDED = "suspended"
 
+class BillingRunStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    FAILED = "failed"
+
 class InvoiceStatus(str, Enum):
     DRAFT = "draft"
     CREATED = "created"
@@ -68,6 +401,10 @@ class InvoiceStatus(str, Enum):
     PAID = "paid"
     CANCELLED = "cancelled"
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
 # ============= MODELS =============
 
 # Tenant Registration with Company Details
@@ -196,6 +533,37 @@ class InvoiceCreate(BaseModel):
     period_start: str
     period_end: str
 
+class LexofficeEnqueueRequest(BaseModel):
+    invoice_ids: List[str] = []
+    all_created: bool = False  # enqueue every invoice still in CREATED status
+
+class LexofficeOutboxResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    invoice_id: str
+    tenant_id: str
+    status: str
+    attempts: int = 0
+    last_error: Optional[str] = None
+    lexoffice_id: Optional[str] = None
+    next_attempt_at: str
+    created_at: str
+    updated_at: str
+
+class BillingRunResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    period_start: str
+    period_end: str
+    status: str
+    total_tenants: int = 0
+    processed_tenants: int = 0
+    invoices_created: int = 0
+    last_tenant_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    completed_at: Optional[str] = None
+
 class InvoiceResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -211,6 +579,7 @@ class InvoiceResponse(BaseModel):
     lexoffice_id: Optional[str] = None
     created_at: str
     sent_at: Optional[str] = None
+    company_name: Optional[str] = None
 
 # Calendar & Appointment Models (existing)
 class CalendarCredentialCreate(BaseModel):
@@ -248,11 +617,16 @@ class AppointmentResponse(BaseModel):
 
 class VoiceProcessRequest(BaseModel):
     transcription: str
+    audio_receipt: Optional[str] = None  # from /voice/transcribe: server-measured length of the caller's recording
 
 class VoiceProcessResponse(BaseModel):
     transcription: str
     response: str
     audio_base64: Optional[str] = None
+    audio_url: Optional[str] = None
+    conversation_id: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    timings: Optional[dict] = None
     calendar_action: Optional[dict] = None
 
 class ConversationResponse(BaseModel):
@@ -262,9 +636,64 @@ class ConversationResponse(BaseModel):
     user_id: str
     transcription: str
     agent_response: str
-    duration_seconds: int = 0
+    duration_seconds: float = 0
+    timings: Optional[dict] = None
     created_at: str
 
+# ============= QUERY HELPERS =============
+
+async def gather_queries(*queries, limit: int = QUERY_FANOUT_LIMIT) -> list:
+    """Await independent database operations concurrently, at most `limit` in flight per call.
+
+    Results come back in argument order, so total latency is roughly the slowest
+    query instead of the sum of all of them.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(query):
+        async with semaphore:
+            return await query
+    
+    return await asyncio.gather(*(run(q) for q in queries))
+
+def model_projection(model) -> dict:
+    """Projection limited to the fields a response model serializes"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a document"""
+    raw = json.dumps([doc["created_at"], doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if isinstance(created_at, str) and isinstance(doc_id, str):
+            return created_at, doc_id
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_page(collection, query: dict, projection: dict, limit: int, cursor: Optional[str], response: Response) -> List[dict]:
+    """Newest-first keyset page ordered by (created_at, id).
+
+    Sets the X-Next-Cursor response header when more documents follow; pass it
+    back as `cursor` to get the next page.
+    """
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": doc_id}}
+        ]}]}
+    docs = await collection.find(query, projection).sort(
+        [("created_at", DESCENDING), ("id", DESCENDING)]
+    ).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[-1])
+    return docs
+
 # ============= AUTH HELPERS =============
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -273,38 +702,337 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, verify_password, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # Float iat so a token issued right after a revocation is not mistaken for an older one
+    to_encode.update({"exp": expire, "iat": time.time()})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+class VerifiedTokenCache:
+    """LRU of already-verified bearer tokens keyed by digest, honoring exp.
+
+    Entries are indexed by tenant and user so suspending a tenant or deleting
+    a user drops its cached principals immediately. The revocation time is kept
+    as well (for one token lifetime), so tokens issued before it are rejected
+    when they are decoded again instead of being re-admitted.
+    """
+    
+    def __init__(self, max_entries: int, token_lifetime_seconds: float):
+        self.max_entries = max_entries
+        self.token_lifetime_seconds = token_lifetime_seconds
+        self._entries: "OrderedDict[str, Tuple[TokenData, float]]" = OrderedDict()
+        self._by_owner: dict = {}
+        self._revoked_before: dict = {}
+    
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def get(self, token: str) -> Optional[TokenData]:
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        token_data, expires_at = entry
+        if expires_at <= time.time():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return token_data
+    
+    def put(self, token: str, token_data: TokenData, expires_at: float):
+        key = self.digest(token)
+        self._entries[key] = (token_data, expires_at)
+        self._entries.move_to_end(key)
+        for owner in (f"tenant:{token_data.tenant_id}", f"user:{token_data.user_id}"):
+            self._by_owner.setdefault(owner, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+    
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        token_data = entry[0]
+        for owner in (f"tenant:{token_data.tenant_id}", f"user:{token_data.user_id}"):
+            keys = self._by_owner.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_owner[owner]
+    
+    def revoke(self, owner: str):
+        now = time.time()
+        self._revoked_before[owner] = now
+        # Tokens issued before an older revocation have expired by now
+        horizon = now - self.token_lifetime_seconds
+        for stale in [o for o, revoked_at in self._revoked_before.items() if revoked_at < horizon]:
+            del self._revoked_before[stale]
+        for key in list(self._by_owner.get(owner, ())):
+            self._discard(key)
+    
+    def is_revoked(self, token_data: TokenData, issued_at: float) -> bool:
+        return any(
+            issued_at < self._revoked_before.get(owner, 0)
+            for owner in (f"tenant:{token_data.tenant_id}", f"user:{token_data.user_id}")
+        )
+    
+    def revoke_tenant(self, tenant_id: str):
+        self.revoke(f"tenant:{tenant_id}")
+    
+    def revoke_user(self, user_id: str):
+        self.revoke(f"user:{user_id}")
+
+token_cache = VerifiedTokenCache(TOKEN_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def decode_access_token(token: str) -> TokenData:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
         tenant_id = payload.get("tenant_id")
         email = payload.get("email")
         is_super_admin = payload.get("is_super_admin", False)
         if not user_id or not tenant_id:
             raise HTTPException(status_code=401, detail="Invalid token")
-        return TokenData(user_id=user_id, tenant_id=tenant_id, email=email, is_super_admin=is_super_admin)
+        token_data = TokenData(user_id=user_id, tenant_id=tenant_id, email=email, is_super_admin=is_super_admin)
+        # Tokens from before iat was added count as issued at the epoch
+        if token_cache.is_revoked(token_data, float(payload.get("iat", 0))):
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        if payload.get("exp"):
+            token_cache.put(token, token_data, float(payload["exp"]))
+        return token_data
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+    return decode_access_token(credentials.credentials)
+
 async def require_super_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     if not current_user.is_super_admin:
         raise HTTPException(status_code=403, detail="Super Admin access required")
     return current_user
 
+class TTLCache:
+    """Small in-process cache with per-entry expiry and a size bound"""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict = {}
+    
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key, value):
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+                del self._entries[stale]
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+    
+    def increment(self, key) -> int:
+        """Count within the window opened by the first increment; later increments do not extend it"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.set(key, 1)
+            return 1
+        expires_at, value = entry
+        self._entries[key] = (expires_at, value + 1)
+        return value + 1
+    
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+
+# Hot-path tenant status/plan lookups; write endpoints invalidate explicitly
+tenant_cache = TTLCache(TENANT_CACHE_TTL_SECONDS)
+pricing_plan_cache = TTLCache(TENANT_CACHE_TTL_SECONDS, max_entries=1000)
+
+async def get_tenant_state(tenant_id: str) -> Optional[dict]:
+    """Cached tenant status, pricing_plan_id, metered flag and company_name"""
+    tenant = tenant_cache.get(tenant_id)
+    if tenant is None:
+        tenant = await db.tenants.find_one(
+            {"id": tenant_id}, {"_id": 0, "status": 1, "pricing_plan_id": 1, "metered": 1, "company_name": 1}
+        )
+        if tenant is None:
+            return None
+        tenant_cache.set(tenant_id, tenant)
+    return tenant
+
+async def get_pricing_plan(plan_id: Optional[str]) -> Optional[dict]:
+    """Cached pricing plan lookup"""
+    if not plan_id:
+        return None
+    plan = pricing_plan_cache.get(plan_id)
+    if plan is None:
+        plan = await db.pricing_plans.find_one({"id": plan_id}, {"_id": 0})
+        if plan is None:
+            return None
+        pricing_plan_cache.set(plan_id, plan)
+    return plan
+
+async def get_tenant_plan(tenant_id: str) -> Optional[dict]:
+    """Resolved pricing plan of a tenant, if any"""
+    tenant = await get_tenant_state(tenant_id)
+    return await get_pricing_plan(tenant.get("pricing_plan_id")) if tenant else None
+
 async def require_approved_tenant(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     if current_user.is_super_admin:
         return current_user
-    tenant = await db.tenants.find_one({"id": current_user.tenant_id}, {"_id": 0})
+    tenant = await get_tenant_state(current_user.tenant_id)
     if not tenant or tenant.get("status") != TenantStatus.APPROVED:
         raise HTTPException(status_code=403, detail="Tenant not approved. Please wait for approval.")
     return current_user
 
+# ============= DATABASE INDEXES =============
+
+# Every query pattern in this module must be served by one of these indexes
+INDEX_REGISTRY = {
+    "super_admins": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "tenants": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("minute_reservations.lease_until", ASCENDING)], sparse=True),
+        IndexModel([("status", ASCENDING), ("id", ASCENDING)]),  # billing run tenant scan in id order
+        # Startup backfill of metered on prepaid tenants; only tenants holding minutes are indexed
+        IndexModel([("metered", ASCENDING)], partialFilterExpression={"minutes_balance": {"$gt": 0}}),
+    ],
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING)]),
+    ],
+    "pricing_plans": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING)]),
+    ],
+    "minute_packages": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING)]),
+    ],
+    "purchases": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "invoices": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("tenant_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("invoice_number", DESCENDING)]),
+        # One invoice per tenant and billing period, whether from a run or generated manually
+        IndexModel(
+            [("tenant_id", ASCENDING), ("billing_period", ASCENDING)],
+            unique=True, partialFilterExpression={"billing_period": {"$exists": True}}
+        ),
+    ],
+    "usage_records": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING), ("timestamp", ASCENDING)]),
+        IndexModel([("timestamp", ASCENDING)]),
+    ],
+    # Time-series collections do not support unique indexes
+    **({USAGE_TIMESERIES_COLLECTION: [
+        IndexModel([("tenant_id", ASCENDING), ("timestamp", ASCENDING)]),
+        IndexModel([("timestamp", ASCENDING)]),
+    ]} if USAGE_TIMESERIES else {}),
+    "billing_runs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("period_start", ASCENDING), ("period_end", ASCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+    "lexoffice_outbox": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("invoice_id", ASCENDING)], unique=True),
+        # Both claim branches (due PENDING, lease-expired PROCESSING) in next_attempt_at order
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING), ("lease_until", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+    "usage_rollups": [
+        IndexModel([("tenant_id", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING)], unique=True),
+    ],
+    "conversations": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "appointments": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING), ("start_time", ASCENDING)]),
+    ],
+    "calendar_credentials": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("tenant_id", ASCENDING)]),
+    ],
+    "system_config": [
+        IndexModel([("type", ASCENDING)], unique=True),
+    ],
+}
+
+async def ensure_usage_timeseries_collection(name: str = USAGE_TIMESERIES_COLLECTION):
+    """Create the usage time-series collection unless it already exists"""
+    if name in await db.list_collection_names(filter={"name": name}):
+        return
+    await db.create_collection(name, timeseries={
+        "timeField": "timestamp",
+        "metaField": "tenant_id",
+        "granularity": "hours"
+    })
+    logger.info(f"Created time-series collection {name}")
+
+async def ensure_indexes():
+    """Create all registered indexes; a failing index is logged, not fatal"""
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        for index in indexes:
+            try:
+                await db[collection_name].create_indexes([index])
+            except OperationFailure as e:
+                logger.error(f"Could not create index {index.document['name']} on {collection_name}: {e}")
+
+async def get_index_report() -> dict:
+    """Registered indexes that are missing, and existing indexes never used since server start"""
+    report = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        existing = await db[collection_name].index_information()
+        missing = [index.document["name"] for index in indexes if index.document["name"] not in existing]
+        try:
+            stats = await db[collection_name].aggregate([{"$indexStats": {}}]).to_list(None)
+        except OperationFailure:
+            stats = []
+        unused = [s["name"] for s in stats if s["name"] != "_id_" and s.get("accesses", {}).get("ops", 0) == 0]
+        report[collection_name] = {"missing": missing, "unused": unused}
+    return report
+
 # ============= SUPER ADMIN SETUP =============
 
 async def ensure_super_admin():
@@ -316,7 +1044,7 @@ async def ensure_super_admin():
             "id": admin_id,
             "email": "admin@buchungsbutler.de",
             "username": "Super Admin",
-            "hashed_password": get_password_hash("admin123"),
+            "hashed_password": await get_password_hash_async("admin123"),
             "is_active": True,
             "created_at": datetime.now(timezone.utc).isoformat()
         })
@@ -324,7 +1052,15 @@ async def ensure_super_admin():
 
 @app.on_event("startup")
 async def startup_event():
+    if USAGE_TIMESERIES:
+        await ensure_usage_timeseries_collection()
+    await ensure_indexes()
     await ensure_super_admin()
+    await ensure_invoice_counter(datetime.now().year)
+    # Tenants that bought minutes before metering existed are prepaid as well
+    await db.tenants.update_many({"minutes_balance": {"$gt": 0}, "metered": {"$exists": False}}, {"$set": {"metered": True}})
+    if await db.usage_rollups.estimated_document_count() == 0 and await usage_collection.find_one({}, {"_id": 1}):
+        await rebuild_usage_rollups()
     # Create default pricing plans
     existing_plans = await db.pricing_plans.count_documents({})
     if existing_plans == 0:
@@ -346,15 +1082,29 @@ async def startup_event():
         ]
         await db.minute_packages.insert_many(default_packages)
         logger.info("Default minute packages created")
+    
+    # Background workers
+    await release_stale_invoice_holds()
+    await resume_billing_runs()
+    app.state.lexoffice_dispatcher = asyncio.create_task(run_lexoffice_dispatcher())
+    app.state.platform_stats_reconciler = asyncio.create_task(run_platform_stats_reconciler())
+    app.state.reservation_sweeper = asyncio.create_task(run_reservation_sweeper())
+    app.state.loop_lag_monitor = asyncio.create_task(run_loop_lag_monitor())
+    if LOOP_BLOCK_THRESHOLD_SECONDS > 0:
+        app.state.loop_watchdog = LoopWatchdog()
+        app.state.loop_watchdog.start()
+    
+    # Warm TTS phrase cache in the background so startup is not delayed
+    app.state.tts_warmup = asyncio.create_task(warm_tts_cache())
 
 # ============= AUTH ENDPOINTS =============
 
 @api_router.post("/auth/register", response_model=dict)
 async def register_tenant(tenant: TenantCreate):
     """Register a new tenant (requires manual approval)"""
-    # Check if email exists
-    existing = await db.tenants.find_one({"email": tenant.email})
-    if existing:
+    # Check if email exists (super admin emails included, so a login email names one principal)
+    existing = await db.tenants.find_one({"email": tenant.email}, {"_id": 1})
+    if existing or await db.super_admins.find_one({"email": tenant.email}, {"_id": 1}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     tenant_id = str(uuid.uuid4())
@@ -392,12 +1142,13 @@ async def register_tenant(tenant: TenantCreate):
         "tenant_id": tenant_id,
         "email": tenant.email,
         "username": tenant.contact_person,
-        "hashed_password": get_password_hash(tenant.password),
+        "hashed_password": await get_password_hash_async(tenant.password),
         "is_active": True,
         "is_admin": True,
         "created_at": now
     }
     await db.users.insert_one(user_doc)
+    await bump_platform_stats(total_tenants=1, pending_tenants=1, total_users=1)
     
     return {
         "message": "Registrierung erfolgreich! Ihr Konto wird geprüft und nach manueller Freischaltung können Sie sich anmelden.",
@@ -405,12 +1156,89 @@ async def register_tenant(tenant: TenantCreate):
         "status": TenantStatus.PENDING
     }
 
+# Failed login counters, checked before any DB lookup or bcrypt work. The tight limit is per
+# account and client IP, so nobody can lock an account (e.g. the known admin email) for everyone;
+# a much higher per-IP limit bounds guessing across accounts.
+login_failures = TTLCache(LOGIN_THROTTLE_SECONDS, max_entries=100000)
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> Optional[str]:
+    """Client address: the nearest X-Forwarded-For hop not added by a trusted proxy"""
+    peer = request.client.host if request.client else None
+    if not peer or not is_trusted_proxy(peer):
+        return peer  # forwarded headers from untrusted peers are ignored
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+def login_throttle_keys(email: str, ip: Optional[str]) -> List[Tuple[str, int]]:
+    """(counter key, failure limit) pairs for a login attempt"""
+    keys = [(f"account:{email.lower()}|{ip or ''}", LOGIN_MAX_FAILURES)]
+    if ip:
+        keys.append((f"ip:{ip}", LOGIN_MAX_FAILURES_PER_IP))
+    return keys
+
+def login_throttled(keys: List[Tuple[str, int]]) -> bool:
+    return any((login_failures.get(key) or 0) >= limit for key, limit in keys)
+
+def record_login_failure(keys: List[Tuple[str, int]]):
+    for key, _ in keys:
+        login_failures.increment(key)
+
+def clear_login_failures(keys: List[Tuple[str, int]]):
+    for key, _ in keys:
+        login_failures.invalidate(key)
+
+async def find_login_principals(email: str) -> List[dict]:
+    """Super admin and/or user with this email, plus the user's tenant status, in one round trip"""
+    return await db.super_admins.aggregate([
+        {"$match": {"email": email}},
+        {"$project": {"_id": 0, "id": 1, "email": 1, "username": 1, "hashed_password": 1, "principal": {"$literal": "super_admin"}}},
+        {"$unionWith": {"coll": "users", "pipeline": [
+            {"$match": {"email": email}},
+            {"$lookup": {"from": "tenants", "localField": "tenant_id", "foreignField": "id", "as": "tenant"}},
+            {"$project": {
+                "_id": 0,
+                "id": 1,
+                "tenant_id": 1,
+                "email": 1,
+                "username": 1,
+                "hashed_password": 1,
+                "is_active": 1,
+                "principal": {"$literal": "user"},
+                "tenant_found": {"$gt": [{"$size": "$tenant"}, 0]},
+                "tenant_status": {"$arrayElemAt": ["$tenant.status", 0]}
+            }}
+        ]}}
+    ]).to_list(2)
+
 @api_router.post("/auth/login", response_model=TokenResponse)
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, raw_request: Request):
     """Login user (checks tenant approval status)"""
-    # First check if super admin
-    super_admin = await db.super_admins.find_one({"email": request.email}, {"_id": 0})
-    if super_admin and verify_password(request.password, super_admin["hashed_password"]):
+    throttle_keys = login_throttle_keys(request.email, client_ip(raw_request))
+    if login_throttled(throttle_keys):
+        raise HTTPException(status_code=429, detail="Too many failed login attempts. Please try again later.")
+    
+    principals = await find_login_principals(request.email)
+    super_admin = next((p for p in principals if p["principal"] == "super_admin"), None)
+    user = next((p for p in principals if p["principal"] == "user"), None)
+    
+    # One bcrypt check per attempt: an email held by a super admin is never retried as a user login
+    principal = super_admin or user
+    if not principal or not await verify_password_async(request.password, principal["hashed_password"]):
+        record_login_failure(throttle_keys)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    clear_login_failures(throttle_keys)
+    
+    if super_admin:
         access_token = create_access_token({
             "sub": super_admin["id"],
             "tenant_id": "super_admin",
@@ -427,19 +1255,14 @@ async def login(request: LoginRequest):
         )
     
     # Regular user login
-    user = await db.users.find_one({"email": request.email}, {"_id": 0})
-    if not user or not verify_password(request.password, user["hashed_password"]):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
     if not user.get("is_active", False):
         raise HTTPException(status_code=401, detail="Account disabled")
     
     # Check tenant status
-    tenant = await db.tenants.find_one({"id": user["tenant_id"]}, {"_id": 0})
-    if not tenant:
+    if not user["tenant_found"]:
         raise HTTPException(status_code=401, detail="Tenant not found")
     
-    tenant_status = tenant.get("status", TenantStatus.PENDING)
+    tenant_status = user.get("tenant_status") or TenantStatus.PENDING
     
     access_token = create_access_token({
         "sub": user["id"],
@@ -464,29 +1287,38 @@ async def get_current_user_info(current_user: TokenData = Depends(get_current_us
         admin = await db.super_admins.find_one({"id": current_user.user_id}, {"_id": 0, "hashed_password": 0})
         return {**admin, "is_super_admin": True, "tenant_status": "approved"}
     
-    user = await db.users.find_one(
-        {"id": current_user.user_id, "tenant_id": current_user.tenant_id},
-        {"_id": 0, "hashed_password": 0}
+    user, tenant = await gather_queries(
+        db.users.find_one(
+            {"id": current_user.user_id, "tenant_id": current_user.tenant_id},
+            {"_id": 0, "hashed_password": 0}
+        ),
+        db.tenants.find_one({"id": current_user.tenant_id}, {"_id": 0, "status": 1})
     )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    tenant = await db.tenants.find_one({"id": current_user.tenant_id}, {"_id": 0})
     return {**user, "is_super_admin": False, "tenant_status": tenant.get("status", "pending")}
 
 # ============= SUPER ADMIN ENDPOINTS =============
 
 @api_router.get("/admin/tenants", response_model=List[TenantResponse])
 async def get_all_tenants(
+    response: Response,
     status: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     current_user: TokenData = Depends(require_super_admin)
 ):
-    """Get all tenants (Super Admin only)"""
+    """Get tenants newest first, one page at a time (Super Admin only)"""
     query = {}
     if status:
         query["status"] = status
+    if search:
+        pattern = {"$regex": re.escape(search), "$options": "i"}
+        query["$or"] = [{"company_name": pattern}, {"email": pattern}]
     
-    tenants = await db.tenants.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    tenants = await fetch_page(db.tenants, query, model_projection(TenantResponse), limit, cursor, response)
     return [TenantResponse(**t) for t in tenants]
 
 @api_router.post("/admin/tenants/{tenant_id}/approve")
@@ -501,58 +1333,139 @@ async def approve_tenant(tenant_id: str, current_user: TokenData = Depends(requi
         {"id": tenant_id},
         {"$set": {"status": TenantStatus.APPROVED, "approved_at": now}}
     )
+    tenant_cache.invalidate(tenant_id)
+    await track_tenant_status_change(tenant.get("status"), TenantStatus.APPROVED)
     
     return {"message": "Tenant approved successfully", "tenant_id": tenant_id}
 
 @api_router.post("/admin/tenants/{tenant_id}/reject")
 async def reject_tenant(tenant_id: str, reason: str = "", current_user: TokenData = Depends(require_super_admin)):
     """Reject a pending tenant"""
-    await db.tenants.update_one(
+    previous = await db.tenants.find_one_and_update(
         {"id": tenant_id},
-        {"$set": {"status": TenantStatus.REJECTED, "rejection_reason": reason}}
+        {"$set": {"status": TenantStatus.REJECTED, "rejection_reason": reason}},
+        projection={"_id": 0, "status": 1}
     )
+    tenant_cache.invalidate(tenant_id)
+    if previous:
+        await track_tenant_status_change(previous.get("status"), TenantStatus.REJECTED)
+    token_cache.revoke_tenant(tenant_id)
     return {"message": "Tenant rejected", "tenant_id": tenant_id}
 
 @api_router.post("/admin/tenants/{tenant_id}/suspend")
 async def suspend_tenant(tenant_id: str, current_user: TokenData = Depends(require_super_admin)):
     """Suspend a tenant"""
-    await db.tenants.update_one(
+    previous = await db.tenants.find_one_and_update(
         {"id": tenant_id},
-        {"$set": {"status": TenantStatus.SUSPENDED}}
+        {"$set": {"status": TenantStatus.SUSPENDED}},
+        projection={"_id": 0, "status": 1}
     )
+    tenant_cache.invalidate(tenant_id)
+    if previous:
+        await track_tenant_status_change(previous.get("status"), TenantStatus.SUSPENDED)
+    token_cache.revoke_tenant(tenant_id)
     return {"message": "Tenant suspended", "tenant_id": tenant_id}
 
-@api_router.get("/admin/stats")
-async def get_admin_stats(current_user: TokenData = Depends(require_super_admin)):
-    """Get platform statistics"""
-    total_tenants = await db.tenants.count_documents({})
-    pending_tenants = await db.tenants.count_documents({"status": TenantStatus.PENDING})
-    approved_tenants = await db.tenants.count_documents({"status": TenantStatus.APPROVED})
-    total_users = await db.users.count_documents({})
-    total_calls = await db.conversations.count_documents({})
-    total_invoices = await db.invoices.count_documents({})
-    
-    # Calculate total revenue
-    pipeline = [{"$group": {"_id": None, "total": {"$sum": "$gross_amount"}}}]
-    revenue_result = await db.invoices.aggregate(pipeline).to_list(1)
+# ============= PLATFORM STATS =============
+# A single platform_stats document is kept current by the write paths with $inc
+# and periodically reconciled against the source collections.
+
+PLATFORM_STATS_ID = "platform"
+TENANT_STATUS_STAT_FIELDS = {
+    TenantStatus.PENDING: "pending_tenants",
+    TenantStatus.APPROVED: "approved_tenants",
+}
+
+async def bump_platform_stats(**increments):
+    await db.platform_stats.update_one({"_id": PLATFORM_STATS_ID}, {"$inc": increments}, upsert=True)
+
+async def track_tenant_status_change(old_status: Optional[str], new_status: str):
+    increments = {}
+    if old_status in TENANT_STATUS_STAT_FIELDS:
+        increments[TENANT_STATUS_STAT_FIELDS[old_status]] = -1
+    if new_status in TENANT_STATUS_STAT_FIELDS:
+        field = TENANT_STATUS_STAT_FIELDS[new_status]
+        increments[field] = increments.get(field, 0) + 1
+    increments = {field: delta for field, delta in increments.items() if delta}
+    if increments:
+        await bump_platform_stats(**increments)
+
+async def reconcile_platform_stats() -> dict:
+    """Recompute platform statistics from the source collections"""
+    # Total revenue, and total seconds used from monthly rollups
+    revenue_pipeline = [{"$group": {"_id": None, "total": {"$sum": "$gross_amount"}}}]
+    seconds_pipeline = [
+        {"$match": {"period": "month"}},
+        {"$group": {"_id": None, "total": {"$sum": "$duration_seconds"}}}
+    ]
+    (
+        total_tenants, pending_tenants, approved_tenants, total_users,
+        total_calls, total_invoices, revenue_result, seconds_result
+    ) = await gather_queries(
+        db.tenants.count_documents({}),
+        db.tenants.count_documents({"status": TenantStatus.PENDING}),
+        db.tenants.count_documents({"status": TenantStatus.APPROVED}),
+        db.users.count_documents({}),
+        db.conversations.count_documents({}),
+        db.invoices.count_documents({}),
+        db.invoices.aggregate(revenue_pipeline).to_list(1),
+        db.usage_rollups.aggregate(seconds_pipeline).to_list(1)
+    )
     total_revenue = revenue_result[0]["total"] if revenue_result else 0
+    total_seconds = seconds_result[0]["total"] if seconds_result else 0
     
-    # Calculate total minutes used
-    minutes_pipeline = [{"$group": {"_id": None, "total": {"$sum": "$duration_seconds"}}}]
-    minutes_result = await db.usage_records.aggregate(minutes_pipeline).to_list(1)
-    total_minutes = (minutes_result[0]["total"] / 60) if minutes_result else 0
-    
-    return {
+    stats = {
         "total_tenants": total_tenants,
         "pending_tenants": pending_tenants,
         "approved_tenants": approved_tenants,
         "total_users": total_users,
         "total_calls": total_calls,
         "total_invoices": total_invoices,
-        "total_revenue": round(total_revenue, 2),
-        "total_minutes": round(total_minutes, 2)
+        "total_revenue": total_revenue,
+        "total_seconds": total_seconds,
+        "reconciled_at": datetime.now(timezone.utc).isoformat()
+    }
+    await db.platform_stats.replace_one({"_id": PLATFORM_STATS_ID}, stats, upsert=True)
+    return stats
+
+async def run_platform_stats_reconciler():
+    """Periodically correct drift in the materialized platform stats"""
+    while True:
+        try:
+            await reconcile_platform_stats()
+        except Exception as e:
+            logger.error(f"Platform stats reconciliation failed: {e}")
+        await asyncio.sleep(PLATFORM_STATS_RECONCILE_SECONDS)
+
+@api_router.get("/admin/stats")
+async def get_admin_stats(current_user: TokenData = Depends(require_super_admin)):
+    """Get platform statistics"""
+    stats = await db.platform_stats.find_one({"_id": PLATFORM_STATS_ID})
+    if not stats or "reconciled_at" not in stats:
+        stats = await reconcile_platform_stats()
+    
+    return {
+        "total_tenants": stats.get("total_tenants", 0),
+        "pending_tenants": stats.get("pending_tenants", 0),
+        "approved_tenants": stats.get("approved_tenants", 0),
+        "total_users": stats.get("total_users", 0),
+        "total_calls": stats.get("total_calls", 0),
+        "total_invoices": stats.get("total_invoices", 0),
+        "total_revenue": round(stats.get("total_revenue", 0), 2),
+        "total_minutes": round(stats.get("total_seconds", 0) / 60, 2)
     }
 
+@api_router.post("/admin/stats/reconcile")
+async def reconcile_admin_stats(current_user: TokenData = Depends(require_super_admin)):
+    """Recompute platform statistics now"""
+    await reconcile_platform_stats()
+    return await get_admin_stats(current_user)
+
+@api_router.get("/admin/indexes")
+async def get_admin_indexes(current_user: TokenData = Depends(require_super_admin)):
+    """Report missing and unused database indexes"""
+    return await get_index_report()
+
 # ============= PRICING MANAGEMENT (Admin) =============
 
 @api_router.get("/admin/pricing-plans", response_model=List[PricingPlanResponse])
@@ -582,6 +1495,7 @@ async def update_pricing_plan(plan_id: str, plan: PricingPlanCreate, current_use
         {"id": plan_id},
         {"$set": plan.model_dump()}
     )
+    pricing_plan_cache.invalidate(plan_id)
     updated = await db.pricing_plans.find_one({"id": plan_id}, {"_id": 0})
     return PricingPlanResponse(**updated)
 
@@ -589,6 +1503,7 @@ async def update_pricing_plan(plan_id: str, plan: PricingPlanCreate, current_use
 async def delete_pricing_plan(plan_id: str, current_user: TokenData = Depends(require_super_admin)):
     """Delete pricing plan"""
     await db.pricing_plans.delete_one({"id": plan_id})
+    pricing_plan_cache.invalidate(plan_id)
     return {"message": "Plan deleted"}
 
 @api_router.get("/admin/minute-packages", response_model=List[MinutePackageResponse])
@@ -621,20 +1536,138 @@ async def update_minute_package(package_id: str, package: MinutePackageCreate, c
     updated = await db.minute_packages.find_one({"id": package_id}, {"_id": 0})
     return MinutePackageResponse(**updated)
 
+@api_router.post("/admin/usage-rollups/rebuild")
+async def rebuild_usage_rollups_endpoint(current_user: TokenData = Depends(require_super_admin)):
+    """Recompute usage rollups from raw usage records"""
+    await rebuild_usage_rollups()
+    return {"message": "Usage rollups rebuilt"}
+
+# ============= LEXOFFICE CLIENT =============
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class LexofficeClient:
+    """Application-scoped Lexoffice API client with keep-alive pooling, throttling and retries.
+
+    POSTs create accounting documents and Lexoffice has no idempotency keys, so they
+    are only retried when the request was certainly not processed: it never left
+    (connect/pool errors) or was rejected up front (429/503). A timeout or 500/502/504
+    may come back after the document was created, and retrying would duplicate it.
+    """
+    
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    UNPROCESSED_STATUSES = {429, 503}
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+    
+    def __init__(self, api_key: str, base_url: str = LEXOFFICE_BASE_URL, rate_limit: float = LEXOFFICE_RATE_LIMIT,
+                 max_retries: int = LEXOFFICE_MAX_RETRIES, backoff_base: float = 0.5,
+                 max_retry_after: float = LEXOFFICE_MAX_RETRY_AFTER, transport=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_retry_after = max_retry_after
+        self.bucket = TokenBucket(rate_limit, max(1.0, rate_limit))
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}", "Accept": "application/json"},
+            http2=transport is None and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=transport
+        )
+    
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(max(0.0, float(retry_after)), self.max_retry_after)
+            except ValueError:
+                pass
+        return self.backoff_base * (2 ** attempt) * (0.5 + random.random() / 2)
+    
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying with exponential backoff where a retry cannot duplicate work"""
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+        retry_errors = httpx.TransportError if idempotent else self.UNSENT_ERRORS
+        retry_statuses = self.RETRY_STATUSES if idempotent else self.UNPROCESSED_STATUSES
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except retry_errors as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Lexoffice {method} {path} transport error, retrying: {e}")
+                await asyncio.sleep(self._backoff(attempt, None))
+                continue
+            
+            if response.status_code not in retry_statuses or attempt == self.max_retries:
+                return response
+            logger.warning(f"Lexoffice {method} {path} returned {response.status_code}, retrying")
+            await asyncio.sleep(self._backoff(attempt, response))
+    
+    async def create_contact(self, payload: dict) -> httpx.Response:
+        return await self.request("POST", "/contacts", json=payload)
+    
+    async def create_invoice(self, payload: dict) -> httpx.Response:
+        return await self.request("POST", "/invoices", json=payload)
+    
+    async def aclose(self):
+        await self.client.aclose()
+
+lexoffice_client: Optional[LexofficeClient] = None
+
+def get_lexoffice_client() -> LexofficeClient:
+    global lexoffice_client
+    if lexoffice_client is None:
+        lexoffice_client = LexofficeClient(LEXOFFICE_API_KEY)
+    return lexoffice_client
+
 # ============= INVOICE MANAGEMENT (Admin) =============
 
 @api_router.get("/admin/invoices", response_model=List[InvoiceResponse])
 async def get_all_invoices(
+    response: Response,
     status: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     current_user: TokenData = Depends(require_super_admin)
 ):
-    """Get all invoices"""
+    """Get invoices newest first, one page at a time, with each tenant's company_name"""
     query = {}
     if status:
         query["status"] = status
+    if tenant_id:
+        query["tenant_id"] = tenant_id
     
-    invoices = await db.invoices.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return [InvoiceResponse(**i) for i in invoices]
+    invoices = await fetch_page(db.invoices, query, model_projection(InvoiceResponse), limit, cursor, response)
+    # One lookup for the tenants on this page only
+    tenant_ids = list({i["tenant_id"] for i in invoices})
+    names = {
+        t["id"]: t.get("company_name")
+        async for t in db.tenants.find({"id": {"$in": tenant_ids}}, {"_id": 0, "id": 1, "company_name": 1})
+    } if tenant_ids else {}
+    return [InvoiceResponse(**{**i, "company_name": names.get(i["tenant_id"])}) for i in invoices]
 
 @api_router.post("/admin/invoices/generate/{tenant_id}", response_model=InvoiceResponse)
 async def generate_invoice(
@@ -648,21 +1681,31 @@ async def generate_invoice(
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
-    # Get usage records for period
-    usage_records = await db.usage_records.find({
-        "tenant_id": tenant_id,
-        "timestamp": {"$gte": period_start, "$lte": period_end}
-    }, {"_id": 0}).to_list(10000)
+    # Get usage totals for period
+    usage = await get_usage_totals(tenant_id, period_start, period_end)
+    plan = await get_pricing_plan(tenant.get("pricing_plan_id"))
     
-    total_seconds = sum([r.get("duration_seconds", 0) for r in usage_records])
-    total_minutes = total_seconds / 60
+    if await db.invoices.find_one({"tenant_id": tenant_id, **invoiced_for_period(period_start, period_end)}, {"_id": 1}):
+        raise HTTPException(status_code=409, detail="Tenant already invoiced for this period")
+    
+    # Generate invoice number
+    holder = str(uuid.uuid4())
+    invoice_number = (await hold_invoice_numbers(holder, 1))[0]
     
-    # Get pricing plan
-    plan = None
-    if tenant.get("pricing_plan_id"):
-        plan = await db.pricing_plans.find_one({"id": tenant["pricing_plan_id"]}, {"_id": 0})
+    invoice_doc = build_invoice_doc(tenant_id, plan, usage["duration_seconds"] / 60, period_start, period_end, invoice_number)
+    try:
+        await db.invoices.insert_one(invoice_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Tenant already invoiced for this period")
+    finally:
+        await release_invoice_numbers(holder)
+    await bump_platform_stats(total_invoices=1, total_revenue=invoice_doc["gross_amount"])
     
-    # Calculate cost
+    return InvoiceResponse(**invoice_doc)
+
+def build_invoice_doc(tenant_id: str, plan: Optional[dict], total_minutes: float,
+                      period_start: str, period_end: str, invoice_number: str) -> dict:
+    """Price a period's usage against a plan and build the invoice document"""
     price_per_minute = plan.get("price_per_minute", 0.15) if plan else 0.15
     monthly_fee = plan.get("monthly_fee", 0) if plan else 0
     included_minutes = plan.get("included_minutes", 0) if plan else 0
@@ -674,15 +1717,8 @@ async def generate_invoice(
     tax_amount = total_amount * tax_rate
     gross_amount = total_amount + tax_amount
     
-    # Generate invoice number
-    invoice_count = await db.invoices.count_documents({})
-    invoice_number = f"BB-{datetime.now().year}-{invoice_count + 1:05d}"
-    
-    invoice_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
-    
-    invoice_doc = {
-        "id": invoice_id,
+    return {
+        "id": str(uuid.uuid4()),
         "tenant_id": tenant_id,
         "invoice_number": invoice_number,
         "total_minutes": round(total_minutes, 2),
@@ -695,134 +1731,695 @@ async def generate_invoice(
         "gross_amount": round(gross_amount, 2),
         "period_start": period_start,
         "period_end": period_end,
+        "billing_period": billing_period_key(period_start, period_end),
         "status": InvoiceStatus.CREATED,
         "lexoffice_id": None,
-        "created_at": now,
+        "created_at": datetime.now(timezone.utc).isoformat(),
         "sent_at": None
     }
-    await db.invoices.insert_one(invoice_doc)
-    
-    return InvoiceResponse(**invoice_doc)
 
-@api_router.post("/admin/invoices/{invoice_id}/send-lexoffice")
-async def send_invoice_to_lexoffice(invoice_id: str, current_user: TokenData = Depends(require_super_admin)):
-    """Send invoice to Lexoffice and email to customer"""
-    invoice = await db.invoices.find_one({"id": invoice_id}, {"_id": 0})
-    if not invoice:
-        raise HTTPException(status_code=404, detail="Invoice not found")
-    
-    tenant = await db.tenants.find_one({"id": invoice["tenant_id"]}, {"_id": 0})
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Tenant not found")
-    
-    if not LEXOFFICE_API_KEY:
-        raise HTTPException(status_code=400, detail="Lexoffice API key not configured")
-    
-    # Create/update contact in Lexoffice
-    async with httpx.AsyncClient() as client:
-        # Check if contact exists, otherwise create
-        if not tenant.get("lexoffice_contact_id"):
-            contact_payload = {
-                "version": 0,
-                "roles": {"customer": {}},
-                "company": {
-                    "name": tenant["company_name"],
-                    "taxNumber": tenant.get("tax_number"),
-                    "vatRegistrationId": tenant.get("vat_id"),
-                    "contactPersons": [{
-                        "firstName": tenant["contact_person"].split()[0] if " " in tenant["contact_person"] else tenant["contact_person"],
-                        "lastName": tenant["contact_person"].split()[-1] if " " in tenant["contact_person"] else "",
-                        "emailAddress": tenant["email"],
-                        "phoneNumber": tenant["phone"]
-                    }]
-                },
-                "addresses": {
-                    "billing": [{
-                        "street": f"{tenant['street']} {tenant['house_number']}",
-                        "zip": tenant["postal_code"],
-                        "city": tenant["city"],
-                        "countryCode": "DE"
-                    }]
-                },
-                "emailAddresses": {"business": [tenant["email"]]}
-            }
+def billing_period_key(period_start: str, period_end: str) -> str:
+    """Period key of the unique (tenant_id, billing_period) index, by date whatever the timestamp format"""
+    return f"{period_start[:10]}/{period_end[:10]}"
+
+def invoiced_for_period(period_start: str, period_end: str) -> dict:
+    """Filter for invoices of a period; invoices from before billing_period existed match by their period fields"""
+    return {"$or": [
+        {"billing_period": billing_period_key(period_start, period_end)},
+        {"period_start": period_start, "period_end": period_end}
+    ]}
+
+async def next_sequence(name: str, count: int = 1) -> int:
+    """Atomically advance a named counter by count and return its new value"""
+    counter = await db.counters.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"value": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["value"]
+
+async def ensure_invoice_counter(year: int):
+    """Start the year's counter after the highest invoice number already issued.
+
+    Once the counter exists it is the source of truth. Seeding compares numbers
+    numerically, since BB-YYYY-100000 sorts below BB-YYYY-99999 as a string.
+    """
+    if await db.counters.find_one({"_id": f"invoice-{year}"}, {"_id": 1}):
+        return
+    prefix = f"BB-{year}-"
+    result = await db.invoices.aggregate([
+        {"$match": {"invoice_number": {"$gte": prefix, "$lt": f"BB-{year}-\uffff"}}},
+        {"$group": {"_id": None, "highest": {"$max": {"$toInt": {"$substrCP": ["$invoice_number", len(prefix), 20]}}}}}
+    ]).to_list(1)
+    highest = result[0]["highest"] if result else 0
+    await db.counters.update_one({"_id": f"invoice-{year}"}, {"$max": {"value": highest}}, upsert=True)
+
+# Holds older than this whose holder is not a running billing run belong to a dead process
+INVOICE_HOLD_STALE_SECONDS = 3600
+
+def format_invoice_number(year: int, n: int) -> str:
+    return f"BB-{year}-{n:05d}"
+
+async def hold_invoice_numbers(holder: str, count: int) -> List[str]:
+    """Take count BB-YYYY-NNNNN invoice numbers for holder, re-issuing released numbers first.
+
+    The numbers are recorded under the holder in the same update that takes them
+    from the counter, so numbers a holder never put on an invoice go back to the
+    spare pool on release (or on resume, for a crashed billing run) instead of
+    leaving a gap in the sequence.
+    """
+    await release_invoice_numbers(holder)
+    year = datetime.now().year
+    spare = {"$ifNull": ["$spare", []]}
+    fresh = {"$subtract": [count, {"$size": "$_take"}]}
+    counter = await db.counters.find_one_and_update(
+        {"_id": f"invoice-{year}"},
+        [
+            {"$set": {"_take": {"$slice": [spare, count]}}},
+            {"$set": {"spare": {"$slice": [spare, {"$size": "$_take"}, {"$max": [{"$size": spare}, 1]}]}}},
+            {"$set": {"value": {"$add": [{"$ifNull": ["$value", 0]}, fresh]}}},
+            {"$set": {f"holds.{holder}": {
+                "numbers": {"$concatArrays": [
+                    "$_take",
+                    {"$range": [{"$add": [{"$subtract": ["$value", fresh]}, 1]}, {"$add": ["$value", 1]}]}
+                ]},
+                "held_at": datetime.now(timezone.utc).isoformat()
+            }}},
+            {"$unset": "_take"}
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return [format_invoice_number(year, n) for n in counter["holds"][holder]["numbers"]]
+
+async def release_invoice_numbers(holder: str):
+    """Drop the holder's hold, returning the numbers no invoice carries to the spare pool"""
+    counter = await db.counters.find_one({f"holds.{holder}": {"$exists": True}}, {f"holds.{holder}": 1})
+    if not counter:
+        return
+    year = int(counter["_id"].split("-")[1])
+    held = counter["holds"][holder]["numbers"]
+    used = set(await db.invoices.distinct(
+        "invoice_number", {"invoice_number": {"$in": [format_invoice_number(year, n) for n in held]}}
+    ))
+    unused = [n for n in held if format_invoice_number(year, n) not in used]
+    await db.counters.update_one(
+        {"_id": counter["_id"], f"holds.{holder}": {"$exists": True}},
+        {"$unset": {f"holds.{holder}": ""}, "$push": {"spare": {"$each": unused, "$sort": 1}}}
+    )
+
+async def release_stale_invoice_holds():
+    """Release holds left behind by a process that died between taking numbers and inserting"""
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=INVOICE_HOLD_STALE_SECONDS)).isoformat()
+    running = set(await db.billing_runs.distinct("id", {"status": BillingRunStatus.RUNNING}))
+    async for counter in db.counters.find({"holds": {"$exists": True}}, {"holds": 1}):
+        for holder, hold in counter["holds"].items():
+            if holder not in running and hold["held_at"] < cutoff:
+                await release_invoice_numbers(holder)
+
+# ============= BILLING RUNS (Admin) =============
+
+BILLING_RUN_BATCH_SIZE = 500
+BILLABLE_TENANT_STATUSES = [TenantStatus.APPROVED, TenantStatus.SUSPENDED]
+BILLING_RUN_LEASE_SECONDS = 300
+
+def billing_run_lease() -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=BILLING_RUN_LEASE_SECONDS)).isoformat()
+
+# Billing runs executing in this process, by run id
+billing_run_tasks: dict = {}
+
+async def claim_billing_run(run_id: str) -> Optional[dict]:
+    """Claim the run so only one worker executes it at a time.
+
+    While another lease is live (a worker elsewhere, or one left behind by a
+    crashed process) wait for it to expire and try again; None once the run is
+    no longer RUNNING.
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        run = await db.billing_runs.find_one_and_update(
+            {"id": run_id, "status": BillingRunStatus.RUNNING, "$or": [
+                {"lease_until": None},
+                {"lease_until": {"$lt": now.isoformat()}}
+            ]},
+            {"$set": {"lease_until": billing_run_lease()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if run:
+            return run
+        current = await db.billing_runs.find_one({"id": run_id}, {"_id": 0, "status": 1, "lease_until": 1})
+        if not current or current["status"] != BillingRunStatus.RUNNING:
+            return None
+        remaining = (datetime.fromisoformat(current["lease_until"]) - now).total_seconds() if current.get("lease_until") else 0
+        await asyncio.sleep(min(max(remaining, 1.0), BILLING_RUN_LEASE_SECONDS))
+
+async def execute_billing_run(run_id: str):
+    """Invoice every billable tenant for the run's period, resuming after last_tenant_id"""
+    try:
+        run = await claim_billing_run(run_id)
+    except asyncio.CancelledError:
+        billing_run_tasks.pop(run_id, None)
+        raise
+    if not run:
+        billing_run_tasks.pop(run_id, None)
+        return
+    period_start, period_end = run["period_start"], run["period_end"]
+    try:
+        usage_by_tenant = await get_usage_totals_by_tenant(period_start, period_end)
+        plans = {p["id"]: p async for p in db.pricing_plans.find({}, {"_id": 0})}
+        
+        tenant_query = {"$or": [
+            {"status": {"$in": BILLABLE_TENANT_STATUSES}},
+            {"id": {"$in": list(usage_by_tenant)}}
+        ]}
+        if not run.get("total_tenants"):
+            total_tenants = await db.tenants.count_documents(tenant_query)
+            await db.billing_runs.update_one({"id": run_id}, {"$set": {"total_tenants": total_tenants}})
+        if run.get("last_tenant_id"):
+            tenant_query = {"$and": [tenant_query, {"id": {"$gt": run["last_tenant_id"]}}]}
+        
+        cursor = db.tenants.find(tenant_query, {"_id": 0, "id": 1, "pricing_plan_id": 1}).sort("id", ASCENDING)
+        while True:
+            batch = await cursor.to_list(BILLING_RUN_BATCH_SIZE)
+            if not batch:
+                break
             
-            contact_response = await client.post(
-                "https://api.lexoffice.io/v1/contacts",
-                headers={"Authorization": f"Bearer {LEXOFFICE_API_KEY}", "Content-Type": "application/json"},
-                json=contact_payload
-            )
+            # Skips tenants invoiced manually for the period as well as any this run
+            # invoiced before a crash between insert and progress update
+            already_billed = set(await db.invoices.distinct(
+                "tenant_id",
+                {"tenant_id": {"$in": [t["id"] for t in batch]}, **invoiced_for_period(period_start, period_end)}
+            ))
+            candidates = []
+            for tenant in batch:
+                if tenant["id"] in already_billed:
+                    continue
+                minutes = usage_by_tenant.get(tenant["id"], {}).get("duration_seconds", 0) / 60
+                plan = plans.get(tenant.get("pricing_plan_id"))
+                if minutes > 0 or (plan and plan.get("monthly_fee", 0) > 0):
+                    candidates.append((tenant["id"], plan, minutes))
             
-            if contact_response.status_code in [200, 201]:
-                contact_data = contact_response.json()
-                await db.tenants.update_one(
-                    {"id": tenant["id"]},
-                    {"$set": {"lexoffice_contact_id": contact_data.get("id")}}
+            invoice_docs = []
+            if candidates:
+                numbers = await hold_invoice_numbers(run_id, len(candidates))
+                for (tenant_id, plan, minutes), invoice_number in zip(candidates, numbers):
+                    invoice_doc = build_invoice_doc(tenant_id, plan, minutes, period_start, period_end, invoice_number)
+                    invoice_doc["billing_run_id"] = run_id
+                    invoice_docs.append(invoice_doc)
+                try:
+                    await db.invoices.insert_many(invoice_docs, ordered=False)
+                except BulkWriteError as e:
+                    # Tenants invoiced manually since the check above keep that invoice
+                    errors = e.details.get("writeErrors", [])
+                    if e.details.get("writeConcernErrors") or any(err["code"] != 11000 for err in errors):
+                        raise
+                    duplicates = {err["index"] for err in errors}
+                    invoice_docs = [d for i, d in enumerate(invoice_docs) if i not in duplicates]
+                await release_invoice_numbers(run_id)
+                await bump_platform_stats(
+                    total_invoices=len(invoice_docs),
+                    total_revenue=sum(d["gross_amount"] for d in invoice_docs)
                 )
-                tenant["lexoffice_contact_id"] = contact_data.get("id")
-        
-        # Create invoice in Lexoffice
-        invoice_payload = {
-            "voucherDate": invoice["created_at"][:10],
-            "address": {
-                "contactId": tenant.get("lexoffice_contact_id")
-            },
-            "lineItems": [
+            
+            await db.billing_runs.update_one(
+                {"id": run_id},
                 {
-                    "type": "custom",
-                    "name": f"BuchungsButler Nutzung ({invoice['period_start'][:10]} - {invoice['period_end'][:10]})",
-                    "description": f"{invoice['total_minutes']:.2f} Minuten",
-                    "quantity": 1,
-                    "unitName": "Stück",
-                    "unitPrice": {
-                        "currency": "EUR",
-                        "netAmount": invoice["total_amount"],
-                        "taxRatePercentage": 19
-                    }
+                    "$set": {"last_tenant_id": batch[-1]["id"], "lease_until": billing_run_lease()},
+                    "$inc": {"processed_tenants": len(batch), "invoices_created": len(invoice_docs)}
                 }
-            ],
-            "totalPrice": {
-                "currency": "EUR"
-            },
-            "taxConditions": {
-                "taxType": "net"
-            },
-            "shippingConditions": {
-                "shippingDate": invoice["created_at"][:10],
-                "shippingType": "service"
-            }
-        }
-        
-        lexoffice_response = await client.post(
-            "https://api.lexoffice.io/v1/invoices",
-            headers={"Authorization": f"Bearer {LEXOFFICE_API_KEY}", "Content-Type": "application/json"},
-            json=invoice_payload
-        )
-        
-        if lexoffice_response.status_code not in [200, 201]:
-            logger.error(f"Lexoffice error: {lexoffice_response.text}")
-            raise HTTPException(status_code=400, detail=f"Lexoffice error: {lexoffice_response.text}")
-        
-        lexoffice_data = lexoffice_response.json()
-        now = datetime.now(timezone.utc).isoformat()
+            )
         
-        await db.invoices.update_one(
-            {"id": invoice_id},
+        await db.billing_runs.update_one(
+            {"id": run_id},
             {"$set": {
-                "lexoffice_id": lexoffice_data.get("id"),
-                "status": InvoiceStatus.SENT,
-                "sent_at": now
+                "status": BillingRunStatus.COMPLETED,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "lease_until": None
             }}
         )
-        
-        return {"message": "Invoice sent to Lexoffice", "lexoffice_id": lexoffice_data.get("id")}
+        logger.info(f"Billing run {run_id} completed")
+    except asyncio.CancelledError:
+        # Shutdown: hand the run back so the next process resumes it right away
+        await asyncio.shield(db.billing_runs.update_one({"id": run_id}, {"$set": {"lease_until": None}}))
+        raise
+    except Exception as e:
+        logger.error(f"Billing run {run_id} failed: {e}")
+        await db.billing_runs.update_one(
+            {"id": run_id},
+            {"$set": {"status": BillingRunStatus.FAILED, "error": str(e), "lease_until": None}}
+        )
+    finally:
+        billing_run_tasks.pop(run_id, None)
 
-# ============= TELEPHONY SETTINGS (Admin) =============
+def start_billing_run(run_id: str):
+    if run_id not in billing_run_tasks:
+        billing_run_tasks[run_id] = asyncio.create_task(execute_billing_run(run_id))
 
-@api_router.get("/admin/telephony-config")
-async def get_telephony_config(current_user: TokenData = Depends(require_super_admin)):
-    """Get telephony configuration"""
-    return {
+async def resume_billing_runs():
+    """Restart runs left in RUNNING state by a crashed or restarted process"""
+    async for run in db.billing_runs.find({"status": BillingRunStatus.RUNNING}, {"_id": 0, "id": 1}):
+        logger.info(f"Resuming billing run {run['id']}")
+        start_billing_run(run["id"])
+
+@api_router.post("/admin/billing-runs", response_model=BillingRunResponse)
+async def create_billing_run(
+    period_start: str,
+    period_end: str,
+    current_user: TokenData = Depends(require_super_admin)
+):
+    """Invoice all tenants for a period in one background run (returns the existing run for the same period)"""
+    existing = await db.billing_runs.find_one({"period_start": period_start, "period_end": period_end}, {"_id": 0})
+    if existing:
+        return BillingRunResponse(**existing)
+    
+    # Validate the period before anything is stored
+    try:
+        date.fromisoformat(period_start[:10])
+        date.fromisoformat(period_end[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid period, expected ISO dates")
+    
+    run_doc = {
+        "id": str(uuid.uuid4()),
+        "period_start": period_start,
+        "period_end": period_end,
+        "status": BillingRunStatus.RUNNING,
+        "total_tenants": 0,
+        "processed_tenants": 0,
+        "invoices_created": 0,
+        "last_tenant_id": None,
+        "lease_until": None,
+        "error": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "completed_at": None
+    }
+    await db.billing_runs.insert_one(run_doc)
+    start_billing_run(run_doc["id"])
+    return BillingRunResponse(**run_doc)
+
+@api_router.get("/admin/billing-runs", response_model=List[BillingRunResponse])
+async def get_billing_runs(current_user: TokenData = Depends(require_super_admin)):
+    """List billing runs"""
+    runs = await db.billing_runs.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+    return [BillingRunResponse(**r) for r in runs]
+
+@api_router.get("/admin/billing-runs/{run_id}", response_model=BillingRunResponse)
+async def get_billing_run(run_id: str, current_user: TokenData = Depends(require_super_admin)):
+    """Get billing run progress"""
+    run = await db.billing_runs.find_one({"id": run_id}, {"_id": 0})
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    return BillingRunResponse(**run)
+
+@api_router.post("/admin/billing-runs/{run_id}/resume", response_model=BillingRunResponse)
+async def resume_billing_run(run_id: str, current_user: TokenData = Depends(require_super_admin)):
+    """Resume a failed billing run from where it stopped"""
+    run = await db.billing_runs.find_one({"id": run_id}, {"_id": 0})
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    if run["status"] == BillingRunStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Billing run already completed")
+    
+    await db.billing_runs.update_one(
+        {"id": run_id},
+        {"$set": {"status": BillingRunStatus.RUNNING, "error": None}}
+    )
+    start_billing_run(run_id)
+    run.update({"status": BillingRunStatus.RUNNING, "error": None})
+    return BillingRunResponse(**run)
+
+def build_lexoffice_contact_payload(tenant: dict) -> dict:
+    return {
+        "version": 0,
+        "roles": {"customer": {}},
+        "company": {
+            "name": tenant["company_name"],
+            "taxNumber": tenant.get("tax_number"),
+            "vatRegistrationId": tenant.get("vat_id"),
+            "contactPersons": [{
+                "firstName": tenant["contact_person"].split()[0] if " " in tenant["contact_person"] else tenant["contact_person"],
+                "lastName": tenant["contact_person"].split()[-1] if " " in tenant["contact_person"] else "",
+                "emailAddress": tenant["email"],
+                "phoneNumber": tenant["phone"]
+            }]
+        },
+        "addresses": {
+            "billing": [{
+                "street": f"{tenant['street']} {tenant['house_number']}",
+                "zip": tenant["postal_code"],
+                "city": tenant["city"],
+                "countryCode": "DE"
+            }]
+        },
+        "emailAddresses": {"business": [tenant["email"]]}
+    }
+
+def build_lexoffice_invoice_payload(invoice: dict, contact_id: Optional[str]) -> dict:
+    return {
+        "voucherDate": invoice["created_at"][:10],
+        "address": {
+            "contactId": contact_id
+        },
+        "lineItems": [
+            {
+                "type": "custom",
+                "name": f"BuchungsButler Nutzung ({invoice['period_start'][:10]} - {invoice['period_end'][:10]})",
+                "description": f"{invoice['total_minutes']:.2f} Minuten",
+                "quantity": 1,
+                "unitName": "Stück",
+                "unitPrice": {
+                    "currency": "EUR",
+                    "netAmount": invoice["total_amount"],
+                    "taxRatePercentage": 19
+                }
+            }
+        ],
+        "totalPrice": {
+            "currency": "EUR"
+        },
+        "taxConditions": {
+            "taxType": "net"
+        },
+        "shippingConditions": {
+            "shippingDate": invoice["created_at"][:10],
+            "shippingType": "service"
+        }
+    }
+
+class LexofficeError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+    
+    @property
+    def retryable(self) -> bool:
+        """Safe to submit again: Lexoffice rejected the request without creating anything"""
+        return self.status_code in LexofficeClient.UNPROCESSED_STATUSES
+    
+    @property
+    def upstream_failure(self) -> bool:
+        return self.status_code in LexofficeClient.RETRY_STATUSES
+
+# Serializes contact creation per tenant so concurrent submissions create one Lexoffice contact
+lexoffice_contact_locks: dict = {}
+
+async def ensure_lexoffice_contact(tenant: dict) -> Optional[str]:
+    """Return the tenant's Lexoffice contact id, creating the contact once if needed"""
+    if tenant.get("lexoffice_contact_id"):
+        return tenant["lexoffice_contact_id"]
+    
+    lock = lexoffice_contact_locks.setdefault(tenant["id"], asyncio.Lock())
+    async with lock:
+        current = await db.tenants.find_one({"id": tenant["id"]}, {"_id": 0, "lexoffice_contact_id": 1})
+        if current and current.get("lexoffice_contact_id"):
+            tenant["lexoffice_contact_id"] = current["lexoffice_contact_id"]
+            return tenant["lexoffice_contact_id"]
+        
+        contact_response = await get_lexoffice_client().create_contact(build_lexoffice_contact_payload(tenant))
+        if contact_response.status_code in [200, 201]:
+            contact_data = contact_response.json()
+            await db.tenants.update_one(
+                {"id": tenant["id"]},
+                {"$set": {"lexoffice_contact_id": contact_data.get("id")}}
+            )
+            tenant["lexoffice_contact_id"] = contact_data.get("id")
+        elif contact_response.status_code in LexofficeClient.RETRY_STATUSES:
+            raise LexofficeError(contact_response.status_code, contact_response.text)
+    return tenant.get("lexoffice_contact_id")
+
+async def submit_invoice_to_lexoffice(invoice: dict, tenant: dict) -> str:
+    """Create the invoice in Lexoffice and mark it SENT; returns the Lexoffice id"""
+    contact_id = await ensure_lexoffice_contact(tenant)
+    lexoffice_response = await get_lexoffice_client().create_invoice(
+        build_lexoffice_invoice_payload(invoice, contact_id)
+    )
+    if lexoffice_response.status_code not in [200, 201]:
+        raise LexofficeError(lexoffice_response.status_code, lexoffice_response.text)
+    
+    lexoffice_id = lexoffice_response.json().get("id")
+    await db.invoices.update_one(
+        {"id": invoice["id"]},
+        {"$set": {
+            "lexoffice_id": lexoffice_id,
+            "status": InvoiceStatus.SENT,
+            "sent_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    return lexoffice_id
+
+@api_router.post("/admin/invoices/{invoice_id}/send-lexoffice")
+async def send_invoice_to_lexoffice(invoice_id: str, current_user: TokenData = Depends(require_super_admin)):
+    """Send invoice to Lexoffice and email to customer"""
+    invoice = await db.invoices.find_one({"id": invoice_id}, {"_id": 0})
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    
+    tenant = await db.tenants.find_one({"id": invoice["tenant_id"]}, {"_id": 0})
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    
+    if not LEXOFFICE_API_KEY:
+        raise HTTPException(status_code=400, detail="Lexoffice API key not configured")
+    if invoice.get("status") == InvoiceStatus.SENT:
+        raise HTTPException(status_code=409, detail="Invoice already sent to Lexoffice")
+    
+    # Take the invoice's outbox job so the background dispatcher cannot submit it at the same time
+    job = await claim_outbox_job_for_invoice(invoice)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Invoice is already being sent to Lexoffice")
+    
+    try:
+        lexoffice_id = await submit_invoice_to_lexoffice(invoice, tenant)
+    except LexofficeError as e:
+        PROVIDER_ERRORS.inc(provider="lexoffice")
+        logger.error(f"Lexoffice error: {e.message}")
+        await finish_outbox_job(job["id"], OutboxStatus.FAILED, error=f"Lexoffice error: {e.message}")
+        # Upstream throttling/outage persisted through retries: report as a gateway error, not a bad request
+        raise HTTPException(status_code=502 if e.upstream_failure else 400, detail=f"Lexoffice error: {e.message}")
+    except BaseException as e:
+        await asyncio.shield(finish_outbox_job(job["id"], OutboxStatus.FAILED, error=f"Outcome unknown, check Lexoffice before retrying: {e!r}"))
+        raise
+    
+    await finish_outbox_job(job["id"], OutboxStatus.SENT, lexoffice_id=lexoffice_id)
+    return {"message": "Invoice sent to Lexoffice", "lexoffice_id": lexoffice_id}
+
+# ============= LEXOFFICE OUTBOX (Admin) =============
+
+lexoffice_outbox_wakeup = asyncio.Event()
+
+OUTBOX_LEASE = timedelta(minutes=5)
+
+def outbox_job_doc(invoice: dict, status: OutboxStatus, now: datetime) -> dict:
+    processing = status == OutboxStatus.PROCESSING
+    return {
+        "id": str(uuid.uuid4()),
+        "invoice_id": invoice["id"],
+        "tenant_id": invoice["tenant_id"],
+        "status": status,
+        "attempts": 1 if processing else 0,
+        "last_error": None,
+        "lexoffice_id": None,
+        "lease_until": (now + OUTBOX_LEASE).isoformat() if processing else None,
+        "next_attempt_at": now.isoformat(),
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat()
+    }
+
+async def enqueue_lexoffice_invoices(invoices: List[dict]) -> int:
+    """Add invoices to the outbox; invoices already queued are left untouched"""
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"invoice_id": invoice["id"]},
+            {"$setOnInsert": outbox_job_doc(invoice, OutboxStatus.PENDING, now)},
+            upsert=True
+        )
+        for invoice in invoices
+    ]
+    if not operations:
+        return 0
+    result = await db.lexoffice_outbox.bulk_write(operations, ordered=False)
+    lexoffice_outbox_wakeup.set()
+    return result.upserted_count
+
+async def claim_outbox_job() -> Optional[dict]:
+    """Atomically take the next due job (or one whose worker lease expired)"""
+    now = datetime.now(timezone.utc)
+    return await db.lexoffice_outbox.find_one_and_update(
+        {"$or": [
+            {"status": OutboxStatus.PENDING, "next_attempt_at": {"$lte": now.isoformat()}},
+            {"status": OutboxStatus.PROCESSING, "lease_until": {"$lt": now.isoformat()}}
+        ]},
+        {
+            "$set": {
+                "status": OutboxStatus.PROCESSING,
+                "lease_until": (now + OUTBOX_LEASE).isoformat(),
+                "updated_at": now.isoformat()
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("next_attempt_at", ASCENDING)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def claim_outbox_job_for_invoice(invoice: dict) -> Optional[dict]:
+    """Create or take over the invoice's outbox job for an inline submission; None while it is in flight or sent"""
+    now = datetime.now(timezone.utc)
+    job = outbox_job_doc(invoice, OutboxStatus.PROCESSING, now)
+    result = await db.lexoffice_outbox.update_one({"invoice_id": invoice["id"]}, {"$setOnInsert": job}, upsert=True)
+    if result.upserted_id is not None:
+        return job
+    return await db.lexoffice_outbox.find_one_and_update(
+        {"invoice_id": invoice["id"], "$or": [
+            {"status": {"$in": [OutboxStatus.PENDING, OutboxStatus.FAILED]}},
+            {"status": OutboxStatus.PROCESSING, "lease_until": {"$lt": now.isoformat()}}
+        ]},
+        {
+            "$set": {"status": OutboxStatus.PROCESSING, "lease_until": job["lease_until"], "updated_at": now.isoformat()},
+            "$inc": {"attempts": 1}
+        },
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def finish_outbox_job(job_id: str, status: OutboxStatus, lexoffice_id: Optional[str] = None,
+                            error: Optional[str] = None, next_attempt_at: Optional[str] = None):
+    update = {
+        "status": status,
+        "last_error": error,
+        "lease_until": None,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    if lexoffice_id is not None:
+        update["lexoffice_id"] = lexoffice_id
+    if next_attempt_at is not None:
+        update["next_attempt_at"] = next_attempt_at
+    await db.lexoffice_outbox.update_one({"id": job_id}, {"$set": update})
+
+async def process_outbox_job(job: dict):
+    now = datetime.now(timezone.utc)
+    try:
+        invoice = await db.invoices.find_one({"id": job["invoice_id"]}, {"_id": 0})
+        tenant = await db.tenants.find_one({"id": job["tenant_id"]}, {"_id": 0})
+        if not invoice or not tenant:
+            raise LexofficeError(404, "Invoice or tenant not found")
+        
+        lexoffice_id = invoice.get("lexoffice_id") if invoice.get("status") == InvoiceStatus.SENT else None
+        if lexoffice_id is None:
+            lexoffice_id = await submit_invoice_to_lexoffice(invoice, tenant)
+        
+        await finish_outbox_job(job["id"], OutboxStatus.SENT, lexoffice_id=lexoffice_id)
+    except (LexofficeError, httpx.HTTPError) as e:
+        retryable = e.retryable if isinstance(e, LexofficeError) else isinstance(e, LexofficeClient.UNSENT_ERRORS)
+        give_up = not retryable or job["attempts"] >= LEXOFFICE_OUTBOX_MAX_ATTEMPTS
+        delay = min(3600, 30 * (2 ** (job["attempts"] - 1)))
+        error = str(e)
+        if not retryable and (not isinstance(e, LexofficeError) or e.upstream_failure):
+            # Timeout or 5xx: the invoice may exist in Lexoffice already, so an admin has to check before retrying
+            error = f"Outcome unknown, check Lexoffice before retrying: {e}"
+        PROVIDER_ERRORS.inc(provider="lexoffice")
+        logger.warning(f"Lexoffice outbox job {job['id']} attempt {job['attempts']} failed: {e}")
+        await finish_outbox_job(
+            job["id"], OutboxStatus.FAILED if give_up else OutboxStatus.PENDING,
+            error=error, next_attempt_at=(now + timedelta(seconds=delay)).isoformat()
+        )
+    except PyMongoError as e:
+        # Our own database hiccup: nothing was sent if it happened before submission, and a
+        # SENT invoice is recognized on the next attempt, so retry like a transient error
+        logger.error(f"Lexoffice outbox job {job['id']} database error: {e}")
+        await finish_outbox_job(
+            job["id"], OutboxStatus.FAILED if job["attempts"] >= LEXOFFICE_OUTBOX_MAX_ATTEMPTS else OutboxStatus.PENDING,
+            error=f"Database error: {e}", next_attempt_at=(now + timedelta(seconds=60)).isoformat()
+        )
+    except Exception as e:
+        # Bad data (e.g. a tenant without contact_person/street): retrying cannot help
+        logger.error(f"Lexoffice outbox job {job['id']} failed: {e!r}")
+        await finish_outbox_job(job["id"], OutboxStatus.FAILED, error=f"{type(e).__name__}: {e}")
+
+async def run_lexoffice_dispatcher():
+    """Drain the outbox with bounded parallelism; wakes on enqueue or every few seconds"""
+    in_flight = set()
+    
+    def finished(task):
+        in_flight.discard(task)
+        lexoffice_outbox_wakeup.set()
+    
+    while True:
+        try:
+            if LEXOFFICE_API_KEY:
+                while len(in_flight) < LEXOFFICE_OUTBOX_CONCURRENCY:
+                    job = await claim_outbox_job()
+                    if job is None:
+                        break
+                    task = asyncio.create_task(process_outbox_job(job))
+                    in_flight.add(task)
+                    task.add_done_callback(finished)
+        except Exception as e:
+            logger.error(f"Lexoffice dispatcher error: {e}")
+        
+        lexoffice_outbox_wakeup.clear()
+        try:
+            await asyncio.wait_for(lexoffice_outbox_wakeup.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+
+@api_router.post("/admin/invoices/send-lexoffice")
+async def enqueue_invoices_for_lexoffice(
+    request: LexofficeEnqueueRequest,
+    current_user: TokenData = Depends(require_super_admin)
+):
+    """Queue many invoices for background submission to Lexoffice"""
+    if not LEXOFFICE_API_KEY:
+        raise HTTPException(status_code=400, detail="Lexoffice API key not configured")
+    
+    query = {"status": InvoiceStatus.CREATED}
+    if not request.all_created:
+        query["id"] = {"$in": request.invoice_ids}
+    invoices = await db.invoices.find(query, {"_id": 0, "id": 1, "tenant_id": 1}).to_list(None)
+    
+    queued = await enqueue_lexoffice_invoices(invoices)
+    return {"message": f"{queued} Rechnungen zur Übermittlung eingeplant", "queued": queued, "matched": len(invoices)}
+
+@api_router.get("/admin/lexoffice-outbox", response_model=List[LexofficeOutboxResponse])
+async def get_lexoffice_outbox(
+    status: Optional[str] = None,
+    current_user: TokenData = Depends(require_super_admin)
+):
+    """List Lexoffice outbox jobs"""
+    query = {}
+    if status:
+        query["status"] = status
+    jobs = await db.lexoffice_outbox.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    return [LexofficeOutboxResponse(**j) for j in jobs]
+
+@api_router.post("/admin/lexoffice-outbox/{job_id}/retry")
+async def retry_lexoffice_outbox_job(job_id: str, current_user: TokenData = Depends(require_super_admin)):
+    """Put a failed outbox job back in the queue"""
+    result = await db.lexoffice_outbox.update_one(
+        {"id": job_id, "status": OutboxStatus.FAILED},
+        {"$set": {
+            "status": OutboxStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=404, detail="Failed job not found")
+    lexoffice_outbox_wakeup.set()
+    return {"message": "Job requeued"}
+
+# ============= TELEPHONY SETTINGS (Admin) =============
+
+@api_router.get("/admin/telephony-config")
+async def get_telephony_config(current_user: TokenData = Depends(require_super_admin)):
+    """Get telephony configuration"""
+    return {
         "twilio": {
             "configured": bool(TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN),
             "phone_number": TWILIO_PHONE_NUMBER or None
@@ -886,21 +2483,27 @@ async def get_tenant_usage(current_user: TokenData = Depends(require_approved_te
     now = datetime.now(timezone.utc)
     month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc).isoformat()
     
-    usage_records = await db.usage_records.find({
-        "tenant_id": current_user.tenant_id,
-        "timestamp": {"$gte": month_start}
-    }, {"_id": 0}).to_list(10000)
-    
-    total_seconds = sum([r.get("duration_seconds", 0) for r in usage_records])
-    total_minutes = total_seconds / 60
+    rollup, tenant = await gather_queries(
+        db.usage_rollups.find_one(
+            {"tenant_id": current_user.tenant_id, "period": "month", "bucket": month_start[:7]},
+            {"_id": 0}
+        ),
+        db.tenants.find_one(
+            {"id": current_user.tenant_id},
+            {"_id": 0, "minutes_balance": 1, "minutes_reserved": 1, "metered": 1}
+        )
+    )
+    rollup = rollup or {}
     
-    tenant = await db.tenants.find_one({"id": current_user.tenant_id}, {"_id": 0})
+    total_minutes = rollup.get("duration_seconds", 0) / 60
     minutes_balance = tenant.get("minutes_balance", 0)
     
     return {
         "current_month_minutes": round(total_minutes, 2),
         "minutes_balance": minutes_balance,
-        "total_calls": len(usage_records)
+        "minutes_reserved": tenant.get("minutes_reserved", 0),
+        "metered": tenant.get("metered", False),
+        "total_calls": rollup.get("calls", 0)
     }
 
 @api_router.get("/pricing-plans")
@@ -926,6 +2529,7 @@ async def select_pricing_plan(plan_id: str, current_user: TokenData = Depends(re
         {"id": current_user.tenant_id},
         {"$set": {"pricing_plan_id": plan_id}}
     )
+    tenant_cache.invalidate(current_user.tenant_id)
     
     return {"message": "Plan selected", "plan": plan}
 
@@ -936,11 +2540,12 @@ async def buy_minute_package(package_id: str, current_user: TokenData = Depends(
     if not package:
         raise HTTPException(status_code=404, detail="Package not found")
     
-    # Add minutes to balance
+    # Add minutes to balance; from the first package on, calls are metered against it
     await db.tenants.update_one(
         {"id": current_user.tenant_id},
-        {"$inc": {"minutes_balance": package["minutes"]}}
+        {"$inc": {"minutes_balance": package["minutes"]}, "$set": {"metered": True}}
     )
+    tenant_cache.invalidate(current_user.tenant_id)
     
     # Record purchase
     purchase_id = str(uuid.uuid4())
@@ -984,7 +2589,7 @@ async def create_user(user: UserCreate, current_user: TokenData = Depends(requir
         raise HTTPException(status_code=400, detail="Maximum 2 users per tenant allowed")
     
     existing = await db.users.find_one({"email": user.email})
-    if existing:
+    if existing or await db.super_admins.find_one({"email": user.email}, {"_id": 1}):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_id = str(uuid.uuid4())
@@ -995,12 +2600,13 @@ async def create_user(user: UserCreate, current_user: TokenData = Depends(requir
         "tenant_id": current_user.tenant_id,
         "email": user.email,
         "username": user.username,
-        "hashed_password": get_password_hash(user.password),
+        "hashed_password": await get_password_hash_async(user.password),
         "is_active": True,
         "is_admin": False,
         "created_at": now
     }
     await db.users.insert_one(user_doc)
+    await bump_platform_stats(total_users=1)
     
     return UserResponse(**{k: v for k, v in user_doc.items() if k != "hashed_password"})
 
@@ -1017,6 +2623,8 @@ async def delete_user(user_id: str, current_user: TokenData = Depends(require_ap
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    token_cache.revoke_user(user_id)
+    await bump_platform_stats(total_users=-1)
     
     return {"message": "User deleted"}
 
@@ -1121,35 +2729,241 @@ async def delete_appointment(appointment_id: str, current_user: TokenData = Depe
     
     return {"message": "Appointment deleted"}
 
+# ============= CALL TIMING =============
+
+class CallTimer:
+    """Monotonic per-stage timings for one voice turn.
+
+    Stages accumulate (TTS runs once per sentence, and may overlap the LLM in
+    streaming mode); marks are offsets from the start of the turn.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict = {}
+        self.marks: dict = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            VOICE_STAGE_SECONDS.observe(elapsed, stage=name)
+    
+    def mark(self, name: str):
+        self.marks.setdefault(name, time.perf_counter() - self.started)
+    
+    def to_doc(self) -> dict:
+        """Millisecond breakdown stored on the conversation and returned to clients"""
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+            "marks_ms": {name: round(seconds * 1000, 1) for name, seconds in self.marks.items()},
+        }
+
+# MPEG audio Layer III bitrates (kbps) by bitrate index, for MPEG-1 and MPEG-2/2.5
+MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def mp3_duration_seconds(data: Optional[bytes]) -> float:
+    """Playback length of MP3 audio, summed over its frame headers"""
+    if not data:
+        return 0.0
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        offset = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    
+    seconds = 0.0
+    while offset + 4 <= len(data):
+        b1, b2 = data[offset + 1], data[offset + 2]
+        version = (b1 >> 3) & 0x03  # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+        bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 0x03
+        if (data[offset] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or ((b1 >> 1) & 0x03) != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            offset += 1  # not a Layer III frame header: resync
+            continue
+        mpeg1 = version == 3
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if mpeg1 else 576
+        seconds += samples / sample_rate
+        offset += samples // 8 * MP3_BITRATES[mpeg1][bitrate_index] * 1000 // sample_rate + ((b2 >> 1) & 0x01)
+    return seconds
+
+def billable_seconds(caller_audio_seconds: Optional[float], agent_audio: List[Optional[bytes]]) -> float:
+    """A turn is billed on its audio: the caller's utterance plus the synthesized reply"""
+    return round((caller_audio_seconds or 0) + sum(mp3_duration_seconds(audio) for audio in agent_audio), 2)
+
+# Caller audio is measured on the server; the client's own figure is never billed.
+MAX_CALLER_AUDIO_SECONDS = 600
+SPOKEN_WORDS_PER_SECOND = 2.5  # floor for turns without measured audio (~150 words per minute)
+AUDIO_RECEIPT_EXPIRE_MINUTES = 15
+WEBM_CONTAINERS = {0x18538067, 0x1F43B675, 0x1549A966, 0xA0}  # Segment, Cluster, Info, BlockGroup
+
+def read_ebml_vint(data: bytes, pos: int, keep_marker: bool = False) -> Tuple[int, int]:
+    first = data[pos]
+    length, mask = 1, 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError("invalid EBML variable-length integer")
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    return value, length
+
+def webm_duration_seconds(data: bytes) -> float:
+    """Length of WebM/Matroska audio: the Duration header or, for recorder output without one, the last block timecode"""
+    scale, header_duration, cluster_time, last_time = 1_000_000, 0.0, 0, 0
+    pos = 0
+    try:
+        while pos < len(data):
+            element_id, id_length = read_ebml_vint(data, pos, keep_marker=True)
+            size, size_length = read_ebml_vint(data, pos + id_length)
+            start = pos + id_length + size_length
+            if element_id in WEBM_CONTAINERS:
+                pos = start  # descend; siblings follow the children in a flat scan
+                continue
+            if size == (1 << (7 * size_length)) - 1 or start + size > len(data):
+                break  # unknown-size or truncated leaf
+            payload = data[start:start + size]
+            if element_id == 0x2AD7B1:  # TimecodeScale (ns)
+                scale = int.from_bytes(payload, "big") or scale
+            elif element_id == 0x4489 and size in (4, 8):  # Duration (float, in TimecodeScale units)
+                header_duration = struct.unpack(">f" if size == 4 else ">d", payload)[0]
+            elif element_id == 0xE7:  # Cluster Timecode
+                cluster_time = int.from_bytes(payload, "big")
+            elif element_id in (0xA3, 0xA1):  # SimpleBlock / Block: track vint, then int16 relative timecode
+                _, track_length = read_ebml_vint(payload, 0)
+                relative = int.from_bytes(payload[track_length:track_length + 2], "big", signed=True)
+                last_time = max(last_time, cluster_time + relative)
+            pos = start + size
+    except (ValueError, IndexError, struct.error):
+        pass
+    return max(header_duration, last_time) * scale / 1e9
+
+def wav_duration_seconds(data: bytes) -> float:
+    """Length of PCM WAV audio from its fmt byte rate and data chunk size"""
+    byte_rate, pos = 0, 12
+    while pos + 8 <= len(data):
+        chunk_id, chunk_size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], "little")
+        if chunk_id == b"fmt " and chunk_size >= 12:
+            byte_rate = int.from_bytes(data[pos + 16:pos + 20], "little")
+        elif chunk_id == b"data" and byte_rate:
+            return min(chunk_size, len(data) - pos - 8) / byte_rate
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return 0.0
+
+def caller_audio_seconds(data: Optional[bytes]) -> float:
+    """Server-measured length of an uploaded utterance (WebM, WAV or MP3; 0 when unknown)"""
+    if not data:
+        return 0.0
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        seconds = webm_duration_seconds(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        seconds = wav_duration_seconds(data)
+    else:
+        seconds = mp3_duration_seconds(data)
+    return round(min(seconds, MAX_CALLER_AUDIO_SECONDS), 2)
+
+def spoken_seconds_estimate(text: str) -> float:
+    """Lower bound for how long it takes to say `text`, used when no measured audio backs a turn"""
+    return round(min(len(text.split()) / SPOKEN_WORDS_PER_SECOND, MAX_CALLER_AUDIO_SECONDS), 2)
+
+def transcription_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+def issue_audio_receipt(tenant_id: str, transcription: str, seconds: float) -> str:
+    """Signed, server-measured caller audio length for one transcription, redeemed by /voice/process"""
+    expire = datetime.now(timezone.utc) + timedelta(minutes=AUDIO_RECEIPT_EXPIRE_MINUTES)
+    return jwt.encode(
+        {"typ": "audio_receipt", "tenant_id": tenant_id, "txh": transcription_digest(transcription), "dur": seconds, "exp": expire},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+
+def caller_seconds_for_turn(tenant_id: str, transcription: str, receipt: Optional[str]) -> float:
+    """Measured caller audio from a valid receipt for this tenant and text, else the spoken-length floor"""
+    floor = spoken_seconds_estimate(transcription)
+    if not receipt:
+        return floor
+    try:
+        claims = jwt.decode(receipt, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return floor
+    if (claims.get("typ") != "audio_receipt" or claims.get("tenant_id") != tenant_id
+            or claims.get("txh") != transcription_digest(transcription)):
+        return floor
+    return max(float(claims.get("dur") or 0), floor)
+
 # ============= VOICE AGENT ENDPOINTS =============
 
+@functools.lru_cache(maxsize=None)
+def provider_params(func) -> dict:
+    """Signature parameters of a provider helper (cached, used to pick the in-memory path)"""
+    try:
+        return dict(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return {}
+
+def write_temp_audio(audio_bytes: bytes, suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=AUDIO_TMP_DIR)
+    with os.fdopen(fd, "wb") as f:
+        f.write(audio_bytes)
+    return path
+
+def read_temp_audio(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+def remove_temp_audio(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
 async def transcribe_audio_whisper(audio_bytes: bytes) -> str:
     """Transcribe audio using OpenAI Whisper via Emergent"""
     try:
         from emergentintegrations.llm.openai import transcribe_audio
-        import tempfile
         
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as f:
-            f.write(audio_bytes)
-            temp_path = f.name
-        
-        result = await transcribe_audio(
-            emergent_api_key=EMERGENT_LLM_KEY,
-            audio_file_path=temp_path
-        )
+        if "audio_file" in provider_params(transcribe_audio):
+            audio_file = io.BytesIO(audio_bytes)
+            audio_file.name = "audio.webm"
+            result = await transcribe_audio(
+                emergent_api_key=EMERGENT_LLM_KEY,
+                audio_file=audio_file
+            )
+        else:
+            # Provider needs a path: write to tmpfs off the event loop
+            temp_path = await asyncio.to_thread(write_temp_audio, audio_bytes, ".webm")
+            try:
+                result = await transcribe_audio(
+                    emergent_api_key=EMERGENT_LLM_KEY,
+                    audio_file_path=temp_path
+                )
+            finally:
+                await asyncio.to_thread(remove_temp_audio, temp_path)
         
-        os.unlink(temp_path)
         return result if result else ""
     except Exception as e:
+        PROVIDER_ERRORS.inc(provider="whisper")
         logger.error(f"Whisper transcription error: {e}")
         return ""
 
-async def generate_ai_response(transcription: str, calendar_context: str) -> dict:
-    """Generate AI response using GPT via Emergent - Multilingual support"""
-    try:
-        from emergentintegrations.llm.openai import chat_completion, Message
-        
-        system_prompt = f"""Du bist ein professioneller, mehrsprachiger KI-Telefonassistent für Terminbuchungen.
+AI_FALLBACK_RESPONSE = "Entschuldigung, ich konnte Ihre Anfrage nicht verarbeiten. Sorry, I could not process your request."
+
+def build_system_prompt(calendar_context: str) -> str:
+    """Build the multilingual system prompt for the voice agent"""
+    return f"""Du bist ein professioneller, mehrsprachiger KI-Telefonassistent für Terminbuchungen.
 
 WICHTIGE REGELN:
 1. SPRACHE: Antworte IMMER in der Sprache des Anrufers (Deutsch, Englisch, Französisch, Spanisch, Italienisch, Türkisch, Polnisch, Russisch, Arabisch, etc.)
@@ -1173,8 +2987,13 @@ Du: "Of course! I'd be happy to help you schedule an appointment for Monday. Wha
 
 Antworte kurz und natürlich, da dies eine Sprachausgabe ist."""
 
+async def generate_ai_response(transcription: str, calendar_context: str) -> dict:
+    """Generate AI response using GPT via Emergent - Multilingual support"""
+    try:
+        from emergentintegrations.llm.openai import chat_completion, Message
+        
         messages = [
-            Message(role="system", content=system_prompt),
+            Message(role="system", content=build_system_prompt(calendar_context)),
             Message(role="user", content=transcription)
         ]
         
@@ -1186,34 +3005,321 @@ Antworte kurz und natürlich, da dies eine Sprachausgabe ist."""
         
         return {"success": True, "response": response, "calendar_action": None}
     except Exception as e:
+        PROVIDER_ERRORS.inc(provider="llm")
         logger.error(f"GPT response error: {e}")
-        return {"success": False, "response": "Entschuldigung, ich konnte Ihre Anfrage nicht verarbeiten. Sorry, I could not process your request.", "calendar_action": None}
+        return {"success": False, "response": AI_FALLBACK_RESPONSE, "calendar_action": None}
 
-async def generate_tts_audio(text: str) -> Optional[str]:
-    """Generate TTS audio using OpenAI via Emergent"""
-    try:
-        from emergentintegrations.llm.openai import text_to_speech
-        import tempfile
-        
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-            audio_path = f.name
+async def synthesize_speech(text: str) -> bytes:
+    """Synthesize MP3 audio using OpenAI TTS via Emergent"""
+    from emergentintegrations.llm.openai import text_to_speech
+    
+    output_param = provider_params(text_to_speech).get("output_file_path")
+    if output_param is not None and output_param.default is inspect.Parameter.empty:
+        # Provider needs a path: let it write to tmpfs and read back off the event loop
+        fd, audio_path = await asyncio.to_thread(tempfile.mkstemp, ".mp3", None, AUDIO_TMP_DIR)
+        os.close(fd)
+        try:
+            await text_to_speech(
+                emergent_api_key=EMERGENT_LLM_KEY,
+                text=text,
+                output_file_path=audio_path,
+                voice=TTS_VOICE
+            )
+            return await asyncio.to_thread(read_temp_audio, audio_path)
+        except BaseException:
+            await asyncio.to_thread(remove_temp_audio, audio_path)
+            raise
+    
+    return await text_to_speech(
+        emergent_api_key=EMERGENT_LLM_KEY,
+        text=text,
+        voice=TTS_VOICE
+    )
+
+def normalize_tts_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+class TTSCache:
+    """Content-addressed TTS audio cache: LRU memory tier in front of a size-bounded disk tier.
+
+    The disk tier's sizes and recency are tracked in memory (seeded by one scan
+    on the first write), so eviction removes only the oldest files instead of
+    re-listing the cache directory on every miss.
+    """
+    
+    def __init__(self, directory: Path, memory_bytes: int, disk_bytes: int):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._inflight: dict = {}
+        self._disk_lock = asyncio.Lock()
+        self._disk_index: "Optional[OrderedDict[str, int]]" = None
+        self._disk_size = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(text: str, voice: str = TTS_VOICE, audio_format: str = TTS_FORMAT) -> str:
+        payload = f"{voice}\x00{audio_format}\x00{normalize_tts_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{TTS_FORMAT}"
+    
+    def _remember(self, key: str, audio_bytes: bytes):
+        if len(audio_bytes) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio_bytes
+        self._memory_size += len(audio_bytes)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+    
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            audio_bytes = path.read_bytes()
+            os.utime(path)  # mark as recently used for eviction
+            return audio_bytes
+        except FileNotFoundError:
+            return None
+    
+    def _write_disk(self, key: str, audio_bytes: bytes):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        partial.write_bytes(audio_bytes)
+        os.replace(partial, path)
+    
+    def _scan_disk(self) -> List[Tuple[str, int]]:
+        """Existing files as (key, size), least recently used first"""
+        entries = []
+        for path in self.directory.glob(f"*/*.{TTS_FORMAT}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        return [(key, size) for _, key, size in entries]
+    
+    def _unlink_disk(self, keys: List[str]):
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _track_disk(self, key: str, size: int) -> List[str]:
+        """Record a written file and return the keys to evict to get back under the size bound"""
+        previous = self._disk_index.pop(key, None)
+        if previous is not None:
+            self._disk_size -= previous
+        self._disk_index[key] = size
+        self._disk_size += size
+        evicted = []
+        while self._disk_size > self.disk_bytes and self._disk_index:
+            victim, victim_size = self._disk_index.popitem(last=False)
+            self._disk_size -= victim_size
+            evicted.append(victim)
+        return evicted
+    
+    async def get(self, text: str) -> Optional[bytes]:
+        return await self.get_key(self.key(text))
+    
+    async def get_key(self, key: str) -> Optional[bytes]:
+        """Cached audio by key; never synthesizes"""
+        audio_bytes = self._memory.get(key)
+        if audio_bytes is not None:
+            self._memory.move_to_end(key)
+            return audio_bytes
+        audio_bytes = await asyncio.to_thread(self._read_disk, key)
+        if audio_bytes is not None:
+            self._remember(key, audio_bytes)
+            if self._disk_index is not None and key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return audio_bytes
+    
+    async def put(self, text: str, audio_bytes: bytes):
+        key = self.key(text)
+        self._remember(key, audio_bytes)
+        async with self._disk_lock:
+            if self._disk_index is None:
+                self._disk_index = OrderedDict(await asyncio.to_thread(self._scan_disk))
+                self._disk_size = sum(self._disk_index.values())
+            await asyncio.to_thread(self._write_disk, key, audio_bytes)
+            evicted = self._track_disk(key, len(audio_bytes))
+            if evicted:
+                await asyncio.to_thread(self._unlink_disk, evicted)
+    
+    async def get_or_synthesize(self, text: str) -> bytes:
+        """Return cached audio, synthesizing once per phrase even under concurrent misses"""
+        audio_bytes = await self.get(text)
+        if audio_bytes is not None:
+            self.hits += 1
+            return audio_bytes
         
-        await text_to_speech(
-            emergent_api_key=EMERGENT_LLM_KEY,
-            text=text,
-            output_file_path=audio_path,
-            voice="nova"
-        )
+        key = self.key(text)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
         
-        with open(audio_path, "rb") as f:
-            audio_bytes = f.read()
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio_bytes = await synthesize_speech(text)
+            future.set_result(audio_bytes)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # avoid "exception never retrieved" when nobody else waited
+            raise
+        finally:
+            del self._inflight[key]
         
-        os.unlink(audio_path)
-        return base64.b64encode(audio_bytes).decode('utf-8')
+        try:
+            await self.put(text, audio_bytes)
+        except OSError as e:
+            logger.warning(f"TTS cache write failed: {e}")
+        return audio_bytes
+
+tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MEMORY_BYTES, TTS_CACHE_DISK_BYTES)
+
+# Fixed phrases the server speaks verbatim, synthesized ahead of time
+TTS_WARM_PHRASES = [
+    AI_FALLBACK_RESPONSE,
+]
+# Spoken when a voice session opens; {company_name} is filled per tenant
+TTS_TENANT_GREETING = (
+    "Guten Tag, Sie sprechen mit dem digitalen Assistenten von {company_name}. Wie kann ich Ihnen helfen? "
+    "Hello, how can I help you?"
+)
+
+def tenant_greeting(tenant: dict) -> str:
+    return TTS_TENANT_GREETING.format(company_name=tenant["company_name"])
+
+async def warm_tts_cache():
+    """Pre-synthesize the fallback reply and per-tenant greetings"""
+    if not EMERGENT_LLM_KEY:
+        return
+    phrases = list(TTS_WARM_PHRASES)
+    async for tenant in db.tenants.find({"status": TenantStatus.APPROVED}, {"_id": 0, "company_name": 1}):
+        phrases.append(tenant_greeting(tenant))
+    
+    warmed = 0
+    for phrase in phrases:
+        try:
+            await tts_cache.get_or_synthesize(phrase)
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"TTS cache warm-up failed for phrase: {e}")
+    logger.info(f"TTS cache warmed with {warmed} phrases")
+
+async def generate_tts_bytes(text: str) -> Optional[bytes]:
+    """Generate raw TTS audio using OpenAI via Emergent"""
+    try:
+        return await tts_cache.get_or_synthesize(text)
     except Exception as e:
+        PROVIDER_ERRORS.inc(provider="tts")
         logger.error(f"TTS error: {e}")
         return None
 
+# Sentence boundary: terminal punctuation followed by whitespace
+SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+')
+
+async def stream_ai_response(transcription: str, calendar_context: str) -> AsyncIterator[str]:
+    """Stream GPT response tokens via Emergent, falling back to a single full reply"""
+    try:
+        from emergentintegrations.llm.openai import stream_chat_completion, Message
+    except ImportError:
+        ai_result = await generate_ai_response(transcription, calendar_context)
+        yield ai_result["response"]
+        return
+    
+    messages = [
+        Message(role="system", content=build_system_prompt(calendar_context)),
+        Message(role="user", content=transcription)
+    ]
+    produced = False
+    try:
+        async for delta in stream_chat_completion(
+            emergent_api_key=EMERGENT_LLM_KEY,
+            model="gpt-4o",
+            messages=messages
+        ):
+            if delta:
+                produced = True
+                yield delta
+    except Exception as e:
+        PROVIDER_ERRORS.inc(provider="llm")
+        logger.error(f"GPT streaming error: {e}")
+        if not produced:
+            yield AI_FALLBACK_RESPONSE
+
+async def split_sentences(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Regroup a token stream into complete sentences as soon as they end"""
+    buffer = ""
+    async for delta in deltas:
+        buffer += delta
+        parts = SENTENCE_END_RE.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+async def stream_voice_reply(transcription: str, calendar_context: str,
+                             timer: Optional[CallTimer] = None) -> AsyncIterator[Tuple[str, Optional[bytes]]]:
+    """Yield (sentence, audio_bytes) pairs in order while GPT is still generating.
+
+    TTS for each sentence is started as soon as the sentence is complete, so
+    synthesis of sentence N overlaps with generation of sentence N+1.
+    """
+    timer = timer or CallTimer()
+    pending: asyncio.Queue = asyncio.Queue()
+    
+    async def synthesize(sentence: str) -> Optional[bytes]:
+        with timer.stage("tts"):
+            return await generate_tts_bytes(sentence)
+    
+    async def produce():
+        try:
+            with timer.stage("llm"):
+                async for sentence in split_sentences(stream_ai_response(transcription, calendar_context)):
+                    timer.mark("first_sentence")
+                    await pending.put((sentence, asyncio.create_task(synthesize(sentence))))
+        finally:
+            await pending.put(None)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await pending.get()
+            if item is None:
+                break
+            sentence, tts_task = item
+            audio_bytes = await tts_task
+            timer.mark("first_audio")
+            yield sentence, audio_bytes
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if item is not None:
+                item[1].cancel()
+
 async def get_calendar_context(tenant_id: str) -> str:
     """Get calendar context for AI"""
     appointments = await db.appointments.find(
@@ -1230,20 +3336,273 @@ async def get_calendar_context(tenant_id: str) -> str:
     
     return context
 
-async def record_usage(tenant_id: str, user_id: str, duration_seconds: int, call_type: str = "voice_agent"):
-    """Record usage for billing"""
-    tenant = await db.tenants.find_one({"id": tenant_id}, {"_id": 0})
-    plan = None
-    if tenant and tenant.get("pricing_plan_id"):
-        plan = await db.pricing_plans.find_one({"id": tenant["pricing_plan_id"]}, {"_id": 0})
+# ============= MINUTES METERING =============
+# Prepaid ("metered") tenants hold minutes_balance. Each voice turn reserves
+# METERING_RESERVE_SECONDS up front with one conditional update on the tenant
+# document and settles the actual duration afterwards; minutes_reserved tracks
+# what is held by turns in progress. A turn only starts while the balance is
+# positive, so a tenant can overdraw by at most the turns already running.
+# Each reservation is also recorded in the tenant's minute_reservations with a
+# lease; settling removes it, and expired ones are released by the sweeper.
+
+class MinutesReservation:
+    """Minutes held for one voice turn; settle() debits actual use and returns the rest"""
+    
+    def __init__(self, tenant_id: str, minutes: float, metered: bool = True, reservation_id: Optional[str] = None):
+        self.tenant_id = tenant_id
+        self.minutes = minutes
+        self.metered = metered
+        self.id = reservation_id
+        self.settled = False
+    
+    async def settle(self, duration_seconds: float):
+        if self.settled:
+            return
+        self.settled = True
+        if not self.metered:
+            return
+        # Shielded: a cancelled request (client disconnect) must not abort the update half way
+        await asyncio.shield(settle_reservation(self.tenant_id, self.id, self.minutes, duration_seconds / 60))
+    
+    async def release(self):
+        """Give the whole reservation back (turn failed); no-op once settled"""
+        await self.settle(0)
+
+async def settle_reservation(tenant_id: str, reservation_id: str, minutes: float, used_minutes: float) -> bool:
+    """Apply a reservation once: only while it is still listed on the tenant, so settle and sweeper never both count it"""
+    result = await db.tenants.update_one(
+        {"id": tenant_id, "minute_reservations.id": reservation_id},
+        {
+            "$inc": {"minutes_balance": round(minutes - used_minutes, 4), "minutes_reserved": -minutes},
+            "$pull": {"minute_reservations": {"id": reservation_id}}
+        }
+    )
+    return result.modified_count == 1
+
+async def reserve_minutes(tenant_id: str) -> MinutesReservation:
+    """Reserve minutes for a voice turn; 402 when a prepaid tenant's balance is used up"""
+    tenant = await get_tenant_state(tenant_id)
+    if not tenant or not tenant.get("metered"):
+        return MinutesReservation(tenant_id, 0, metered=False)
+    
+    minutes = METERING_RESERVE_SECONDS / 60
+    now = datetime.now(timezone.utc)
+    reservation_id = str(uuid.uuid4())
+    reserved = await db.tenants.find_one_and_update(
+        {"id": tenant_id, "minutes_balance": {"$gt": 0}},
+        {
+            "$inc": {"minutes_balance": -minutes, "minutes_reserved": minutes},
+            "$push": {"minute_reservations": {
+                "id": reservation_id,
+                "minutes": minutes,
+                "reserved_at": now.isoformat(),
+                "lease_until": (now + timedelta(seconds=METERING_LEASE_SECONDS)).isoformat()
+            }}
+        },
+        projection={"_id": 1}
+    )
+    if reserved is None:
+        raise HTTPException(status_code=402, detail="Minutes balance exhausted. Please buy a minute package.")
+    return MinutesReservation(tenant_id, minutes, reservation_id=reservation_id)
+
+async def release_expired_reservations(now: Optional[datetime] = None) -> int:
+    """Return reservations whose turn never settled (process crash, deploy, lost client)"""
+    cutoff = (now or datetime.now(timezone.utc)).isoformat()
+    released = 0
+    async for tenant in db.tenants.find(
+        {"minute_reservations.lease_until": {"$lt": cutoff}},
+        {"_id": 0, "id": 1, "minute_reservations": 1}
+    ):
+        for reservation in tenant["minute_reservations"]:
+            if reservation["lease_until"] < cutoff and await settle_reservation(
+                tenant["id"], reservation["id"], reservation["minutes"], 0
+            ):
+                released += 1
+    if released:
+        logger.warning(f"Released {released} expired minute reservations")
+    return released
+
+async def run_reservation_sweeper():
+    """Periodically return expired minute reservations to the balance"""
+    while True:
+        try:
+            await release_expired_reservations()
+        except Exception as e:
+            logger.error(f"Minute reservation sweep failed: {e}")
+        await asyncio.sleep(METERING_SWEEP_SECONDS)
+
+class UsageWriteBuffer:
+    """Coalesces usage records into unordered insert_many batches.
+
+    A batch is written once `max_records` are buffered or `max_delay` seconds after
+    the first record arrived, whichever comes first. A record id added twice
+    while buffered is written once. With a unique id index (`unique_ids`, string
+    mode) ids are idempotency keys across batches too, and a duplicate-key error on
+    retrying an unanswered write means it was already written. Time-series
+    collections have no unique index: there an unanswered batch is looked up by id
+    before it is retried, and ids repeated across batches are not deduplicated.
+    `on_written` receives the
+    records that were actually inserted, for rollups and stats. If it fails, the
+    error is logged (never raised to the caller that triggered the flush) and the
+    records go to the idempotent `on_retry` on later flushes until it succeeds.
+    """
+    
+    def __init__(self, collection, max_records: int, max_delay: float, on_written=None, on_retry=None,
+                 unique_ids: bool = True):
+        self.collection = collection
+        self.unique_ids = unique_ids
+        self.max_records = max_records
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self.on_retry = on_retry or on_written
+        self._pending: "OrderedDict[str, dict]" = OrderedDict()
+        self._unaggregated: List[dict] = []  # written records whose on_written failed
+        self._uncertain: set = set()  # ids whose earlier write attempt ended without an answer
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self.flushes = 0
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    async def add(self, record: dict):
+        self._pending.setdefault(record["id"], record)
+        if len(self._pending) >= self.max_records:
+            await self.flush()
+        else:
+            self._schedule()
+    
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        await self.flush()
+    
+    async def flush(self):
+        async with self._flush_lock:
+            if self._unaggregated:
+                await self._retry_aggregates()
+            if not self._pending:
+                return
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self.flushes += 1
+            
+            already_written = []
+            if not self.unique_ids and any(record["id"] in self._uncertain for record in batch):
+                try:
+                    existing = await self._existing_ids([r for r in batch if r["id"] in self._uncertain])
+                except PyMongoError as e:
+                    logger.error(f"Usage buffer: checking {len(batch)} unanswered records failed, retrying: {e}")
+                    self._requeue(batch)
+                    return
+                already_written = [record for record in batch if record["id"] in existing]
+                batch = [record for record in batch if record["id"] not in existing]
+            
+            try:
+                if batch:
+                    await self.collection.insert_many(batch, ordered=False)
+                written = batch
+            except BulkWriteError as e:
+                errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+                written = []
+                for index, record in enumerate(batch):
+                    error = errors.get(index)
+                    if error is None or (error["code"] == 11000 and record["id"] in self._uncertain):
+                        written.append(record)
+                    elif error["code"] != 11000:
+                        logger.error(f"Usage buffer: could not write usage record {record['id']}: {error.get('errmsg')}")
+            except PyMongoError as e:
+                logger.error(f"Usage buffer: writing {len(batch)} records failed, retrying: {e}")
+                self._uncertain.update(record["id"] for record in batch)
+                self._requeue(batch)
+                return
+            
+            written = already_written + written
+            self._uncertain.difference_update(record["id"] for record in written)
+            if written and self.on_written is not None:
+                try:
+                    await self.on_written(written)
+                except Exception as e:
+                    logger.error(f"Usage buffer: aggregating {len(written)} written records failed, retrying: {e}")
+                    self._unaggregated.extend(written)
+                    self._schedule()
+    
+    async def _existing_ids(self, records: List[dict]) -> set:
+        """Ids of these records already in the collection, bounded by tenant and timestamp for the index"""
+        cursor = self.collection.find({
+            "tenant_id": {"$in": list({record["tenant_id"] for record in records})},
+            "timestamp": {"$gte": min(r["timestamp"] for r in records), "$lte": max(r["timestamp"] for r in records)},
+            "id": {"$in": [record["id"] for record in records]}
+        }, {"_id": 0, "id": 1})
+        return {doc["id"] async for doc in cursor}
+    
+    async def _retry_aggregates(self):
+        records, self._unaggregated = self._unaggregated, []
+        try:
+            await self.on_retry(records)
+        except Exception as e:
+            logger.error(f"Usage buffer: retrying aggregates for {len(records)} records failed: {e}")
+            self._unaggregated = records + self._unaggregated
+            self._schedule()
+    
+    def _requeue(self, records: List[dict]):
+        for record in records:
+            record.pop("_id", None)  # assigned client-side by insert_many
+            self._pending.setdefault(record["id"], record)
+        self._schedule()
+    
+    async def close(self):
+        """Write everything still buffered (shutdown)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+        if self._unaggregated:
+            logger.error(f"Usage buffer: {len(self._unaggregated)} records are missing from usage rollups; "
+                         f"run POST /api/admin/usage-rollups/rebuild")
+
+async def bump_usage_stats(records: List[dict]):
+    try:
+        await bump_platform_stats(total_seconds=sum(record["duration_seconds"] for record in records))
+    except PyMongoError as e:
+        # Rollups are what gets invoiced; platform stats drift is corrected by the reconciler
+        logger.error(f"Platform stats update for {len(records)} usage records failed: {e}")
+
+async def apply_usage_aggregates(records: List[dict]):
+    await update_usage_rollups(records)
+    await bump_usage_stats(records)
+
+async def reapply_usage_aggregates(records: List[dict]):
+    """Retry path: the $inc may have been partially applied, so recompute the affected buckets"""
+    await recompute_usage_rollups(records)
+    await bump_usage_stats(records)
+
+usage_buffer = UsageWriteBuffer(
+    usage_collection, USAGE_BUFFER_MAX_RECORDS, USAGE_BUFFER_MAX_DELAY_SECONDS,
+    on_written=apply_usage_aggregates, on_retry=reapply_usage_aggregates, unique_ids=not USAGE_TIMESERIES
+)
+
+async def record_usage(tenant_id: str, user_id: str, duration_seconds: float, call_type: str = "voice_agent",
+                       price_per_minute: Optional[float] = None, idempotency_key: Optional[str] = None):
+    """Record usage for billing.
+
+    The record is buffered and written in a batch; pass the conversation id as
+    idempotency_key so a retried turn is billed once.
+    """
+    if price_per_minute is None:
+        plan = await get_tenant_plan(tenant_id)
+        price_per_minute = plan.get("price_per_minute", 0.15) if plan else 0.15
     
-    price_per_minute = plan.get("price_per_minute", 0.15) if plan else 0.15
     cost = (duration_seconds / 60) * price_per_minute
     
-    usage_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    usage_id = idempotency_key or str(uuid.uuid4())
+    recorded_at = datetime.now(timezone.utc)
     
-    await db.usage_records.insert_one({
+    await usage_buffer.add({
         "id": usage_id,
         "tenant_id": tenant_id,
         "user_id": user_id,
@@ -1251,73 +3610,737 @@ async def record_usage(tenant_id: str, user_id: str, duration_seconds: int, call
         "duration_seconds": duration_seconds,
         "provider": "emergent",
         "cost": round(cost, 4),
-        "timestamp": now
+        "timestamp": recorded_at if USAGE_TIMESERIES else recorded_at.isoformat()
     })
 
+# ============= USAGE ROLLUPS =============
+# usage_rollups holds one document per tenant and day ("period": "day", "bucket": "YYYY-MM-DD")
+# and per tenant and month ("period": "month", "bucket": "YYYY-MM"), maintained per usage buffer flush.
+
+def usage_timestamp(value: str):
+    """An ISO timestamp in the form usage records store it: datetime in time-series mode, else the string"""
+    if not USAGE_TIMESERIES:
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def usage_day_start(day: date):
+    """Lower bound for usage timestamps on a day"""
+    return usage_timestamp(day.isoformat())
+
+def usage_bucket_expr(period: str) -> dict:
+    """Aggregation expression for the rollup bucket ("YYYY-MM-DD" or "YYYY-MM") of a usage record"""
+    if USAGE_TIMESERIES:
+        return {"$dateToString": {"date": "$timestamp", "format": "%Y-%m-%d" if period == "day" else "%Y-%m"}}
+    return {"$substrCP": ["$timestamp", 0, 10 if period == "day" else 7]}
+
+async def update_usage_rollups(records: List[dict]):
+    """Add a batch of usage records to their day and month rollups, one upsert per bucket"""
+    buckets = {}
+    for record in records:
+        timestamp = record["timestamp"]
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        for period, length in (("day", 10), ("month", 7)):
+            totals = buckets.setdefault((record["tenant_id"], period, timestamp[:length]), {"duration_seconds": 0, "calls": 0, "cost": 0})
+            totals["duration_seconds"] += record["duration_seconds"]
+            totals["calls"] += 1
+            totals["cost"] += record["cost"]
+    await db.usage_rollups.bulk_write([
+        UpdateOne({"tenant_id": tenant_id, "period": period, "bucket": bucket}, {"$inc": totals}, upsert=True)
+        for (tenant_id, period, bucket), totals in buckets.items()
+    ], ordered=False)
+
+async def get_usage_totals_by_tenant(period_start: str, period_end: str, tenant_id: Optional[str] = None) -> dict:
+    """Usage per tenant with period_start <= timestamp <= period_end (ISO strings, compared like the stored timestamps).
+
+    Whole days inside the period are read from daily rollups; only the partial
+    first and last day are aggregated from raw usage_records.
+    """
+    try:
+        start_day = date.fromisoformat(period_start[:10])
+        end_day = date.fromisoformat(period_end[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid period, expected ISO dates")
+    
+    # A day is fully covered when every timestamp on it ("YYYY-MM-DDT...") lies within the period
+    first_full = start_day if period_start <= start_day.isoformat() else start_day + timedelta(days=1)
+    last_full = end_day if period_end >= end_day.isoformat() + "\uffff" else end_day - timedelta(days=1)
+    
+    tenant_match = {"tenant_id": tenant_id} if tenant_id else {}
+    group = {"_id": "$tenant_id", "duration_seconds": {"$sum": "$duration_seconds"}}
+    totals = {}
+    
+    def accumulate(results):
+        for r in results:
+            entry = totals.setdefault(r["_id"], {"duration_seconds": 0, "calls": 0})
+            entry["duration_seconds"] += r["duration_seconds"]
+            entry["calls"] += r["calls"]
+    
+    period_start_at, period_end_at = usage_timestamp(period_start), usage_timestamp(period_end)
+    if first_full > last_full:
+        raw_match = {**tenant_match, "timestamp": {"$gte": period_start_at, "$lte": period_end_at}}
+    else:
+        rollups = await db.usage_rollups.aggregate([
+            {"$match": {
+                **tenant_match,
+                "period": "day",
+                "bucket": {"$gte": first_full.isoformat(), "$lte": last_full.isoformat()}
+            }},
+            {"$group": {**group, "calls": {"$sum": "$calls"}}}
+        ]).to_list(None)
+        accumulate(rollups)
+        raw_match = {**tenant_match, "$or": [
+            {"timestamp": {"$gte": period_start_at, "$lt": usage_day_start(first_full)}},
+            {"timestamp": {"$gte": usage_day_start(last_full + timedelta(days=1)), "$lte": period_end_at}},
+        ]}
+    
+    raw = await usage_collection.aggregate([
+        {"$match": raw_match},
+        {"$group": {**group, "calls": {"$sum": 1}}}
+    ]).to_list(None)
+    accumulate(raw)
+    return totals
+
+async def get_usage_totals(tenant_id: str, period_start: str, period_end: str) -> dict:
+    """Usage of one tenant within a period"""
+    totals = await get_usage_totals_by_tenant(period_start, period_end, tenant_id)
+    return totals.get(tenant_id, {"duration_seconds": 0, "calls": 0})
+
+def usage_rollup_pipeline(period: str, match: Optional[dict] = None) -> List[dict]:
+    """Aggregate usage records into rollup documents, replacing the matching rollups"""
+    pipeline = [{"$match": match}] if match else []
+    return pipeline + [
+        {"$group": {
+            "_id": {"tenant_id": "$tenant_id", "bucket": usage_bucket_expr(period)},
+            "duration_seconds": {"$sum": "$duration_seconds"},
+            "calls": {"$sum": 1},
+            "cost": {"$sum": "$cost"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "tenant_id": "$_id.tenant_id",
+            "period": {"$literal": period},
+            "bucket": "$_id.bucket",
+            "duration_seconds": 1,
+            "calls": 1,
+            "cost": 1
+        }},
+        {"$merge": {
+            "into": "usage_rollups",
+            "on": ["tenant_id", "period", "bucket"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }}
+    ]
+
+async def rebuild_usage_rollups():
+    """Recompute all rollups from usage records (backfill for data recorded before rollups existed)"""
+    for period in ("day", "month"):
+        await usage_collection.aggregate(usage_rollup_pipeline(period)).to_list(None)
+    logger.info(f"Usage rollups rebuilt from {usage_collection.name}")
+
+async def recompute_usage_rollups(records: List[dict]):
+    """Recompute the rollup buckets a batch of records falls into from the usage records.
+
+    Idempotent, unlike the $inc in update_usage_rollups: used when that update
+    failed and may have been partially applied.
+    """
+    buckets = set()
+    for record in records:
+        timestamp = record["timestamp"]
+        day = date.fromisoformat((timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp)[:10])
+        buckets.add((record["tenant_id"], "day", day, day + timedelta(days=1)))
+        month = day.replace(day=1)
+        buckets.add((record["tenant_id"], "month", month, (month + timedelta(days=32)).replace(day=1)))
+    for tenant_id, period, start, end in buckets:
+        match = {"tenant_id": tenant_id, "timestamp": {"$gte": usage_day_start(start), "$lt": usage_day_start(end)}}
+        await usage_collection.aggregate(usage_rollup_pipeline(period, match)).to_list(None)
+
+def reply_audio_keys(texts: List[str], audio: List[Optional[bytes]]) -> List[str]:
+    """TTS cache keys of the reply segments that were synthesized, in playback order"""
+    return [TTSCache.key(text) for text, audio_bytes in zip(texts, audio) if audio_bytes]
+
+async def save_conversation(tenant_id: str, user_id: str, transcription: str, agent_response: str,
+                            duration_seconds: float, calendar_action: Optional[dict] = None,
+                            timer: Optional[CallTimer] = None, audio_keys: Optional[List[str]] = None) -> str:
+    """Store a conversation turn and return its id.
+
+    The timer's breakdown is stored as of the insert, so it excludes the insert itself.
+    audio_keys reference the reply audio in the TTS cache for /voice/audio.
+    """
+    conv_id = str(uuid.uuid4())
+    await db.conversations.insert_one({
+        "id": conv_id,
+        "tenant_id": tenant_id,
+        "user_id": user_id,
+        "transcription": transcription,
+        "agent_response": agent_response,
+        "duration_seconds": duration_seconds,
+        "calendar_action": calendar_action,
+        "timings": timer.to_doc() if timer else None,
+        "audio_keys": audio_keys or [],
+        "created_at": datetime.now(timezone.utc).isoformat()
+    })
+    await bump_platform_stats(total_calls=1)
+    return conv_id
+
+class VoiceTurnBilling:
+    """Bills one voice turn exactly once, for the part of the reply actually delivered.
+
+    Settling the reservation, storing the conversation and recording usage run
+    as one task shielded from cancellation, so a disconnect cannot debit minutes
+    without a usage record. A turn that delivered nothing returns its reservation.
+    """
+    
+    def __init__(self, reservation: MinutesReservation, user: TokenData, transcription: str,
+                 caller_audio_seconds: Optional[float], timer: CallTimer, price_per_minute: Optional[float] = None):
+        self.reservation = reservation
+        self.user = user
+        self.transcription = transcription
+        self.caller_audio_seconds = caller_audio_seconds
+        self.timer = timer
+        self.price_per_minute = price_per_minute
+        self.sentences: List[str] = []
+        self.audio: List[Optional[bytes]] = []
+        self._task: Optional[asyncio.Future] = None
+    
+    def add(self, sentence: str, audio_bytes: Optional[bytes]):
+        self.sentences.append(sentence)
+        self.audio.append(audio_bytes)
+    
+    async def finish(self) -> Optional[Tuple[str, float]]:
+        """(conversation_id, duration_seconds), or None when nothing was delivered"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._bill() if self.sentences else self.reservation.release())
+        return await asyncio.shield(self._task)
+    
+    async def _bill(self) -> Tuple[str, float]:
+        duration_seconds = billable_seconds(self.caller_audio_seconds, self.audio)
+        with self.timer.stage("db"):
+            await self.reservation.settle(duration_seconds)
+        conv_id = await save_conversation(
+            self.user.tenant_id,
+            self.user.user_id,
+            self.transcription,
+            " ".join(self.sentences),
+            duration_seconds,
+            timer=self.timer,
+            audio_keys=reply_audio_keys(self.sentences, self.audio)
+        )
+        await record_usage(
+            self.user.tenant_id,
+            self.user.user_id,
+            duration_seconds,
+            price_per_minute=self.price_per_minute,
+            idempotency_key=conv_id
+        )
+        return conv_id, duration_seconds
+
 @api_router.post("/voice/transcribe")
 async def transcribe_voice(
     file: UploadFile = File(...),
     current_user: TokenData = Depends(require_approved_tenant)
 ):
-    """Transcribe uploaded audio file"""
+    """Transcribe uploaded audio file.
+
+    Also returns the measured recording length and a signed audio_receipt to pass
+    to /voice/process, which bills the caller audio from it.
+    """
     contents = await file.read()
-    transcription = await transcribe_audio_whisper(contents)
+    with CallTimer().stage("stt"):
+        transcription = await transcribe_audio_whisper(contents)
     
     if not transcription:
         raise HTTPException(status_code=400, detail="Could not transcribe audio")
     
-    return {"transcription": transcription}
+    seconds = caller_audio_seconds(contents)
+    return {
+        "transcription": transcription,
+        "audio_duration_seconds": seconds,
+        "audio_receipt": issue_audio_receipt(current_user.tenant_id, transcription, seconds)
+    }
 
 @api_router.post("/voice/process", response_model=VoiceProcessResponse)
 async def process_voice(
     request: VoiceProcessRequest,
     background_tasks: BackgroundTasks,
+    include_audio: bool = True,
     current_user: TokenData = Depends(require_approved_tenant)
 ):
-    """Process voice input and generate response"""
-    import time
-    start_time = time.time()
-    
-    calendar_context = await get_calendar_context(current_user.tenant_id)
-    ai_result = await generate_ai_response(request.transcription, calendar_context)
-    audio_base64 = await generate_tts_audio(ai_result["response"])
-    
-    # Calculate duration and record usage
-    duration_seconds = int(time.time() - start_time) + 5  # Add 5 seconds for audio processing
-    background_tasks.add_task(record_usage, current_user.tenant_id, current_user.user_id, duration_seconds)
+    """Process voice input and generate response.
+
+    With include_audio=false the audio is not inlined as base64; fetch the raw
+    bytes from audio_url instead.
+    """
+    timer = CallTimer()
+    with timer.stage("db"):
+        reservation = await reserve_minutes(current_user.tenant_id)
     
-    # Store conversation
-    conv_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    try:
+        with timer.stage("calendar"):
+            calendar_context = await get_calendar_context(current_user.tenant_id)
+        with timer.stage("llm"):
+            ai_result = await generate_ai_response(request.transcription, calendar_context)
+        with timer.stage("tts"):
+            # Without include_audio the audio is only kept in the TTS cache for audio_url
+            audio_bytes = await generate_tts_bytes(ai_result["response"])
+        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8') if include_audio and audio_bytes is not None else None
+        
+        caller_seconds = caller_seconds_for_turn(current_user.tenant_id, request.transcription, request.audio_receipt)
+        duration_seconds = billable_seconds(caller_seconds, [audio_bytes])
+        with timer.stage("db"):
+            await reservation.settle(duration_seconds)
+    finally:
+        await reservation.release()  # failed turns are not billed
     
-    conv_doc = {
-        "id": conv_id,
-        "tenant_id": current_user.tenant_id,
-        "user_id": current_user.user_id,
-        "transcription": request.transcription,
-        "agent_response": ai_result["response"],
-        "duration_seconds": duration_seconds,
-        "calendar_action": ai_result.get("calendar_action"),
-        "created_at": now
-    }
-    await db.conversations.insert_one(conv_doc)
+    # Store conversation and record usage
+    conv_id = await save_conversation(
+        current_user.tenant_id,
+        current_user.user_id,
+        request.transcription,
+        ai_result["response"],
+        duration_seconds,
+        ai_result.get("calendar_action"),
+        timer,
+        audio_keys=reply_audio_keys([ai_result["response"]], [audio_bytes])
+    )
+    background_tasks.add_task(
+        record_usage, current_user.tenant_id, current_user.user_id, duration_seconds, idempotency_key=conv_id
+    )
     
     return VoiceProcessResponse(
         transcription=request.transcription,
         response=ai_result["response"],
         audio_base64=audio_base64,
+        audio_url=f"/api/voice/audio/{conv_id}",
+        conversation_id=conv_id,
+        duration_seconds=duration_seconds,
+        timings=timer.to_doc(),
         calendar_action=ai_result.get("calendar_action")
     )
 
+@api_router.post("/voice/process/stream")
+async def process_voice_stream(
+    request: VoiceProcessRequest,
+    current_user: TokenData = Depends(require_approved_tenant)
+):
+    """Process voice input and stream the response sentence by sentence as NDJSON.
+
+    Each line is either {"type": "sentence", "index", "text", "audio_base64"}
+    or the final {"type": "done", "conversation_id", "response", "duration_seconds", "timings"}.
+    """
+    timer = CallTimer()
+    with timer.stage("db"):
+        reservation = await reserve_minutes(current_user.tenant_id)
+    try:
+        with timer.stage("calendar"):
+            calendar_context = await get_calendar_context(current_user.tenant_id)
+    except BaseException:
+        await reservation.release()
+        raise
+    
+    billing = VoiceTurnBilling(
+        reservation, current_user, request.transcription,
+        caller_seconds_for_turn(current_user.tenant_id, request.transcription, request.audio_receipt), timer
+    )
+    
+    async def event_stream():
+        try:
+            async with aclosing(stream_voice_reply(request.transcription, calendar_context, timer)) as replies:
+                async for sentence, audio_bytes in replies:
+                    billing.add(sentence, audio_bytes)
+                    yield json.dumps({
+                        "type": "sentence",
+                        "index": len(billing.sentences) - 1,
+                        "text": sentence,
+                        "audio_base64": base64.b64encode(audio_bytes).decode('utf-8') if audio_bytes is not None else None
+                    }) + "\n"
+        except BaseException:
+            await billing.finish()  # client went away or the provider failed: bill what was emitted
+            raise
+        
+        billed = await billing.finish()
+        if billed is None:
+            yield json.dumps({"type": "error", "status": 502, "detail": "No reply generated"}) + "\n"
+            return
+        conv_id, duration_seconds = billed
+        yield json.dumps({
+            "type": "done",
+            "conversation_id": conv_id,
+            "response": " ".join(billing.sentences),
+            "duration_seconds": duration_seconds,
+            "timings": timer.to_doc()
+        }) + "\n"
+    
+    # Also runs when the client disconnects before or during the body; billing happens once either way
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson", background=BackgroundTask(billing.finish))
+
+def parse_byte_range(range_header: str, size: int) -> Tuple[int, int]:
+    """Parse a single 'bytes=start-end' Range header into inclusive offsets"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise HTTPException(status_code=416, detail="Unsupported range", headers={"Content-Range": f"bytes */{size}"})
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            start = max(0, size - int(end_text))
+            end = size - 1
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+@api_router.get("/voice/audio/{conversation_id}")
+async def get_conversation_audio(
+    conversation_id: str,
+    request: Request,
+    current_user: TokenData = Depends(require_approved_tenant)
+):
+    """Raw audio/mpeg for a conversation reply, with HTTP Range support.
+
+    Served from the TTS cache only (the reply's MP3 segments back to back); the
+    provider is never called here, so evicted audio answers 410.
+    """
+    conv = await db.conversations.find_one(
+        {"id": conversation_id, "tenant_id": current_user.tenant_id},
+        {"_id": 0, "audio_keys": 1}
+    )
+    if not conv:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if not conv.get("audio_keys"):
+        raise HTTPException(status_code=404, detail="No audio stored for this conversation")
+    
+    segments = [await tts_cache.get_key(key) for key in conv["audio_keys"]]
+    if any(segment is None for segment in segments):
+        raise HTTPException(status_code=410, detail="Audio no longer available")
+    audio_bytes = b"".join(segments)
+    
+    size = len(audio_bytes)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=86400"}
+    range_header = request.headers.get("range")
+    if range_header:
+        start, end = parse_byte_range(range_header, size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(
+            content=bytes(memoryview(audio_bytes)[start:end + 1]),
+            status_code=206,
+            media_type="audio/mpeg",
+            headers=headers
+        )
+    
+    return Response(content=audio_bytes, media_type="audio/mpeg", headers=headers)
+
+# ============= VOICE SESSION (WebSocket) =============
+
+MAX_SESSION_AUDIO_BYTES = 25 * 1024 * 1024  # Whisper upload limit
+
+class VoiceSession:
+    """Per-call state kept in memory for the lifetime of a voice WebSocket.
+
+    Each turn runs in its own task so the socket keeps receiving while the reply
+    is spoken; a new utterance cancels the running turn (barge-in).
+    """
+    
+    def __init__(self, user: TokenData, tenant: dict, plan: Optional[dict], calendar_context: str):
+        self.user = user
+        self.tenant = tenant
+        self.plan = plan
+        self.calendar_context = calendar_context
+        self.audio = bytearray()
+        self.utterance_started = time.monotonic()
+        self.turns = 0
+        self.turn: Optional[asyncio.Task] = None
+    
+    def start_turn(self, turn):
+        self.turn = asyncio.create_task(turn)
+        self.turn.add_done_callback(self._turn_finished)
+    
+    def _turn_finished(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Voice turn failed for tenant {self.user.tenant_id}: {task.exception()!r}")
+    
+    async def cancel_turn(self) -> bool:
+        """Stop the running turn and wait for its bookkeeping; False when none was running"""
+        turn = self.turn
+        if turn is None or turn.done():
+            return False
+        turn.cancel()
+        await asyncio.gather(turn, return_exceptions=True)
+        return True
+    
+    async def answer_utterance(self, websocket: WebSocket, audio_bytes: bytes, utterance_started: float):
+        """Transcribe one buffered utterance and answer it"""
+        timer = CallTimer()
+        with timer.stage("stt"):
+            transcription = await transcribe_audio_whisper(audio_bytes) if audio_bytes else ""
+        if not transcription:
+            await websocket.send_json({"type": "error", "status": 400, "detail": "Could not transcribe audio"})
+            return
+        # Measured from the buffered audio; wall time since its first frame when the format is unknown
+        caller_seconds = caller_audio_seconds(audio_bytes) or min(
+            time.monotonic() - utterance_started, MAX_CALLER_AUDIO_SECONDS
+        )
+        await self.run_turn(websocket, transcription, caller_seconds, timer)
+    
+    async def run_turn(self, websocket: WebSocket, transcription: str, caller_audio_seconds: Optional[float] = None,
+                       timer: Optional[CallTimer] = None):
+        """Run LLM -> TTS for one caller turn, pushing sentences and audio as they are ready.
+
+        Whatever ends the reply early (barge-in, a closed socket, a provider
+        error), the sentences already sent are billed and stored before the
+        error propagates; "done" is only sent once the turn is billed.
+        """
+        timer = timer or CallTimer()
+        try:
+            with timer.stage("db"):
+                reservation = await reserve_minutes(self.user.tenant_id)
+        except HTTPException as e:
+            await websocket.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+            return
+        
+        billing = VoiceTurnBilling(
+            reservation, self.user, transcription, caller_audio_seconds, timer,
+            price_per_minute=self.plan.get("price_per_minute", 0.15) if self.plan else 0.15
+        )
+        try:
+            await websocket.send_json({"type": "transcription", "text": transcription})
+            # aclosing: an interrupted reply stops its pending LLM/TTS work right away
+            async with aclosing(stream_voice_reply(transcription, self.calendar_context, timer)) as replies:
+                async for sentence, audio_bytes in replies:
+                    billing.add(sentence, audio_bytes)
+                    await websocket.send_json({"type": "sentence", "index": len(billing.sentences) - 1, "text": sentence})
+                    if audio_bytes:
+                        await websocket.send_bytes(audio_bytes)
+        except BaseException as e:
+            if await billing.finish():
+                self.turns += 1
+            if isinstance(e, WebSocketDisconnect):
+                return
+            raise
+        
+        billed = await billing.finish()
+        if billed is None:
+            await websocket.send_json({"type": "error", "status": 502, "detail": "No reply generated"})
+            return
+        conv_id, duration_seconds = billed
+        self.turns += 1
+        await websocket.send_json({
+            "type": "done",
+            "conversation_id": conv_id,
+            "response": " ".join(billing.sentences),
+            "duration_seconds": duration_seconds,
+            "timings": timer.to_doc()
+        })
+
+async def open_voice_session(token: str) -> VoiceSession:
+    """Authenticate once and load tenant, plan and calendar context for the call"""
+    current_user = decode_access_token(token)
+    if current_user.is_super_admin:
+        raise HTTPException(status_code=403, detail="Voice sessions require a tenant account")
+    
+    tenant = await get_tenant_state(current_user.tenant_id)
+    if not tenant or tenant.get("status") != TenantStatus.APPROVED:
+        raise HTTPException(status_code=403, detail="Tenant not approved. Please wait for approval.")
+    
+    plan = await get_pricing_plan(tenant.get("pricing_plan_id"))
+    calendar_context = await get_calendar_context(current_user.tenant_id)
+    return VoiceSession(current_user, tenant, plan, calendar_context)
+
+@api_router.websocket("/voice/session")
+async def voice_session(websocket: WebSocket, token: str):
+    """Full-duplex voice session.
+
+    Authenticate with ?token=<jwt>. Binary frames are appended to the current
+    utterance; text frames are JSON control messages:
+      {"type": "end_utterance"}  transcribe buffered audio and answer
+      {"type": "text", "text"}   answer a typed transcription directly
+      {"type": "refresh_calendar"} reload calendar context
+    Messages keep being received while a reply is spoken. The first audio frame
+    of a new utterance (or a new text turn) interrupts the running reply, which
+    is acknowledged with {"type": "interrupted"}.
+    The server answers with JSON events and binary MP3 frames per sentence. The
+    "ready" event carries the tenant greeting, followed by its MP3 frame.
+    """
+    await websocket.accept()
+    try:
+        session = await open_voice_session(token)
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+        await websocket.close(code=4000 + e.status_code)
+        return
+    
+    greeting = tenant_greeting(session.tenant)
+    await websocket.send_json({"type": "ready", "tenant_id": session.user.tenant_id, "greeting": greeting})
+    greeting_audio = await generate_tts_bytes(greeting)
+    if greeting_audio:
+        await websocket.send_bytes(greeting_audio)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                if len(session.audio) + len(message["bytes"]) > MAX_SESSION_AUDIO_BYTES:
+                    session.audio.clear()
+                    await websocket.send_json({"type": "error", "status": 413, "detail": "Utterance too large"})
+                    continue
+                if not session.audio:
+                    session.utterance_started = time.monotonic()
+                    if await session.cancel_turn():
+                        await websocket.send_json({"type": "interrupted"})
+                session.audio.extend(message["bytes"])
+                continue
+            
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except ValueError:
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Invalid message"})
+                continue
+            
+            if control.get("type") == "end_utterance":
+                audio_bytes = bytes(session.audio)
+                session.audio.clear()
+                if await session.cancel_turn():
+                    await websocket.send_json({"type": "interrupted"})
+                session.start_turn(session.answer_utterance(websocket, audio_bytes, session.utterance_started))
+            elif control.get("type") == "text" and control.get("text"):
+                if await session.cancel_turn():
+                    await websocket.send_json({"type": "interrupted"})
+                session.start_turn(session.run_turn(websocket, control["text"], spoken_seconds_estimate(control["text"])))
+            elif control.get("type") == "refresh_calendar":
+                session.calendar_context = await get_calendar_context(session.user.tenant_id)
+                await websocket.send_json({"type": "calendar_refreshed"})
+            else:
+                await websocket.send_json({"type": "error", "status": 400, "detail": "Unknown message type"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.cancel_turn()
+        logger.info(f"Voice session closed for tenant {session.user.tenant_id} after {session.turns} turns")
+
 @api_router.get("/conversations", response_model=List[ConversationResponse])
-async def get_conversations(current_user: TokenData = Depends(require_approved_tenant)):
-    """Get conversation history"""
-    convs = await db.conversations.find(
-        {"tenant_id": current_user.tenant_id},
-        {"_id": 0, "audio_response_url": 0, "calendar_action": 0}
-    ).sort("created_at", -1).to_list(50)
+async def get_conversations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    current_user: TokenData = Depends(require_approved_tenant)
+):
+    """Get conversation history newest first, one page at a time"""
+    convs = await fetch_page(
+        db.conversations, {"tenant_id": current_user.tenant_id},
+        model_projection(ConversationResponse), limit, cursor, response
+    )
     return [ConversationResponse(**c) for c in convs]
 
+# ============= EXPORTS =============
+
+USAGE_EXPORT_FIELDS = ["id", "tenant_id", "user_id", "call_type", "duration_seconds", "provider", "cost", "timestamp"]
+CONVERSATION_EXPORT_FIELDS = ["id", "user_id", "transcription", "agent_response", "duration_seconds", "created_at"]
+
+def export_value(value):
+    """Datetimes (time-series usage records) are exported as ISO strings like the string-stored ones"""
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return value
+
+def csv_cell(value):
+    """Keep spreadsheet apps from evaluating user-provided text as a formula"""
+    value = export_value(value)
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+async def export_rows(cursor, fields: List[str], export_format: ExportFormat) -> AsyncIterator[str]:
+    """Serialize a Motor cursor as CSV or NDJSON, yielding ~64 KB chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == ExportFormat.CSV:
+        writer.writerow(fields)
+    
+    async for doc in cursor:
+        if export_format == ExportFormat.CSV:
+            writer.writerow([csv_cell(doc.get(field)) for field in fields])
+        else:
+            buffer.write(json.dumps({field: export_value(doc.get(field)) for field in fields}, default=str) + "\n")
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(collection, query: dict, sort: List[Tuple[str, int]], fields: List[str],
+                    export_format: ExportFormat, filename: str) -> StreamingResponse:
+    """Stream matching documents without loading the result set into memory"""
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection).sort(sort).batch_size(EXPORT_BATCH_SIZE)
+    media_type = "text/csv; charset=utf-8" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        export_rows(cursor, fields, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
+
+def time_range_query(field: str, start: Optional[str], end: Optional[str], convert=None) -> dict:
+    if not start and not end:
+        return {}
+    convert = convert or (lambda value: value)
+    bounds = {}
+    if start:
+        bounds["$gte"] = convert(start)
+    if end:
+        bounds["$lte"] = convert(end)
+    return {field: bounds}
+
+@api_router.get("/tenant/export/usage")
+async def export_tenant_usage(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    current_user: TokenData = Depends(require_approved_tenant)
+):
+    """Export the tenant's usage records as CSV or NDJSON"""
+    query = {"tenant_id": current_user.tenant_id, **time_range_query("timestamp", start, end, usage_timestamp)}
+    return export_response(usage_collection, query, [("timestamp", ASCENDING)], USAGE_EXPORT_FIELDS, format, "usage")
+
+@api_router.get("/tenant/export/conversations")
+async def export_tenant_conversations(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    current_user: TokenData = Depends(require_approved_tenant)
+):
+    """Export the tenant's conversation history as CSV or NDJSON"""
+    query = {"tenant_id": current_user.tenant_id, **time_range_query("created_at", start, end)}
+    return export_response(
+        db.conversations, query, [("created_at", ASCENDING), ("id", ASCENDING)],
+        CONVERSATION_EXPORT_FIELDS, format, "conversations"
+    )
+
+@api_router.get("/admin/export/usage")
+async def export_all_usage(
+    format: ExportFormat = ExportFormat.CSV,
+    tenant_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    current_user: TokenData = Depends(require_super_admin)
+):
+    """Export usage records across tenants, or for one tenant (Super Admin only)"""
+    query = time_range_query("timestamp", start, end, usage_timestamp)
+    if tenant_id:
+        query["tenant_id"] = tenant_id
+    return export_response(usage_collection, query, [("timestamp", ASCENDING)], USAGE_EXPORT_FIELDS, format, "usage")
+
 # ============= DASHBOARD STATS =============
 
 @api_router.get("/stats")
@@ -1326,10 +4349,12 @@ async def get_dashboard_stats(current_user: TokenData = Depends(get_current_user
     if current_user.is_super_admin:
         return await get_admin_stats(current_user)
     
-    appointments_count = await db.appointments.count_documents({"tenant_id": current_user.tenant_id})
-    conversations_count = await db.conversations.count_documents({"tenant_id": current_user.tenant_id})
-    users_count = await db.users.count_documents({"tenant_id": current_user.tenant_id})
-    calendars_count = await db.calendar_credentials.count_documents({"tenant_id": current_user.tenant_id})
+    appointments_count, conversations_count, users_count, calendars_count = await gather_queries(
+        db.appointments.count_documents({"tenant_id": current_user.tenant_id}),
+        db.conversations.count_documents({"tenant_id": current_user.tenant_id}),
+        db.users.count_documents({"tenant_id": current_user.tenant_id}),
+        db.calendar_credentials.count_documents({"tenant_id": current_user.tenant_id})
+    )
     
     return {
         "appointments": appointments_count,
@@ -1338,6 +4363,17 @@ async def get_dashboard_stats(current_user: TokenData = Depends(get_current_user
         "calendars": calendars_count
     }
 
+# Metrics endpoint (Prometheus text format)
+@api_router.get("/metrics")
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape target; requires METRICS_TOKEN as bearer token and is closed while it is unset"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="Metrics are disabled until METRICS_TOKEN is set")
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    USAGE_BUFFER_PENDING.set(len(usage_buffer))
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Root endpoint
 @api_router.get("/")
 async def root():
@@ -1353,8 +4389,24 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task_name in ("lexoffice_dispatcher", "platform_stats_reconciler", "reservation_sweeper", "loop_lag_monitor"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    running_billing_runs = list(billing_run_tasks.values())
+    for task in running_billing_runs:
+        task.cancel()
+    await asyncio.gather(*running_billing_runs, return_exceptions=True)
+    if getattr(app.state, "loop_watchdog", None) is not None:
+        await app.state.loop_watchdog.stop()
+    if lexoffice_client is not None:
+        await lexoffice_client.aclose()
+    await usage_buffer.close()
     client.close()
+    password_executor.shutdown(wait=False)
@@ -335,7 +335,15 @@ class VoiceAgentAPITester:
             data=voice_data
         )
         
-        return success1
+        success2, _ = self.run_test(
+            "Process Voice Stream (Pending)",
+            "POST",
+            "voice/process/stream",
+            403,
+            data=voice_data
+        )
+        
+        return success1 and success2
 
     def test_admin_operations(self):
         """Test Super Admin operations"""
@@ -352,6 +360,12 @@ class VoiceAgentAPITester:
         # Get pending tenants
         success3, _ = self.run_test("Get Pending Tenants", "GET", "admin/tenants?status=pending", 200, use_admin_token=True)
         
+        # Keyset pagination: page size is honored, malformed cursors are rejected
+        success_page, page = self.run_test("Get Tenants Page", "GET", "admin/tenants?limit=1", 200, use_admin_token=True)
+        success3 = success3 and success_page and len(page) <= 1
+        success_cursor, _ = self.run_test("Reject Invalid Cursor", "GET", "admin/tenants?cursor=not-a-cursor", 400, use_admin_token=True)
+        success3 = success3 and success_cursor
+        
         # Get pricing plans
         success4, _ = self.run_test("Get Pricing Plans", "GET", "admin/pricing-plans", 200, use_admin_token=True)
         
@@ -458,7 +472,13 @@ class VoiceAgentAPITester:
         # Get telephony config
         success2, _ = self.run_test("Get Telephony Config", "GET", "admin/telephony-config", 200, use_admin_token=True)
         
-        return success1 and success2
+        # Get billing runs
+        success3, _ = self.run_test("Get Billing Runs", "GET", "admin/billing-runs", 200, use_admin_token=True)
+        
+        # Streaming usage export
+        success4, _ = self.run_test("Export Usage (NDJSON)", "GET", "admin/export/usage?format=ndjson", 200, use_admin_token=True)
+        
+        return success1 and success2 and success3 and success4
 
     def run_all_tests(self):
         """Run all API tests"""
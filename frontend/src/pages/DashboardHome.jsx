@@ -104,7 +104,8 @@ const DashboardHome = () => {
 
       // Then process with AI
       const processRes = await axios.post(`${API_URL}/voice/process`, {
-        transcription: transcribedText
+        transcription: transcribedText,
+        audio_receipt: transcribeRes.data.audio_receipt
       }, {
         headers: getAuthHeaders()
       });
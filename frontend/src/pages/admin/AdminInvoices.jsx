@@ -3,6 +3,7 @@ import { useAuth } from '../../context/AuthContext';
 import { Button } from '../../components/ui/button';
 import { Card } from '../../components/ui/card';
 import { Badge } from '../../components/ui/badge';
+import { Input } from '../../components/ui/input';
 import {
   Select,
   SelectContent,
@@ -43,6 +44,8 @@ const AdminInvoices = () => {
   const { getAuthHeaders } = useAuth();
   const [invoices, setInvoices] = useState([]);
   const [tenants, setTenants] = useState([]);
+  const [tenantSearch, setTenantSearch] = useState('');
+  const [debouncedTenantSearch, setDebouncedTenantSearch] = useState('');
   const [loading, setLoading] = useState(true);
   const [generateDialogOpen, setGenerateDialogOpen] = useState(false);
   const [selectedTenant, setSelectedTenant] = useState('');
@@ -50,15 +53,14 @@ const AdminInvoices = () => {
   const [periodEnd, setPeriodEnd] = useState(new Date());
   const [generating, setGenerating] = useState(false);
   const [sendingId, setSendingId] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchData = useCallback(async () => {
     try {
-      const [invoicesRes, tenantsRes] = await Promise.all([
-        axios.get(`${API_URL}/admin/invoices`, { headers: getAuthHeaders() }),
-        axios.get(`${API_URL}/admin/tenants?status=approved`, { headers: getAuthHeaders() })
-      ]);
-      setInvoices(invoicesRes.data);
-      setTenants(tenantsRes.data);
+      const res = await axios.get(`${API_URL}/admin/invoices`, { headers: getAuthHeaders() });
+      setInvoices(res.data);
+      setNextCursor(res.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Failed to fetch data:', error);
       toast.error('Daten konnten nicht geladen werden');
@@ -71,6 +73,48 @@ const AdminInvoices = () => {
     fetchData();
   }, [fetchData]);
 
+  // Tenant choices for the dialog: one page of approved tenants matching the search
+  const fetchTenantOptions = useCallback(async () => {
+    try {
+      const params = { status: 'approved' };
+      if (debouncedTenantSearch) params.search = debouncedTenantSearch;
+      const res = await axios.get(`${API_URL}/admin/tenants`, {
+        headers: getAuthHeaders(),
+        params
+      });
+      setTenants(res.data);
+    } catch (error) {
+      console.error('Failed to fetch tenants:', error);
+      toast.error('Mandanten konnten nicht geladen werden');
+    }
+  }, [getAuthHeaders, debouncedTenantSearch]);
+
+  useEffect(() => {
+    if (generateDialogOpen) fetchTenantOptions();
+  }, [generateDialogOpen, fetchTenantOptions]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedTenantSearch(tenantSearch.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [tenantSearch]);
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API_URL}/admin/invoices`, {
+        headers: getAuthHeaders(),
+        params: { cursor: nextCursor }
+      });
+      setInvoices(prev => [...prev, ...res.data]);
+      setNextCursor(res.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Failed to fetch invoices:', error);
+      toast.error('Rechnungen konnten nicht geladen werden');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleGenerate = async () => {
     if (!selectedTenant) {
       toast.error('Bitte wählen Sie einen Mandanten');
@@ -121,11 +165,6 @@ const AdminInvoices = () => {
     return <Badge variant="outline" className={c.className}>{c.label}</Badge>;
   };
 
-  const getTenantName = (tenantId) => {
-    const tenant = tenants.find(t => t.id === tenantId);
-    return tenant?.company_name || tenantId;
-  };
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -161,6 +200,13 @@ const AdminInvoices = () => {
             <div className="space-y-4 mt-4">
               <div className="space-y-2">
                 <label className="text-sm font-medium">Mandant</label>
+                <Input
+                  placeholder="Mandant suchen..."
+                  value={tenantSearch}
+                  onChange={(e) => setTenantSearch(e.target.value)}
+                  className="bg-slate-800 border-slate-700"
+                  data-testid="invoice-tenant-search-input"
+                />
                 <Select value={selectedTenant} onValueChange={setSelectedTenant}>
                   <SelectTrigger className="bg-slate-800 border-slate-700">
                     <SelectValue placeholder="Mandant wählen" />
@@ -270,7 +316,7 @@ const AdminInvoices = () => {
                     </div>
                     <p className="text-sm text-slate-400 flex items-center gap-1">
                       <Building2 className="w-4 h-4" />
-                      {getTenantName(invoice.tenant_id)}
+                      {invoice.company_name || invoice.tenant_id}
                     </p>
                     <div className="flex items-center gap-4 mt-2 text-sm text-slate-500">
                       <span>{invoice.total_minutes?.toFixed(2)} Min</span>
@@ -308,6 +354,20 @@ const AdminInvoices = () => {
             </Card>
           ))
         )}
+        {nextCursor && (
+          <div className="flex justify-center">
+            <Button
+              variant="outline"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="bg-slate-800 border-slate-700 text-white"
+              data-testid="invoices-load-more"
+            >
+              {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+              Weitere laden
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -41,28 +41,47 @@ const AdminTenants = () => {
   const [loading, setLoading] = useState(true);
   const [statusFilter, setStatusFilter] = useState('all');
   const [searchQuery, setSearchQuery] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedTenant, setSelectedTenant] = useState(null);
   const [detailsOpen, setDetailsOpen] = useState(false);
 
-  const fetchTenants = useCallback(async () => {
+  const fetchTenants = useCallback(async (cursor = null) => {
     try {
-      const params = statusFilter !== 'all' ? `?status=${statusFilter}` : '';
-      const res = await axios.get(`${API_URL}/admin/tenants${params}`, {
-        headers: getAuthHeaders()
+      const params = {};
+      if (statusFilter !== 'all') params.status = statusFilter;
+      if (debouncedSearch) params.search = debouncedSearch;
+      if (cursor) params.cursor = cursor;
+      const res = await axios.get(`${API_URL}/admin/tenants`, {
+        headers: getAuthHeaders(),
+        params
       });
-      setTenants(res.data);
+      setTenants(prev => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Failed to fetch tenants:', error);
       toast.error('Mandanten konnten nicht geladen werden');
     } finally {
       setLoading(false);
     }
-  }, [getAuthHeaders, statusFilter]);
+  }, [getAuthHeaders, statusFilter, debouncedSearch]);
 
   useEffect(() => {
     fetchTenants();
   }, [fetchTenants]);
 
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchQuery.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    await fetchTenants(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleApprove = async (tenantId) => {
     try {
       await axios.post(`${API_URL}/admin/tenants/${tenantId}/approve`, {}, {
@@ -117,11 +136,6 @@ const AdminTenants = () => {
     return <Badge variant="outline" className={c.className}>{c.label}</Badge>;
   };
 
-  const filteredTenants = tenants.filter(t => 
-    t.company_name?.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    t.email?.toLowerCase().includes(searchQuery.toLowerCase())
-  );
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -172,13 +186,13 @@ const AdminTenants = () => {
 
       {/* Tenants List */}
       <div className="space-y-4" data-testid="tenants-list">
-        {filteredTenants.length === 0 ? (
+        {tenants.length === 0 ? (
           <Card className="p-12 bg-slate-900 border-slate-800 text-center">
             <Users className="w-12 h-12 text-slate-600 mx-auto mb-4" />
             <p className="text-slate-400">Keine Mandanten gefunden</p>
           </Card>
         ) : (
-          filteredTenants.map((tenant) => (
+          tenants.map((tenant) => (
             <Card 
               key={tenant.id}
               className="p-5 bg-slate-900 border-slate-800"
@@ -260,6 +274,20 @@ const AdminTenants = () => {
             </Card>
           ))
         )}
+        {nextCursor && (
+          <div className="flex justify-center">
+            <Button
+              variant="outline"
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="bg-slate-800 border-slate-700 text-white"
+              data-testid="tenants-load-more"
+            >
+              {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+              Weitere laden
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* Details Dialog */}
@@ -0,0 +1,38 @@
+"""Shared test setup.
+
+backend/server.py is imported with test settings; modules that need it call
+pytest.importorskip("server") and are skipped when the backend dependencies
+are not installed. The `server` fixture points the module at a scratch
+database on the MongoDB from MONGO_URL and drops it afterwards.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "buchungsbutler_test")
+os.environ.setdefault("SECRET_KEY", "test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+SCRATCH_DB = "buchungsbutler_scratch_test"
+
+@pytest.fixture
+def server(monkeypatch):
+    """server module bound to an empty scratch database; skipped when no MongoDB is reachable"""
+    pymongo = pytest.importorskip("pymongo")
+    server_module = pytest.importorskip("server")
+    probe = pymongo.MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=2000)
+    try:
+        probe.admin.command("ping")
+    except pymongo.errors.PyMongoError:
+        probe.close()
+        pytest.skip("MongoDB not reachable")
+
+    monkeypatch.setattr(server_module, "db", server_module.client[SCRATCH_DB])
+    server_module.tenant_cache.clear()
+    yield server_module
+    probe.drop_database(SCRATCH_DB)
+    probe.close()
@@ -0,0 +1,95 @@
+"""Billing runs: a restart resumes a run still leased by the crashed process, cancellation hands the lease back,
+and a tenant is invoiced at most once per period with numbers taken before a crash reused.
+
+Runs against the MongoDB from MONGO_URL (scratch database); skipped when none is reachable.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+def run_doc(run_id: str, lease_until=None) -> dict:
+    return {
+        "id": run_id, "period_start": "2026-01-01", "period_end": "2026-01-31", "status": "running",
+        "total_tenants": 0, "processed_tenants": 0, "invoices_created": 0, "last_tenant_id": None,
+        "lease_until": lease_until, "error": None, "created_at": "2026-02-01T00:00:00+00:00", "completed_at": None
+    }
+
+def usage_totals(delay: float = 0):
+    async def get_usage_totals_by_tenant(period_start, period_end):
+        await asyncio.sleep(delay)
+        return {"t1": {"duration_seconds": 600, "calls": 3}}
+    return get_usage_totals_by_tenant
+
+async def seed(server, run):
+    await server.db.tenants.insert_one({"id": "t1", "status": "approved"})
+    await server.db.billing_runs.insert_one(run)
+
+def test_resume_waits_out_the_crashed_process_lease(server, monkeypatch):
+    monkeypatch.setattr(server, "get_usage_totals_by_tenant", usage_totals())
+    # Left behind by a process that died mid-run, lease still live for a moment
+    stale_lease = (datetime.now(timezone.utc) + timedelta(seconds=1)).isoformat()
+
+    async def scenario():
+        await seed(server, run_doc("r1", stale_lease))
+        await server.resume_billing_runs()
+        await asyncio.wait_for(server.billing_run_tasks["r1"], timeout=10)
+        return await server.db.billing_runs.find_one({"id": "r1"}), await server.db.invoices.count_documents({})
+
+    run, invoices = asyncio.run(scenario())
+    assert run["status"] == "completed"
+    assert run["lease_until"] is None
+    assert invoices == 1
+
+def test_cancelled_run_releases_its_lease(server, monkeypatch):
+    monkeypatch.setattr(server, "get_usage_totals_by_tenant", usage_totals(delay=30))
+
+    async def scenario():
+        await seed(server, run_doc("r2"))
+        server.start_billing_run("r2")
+        task = server.billing_run_tasks["r2"]
+        await asyncio.sleep(0.5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        interrupted = await server.db.billing_runs.find_one({"id": "r2"})
+
+        monkeypatch.setattr(server, "get_usage_totals_by_tenant", usage_totals())
+        server.start_billing_run("r2")
+        await asyncio.wait_for(server.billing_run_tasks["r2"], timeout=5)
+        return interrupted, await server.db.billing_runs.find_one({"id": "r2"})
+
+    interrupted, finished = asyncio.run(scenario())
+    assert interrupted["status"] == "running" and interrupted["lease_until"] is None
+    assert "r2" not in server.billing_run_tasks
+    assert finished["status"] == "completed"
+
+def test_run_skips_a_tenant_invoiced_manually_for_the_period(server, monkeypatch):
+    monkeypatch.setattr(server, "get_usage_totals_by_tenant", usage_totals())
+
+    async def scenario():
+        await server.ensure_indexes()
+        await seed(server, run_doc("r3"))
+        manual = server.build_invoice_doc("t1", None, 10, "2026-01-01T00:00:00.000Z", "2026-01-31T00:00:00.000Z", "BB-2026-00001")
+        await server.db.invoices.insert_one(manual)
+        server.start_billing_run("r3")
+        await asyncio.wait_for(server.billing_run_tasks["r3"], timeout=5)
+        return await server.db.billing_runs.find_one({"id": "r3"}), await server.db.invoices.count_documents({})
+
+    run, invoices = asyncio.run(scenario())
+    assert run["status"] == "completed" and run["invoices_created"] == 0
+    assert invoices == 1
+
+def test_resumed_run_reuses_the_numbers_taken_before_the_crash(server, monkeypatch):
+    monkeypatch.setattr(server, "get_usage_totals_by_tenant", usage_totals())
+
+    async def scenario():
+        await seed(server, run_doc("r4"))
+        # The crashed process took a number but never inserted the invoice
+        held = await server.hold_invoice_numbers("r4", 1)
+        await server.resume_billing_runs()
+        await asyncio.wait_for(server.billing_run_tasks["r4"], timeout=5)
+        invoice = await server.db.invoices.find_one({"tenant_id": "t1"})
+        return held, invoice, await server.db.counters.find_one({"_id": f"invoice-{held[0][3:7]}"})
+
+    held, invoice, counter = asyncio.run(scenario())
+    assert invoice["invoice_number"] == held[0]
+    assert counter["value"] == 1 and counter["holds"] == {}
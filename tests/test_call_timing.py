@@ -0,0 +1,82 @@
+"""Billing on audio length: MP3/WebM/WAV duration, caller audio receipts, and the per-stage CallTimer."""
+
+import time
+
+import pytest
+
+pytest.importorskip("server")
+
+from server import (  # noqa: E402
+    CallTimer, billable_seconds, caller_audio_seconds, caller_seconds_for_turn, issue_audio_receipt, mp3_duration_seconds
+)
+
+def mp3_frames(header: bytes, frame_length: int, count: int) -> bytes:
+    return (header + bytes(frame_length - len(header))) * count
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of 1152 samples
+MPEG1_FRAME = bytes([0xFF, 0xFB, 0x90, 0x00])
+# MPEG-2 Layer III, 64 kbps, 24 kHz (typical TTS output): 192-byte frames of 576 samples
+MPEG2_FRAME = bytes([0xFF, 0xF3, 0x84, 0x00])
+
+def test_mpeg1_duration():
+    assert mp3_duration_seconds(mp3_frames(MPEG1_FRAME, 417, 100)) == pytest.approx(100 * 1152 / 44100)
+
+def test_mpeg2_duration_after_id3_tag():
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10)
+    assert mp3_duration_seconds(tag + mp3_frames(MPEG2_FRAME, 192, 250)) == pytest.approx(6.0)
+
+def test_missing_or_invalid_audio_is_zero():
+    assert mp3_duration_seconds(None) == 0
+    assert mp3_duration_seconds(b"not audio at all") == 0
+
+def test_billable_seconds_adds_caller_and_reply_audio():
+    reply = [mp3_frames(MPEG2_FRAME, 192, 125), None, mp3_frames(MPEG2_FRAME, 192, 125)]
+    assert billable_seconds(2.5, reply) == pytest.approx(8.5)
+    assert billable_seconds(None, []) == 0
+
+def test_call_timer_accumulates_stages():
+    timer = CallTimer()
+    for _ in range(2):
+        with timer.stage("tts"):
+            time.sleep(0.01)
+    timer.mark("first_audio")
+    timer.mark("first_audio")  # first mark wins
+    doc = timer.to_doc()
+    assert doc["stages_ms"]["tts"] >= 20
+    assert 0 < doc["marks_ms"]["first_audio"] <= doc["total_ms"]
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+def ebml(element_id: bytes, payload: bytes) -> bytes:
+    return element_id + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+def simple_block(relative_ms: int) -> bytes:
+    return ebml(b"\xa3", b"\x81" + relative_ms.to_bytes(2, "big", signed=True) + b"\x80" + bytes(20))
+
+def recorder_webm(cluster_ms=(0, 1000), frames=25) -> bytes:
+    """MediaRecorder-style output: no Duration header, unknown-size Segment and Clusters"""
+    data = ebml(b"\x1a\x45\xdf\xa3", b"\x42\x82\x84webm")
+    data += b"\x18\x53\x80\x67" + UNKNOWN_SIZE + ebml(b"\x15\x49\xa9\x66", ebml(b"\x2a\xd7\xb1", (1_000_000).to_bytes(3, "big")))
+    for timecode in cluster_ms:
+        data += b"\x1f\x43\xb6\x75" + UNKNOWN_SIZE + ebml(b"\xe7", timecode.to_bytes(2, "big"))
+        data += b"".join(simple_block(i * 20) for i in range(frames))
+    return data
+
+def test_webm_recording_duration_from_block_timecodes():
+    assert caller_audio_seconds(recorder_webm()) == pytest.approx(1.48)
+    assert caller_audio_seconds(recorder_webm()[:-5]) == pytest.approx(1.46)  # truncated upload
+
+def test_wav_duration():
+    pcm = bytes(32000)  # 1 s of 16 kHz mono 16-bit
+    fmt = (1).to_bytes(2, "little") + (1).to_bytes(2, "little") + (16000).to_bytes(4, "little") + (32000).to_bytes(4, "little") + bytes(4)
+    wav = b"RIFF" + bytes(4) + b"WAVE" + b"fmt " + len(fmt).to_bytes(4, "little") + fmt + b"data" + len(pcm).to_bytes(4, "little") + pcm
+    assert caller_audio_seconds(wav) == pytest.approx(1.0)
+
+def test_caller_seconds_come_from_a_matching_receipt_or_the_floor():
+    text = "Ich möchte morgen um zehn Uhr einen Termin"  # 8 words: 3.2 s floor
+    receipt = issue_audio_receipt("t1", text, 4.5)
+    assert caller_seconds_for_turn("t1", text, receipt) == 4.5
+    assert caller_seconds_for_turn("t1", text, None) == pytest.approx(3.2)
+    assert caller_seconds_for_turn("t2", text, receipt) == pytest.approx(3.2)  # another tenant's receipt
+    assert caller_seconds_for_turn("t1", "Ja", receipt) == pytest.approx(0.4)  # receipt for a different utterance
+    assert caller_seconds_for_turn("t1", text, "forged") == pytest.approx(3.2)
@@ -0,0 +1,61 @@
+"""export_rows streams CSV/NDJSON in bounded chunks from an async cursor."""
+
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+pytest.importorskip("server")
+
+from server import EXPORT_CHUNK_BYTES, ExportFormat, export_rows  # noqa: E402
+
+FIELDS = ["id", "transcription", "duration_seconds"]
+
+class FakeCursor:
+    """Async iterator standing in for a Motor cursor"""
+    def __init__(self, count: int):
+        self.count = count
+
+    def __aiter__(self):
+        self.index = 0
+        return self
+
+    async def __anext__(self):
+        if self.index >= self.count:
+            raise StopAsyncIteration
+        self.index += 1
+        return {"id": f"c{self.index}", "transcription": "Termin, morgen \"10 Uhr\"", "duration_seconds": self.index}
+
+def collect(cursor, export_format):
+    async def run():
+        return [chunk async for chunk in export_rows(cursor, FIELDS, export_format)]
+    return asyncio.run(run())
+
+def test_csv_has_header_and_quoted_rows():
+    chunks = collect(FakeCursor(3), ExportFormat.CSV)
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == FIELDS
+    assert rows[1] == ["c1", "Termin, morgen \"10 Uhr\"", "1"]
+    assert len(rows) == 4
+
+def test_ndjson_one_object_per_line():
+    lines = "".join(collect(FakeCursor(3), ExportFormat.NDJSON)).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["c1", "c2", "c3"]
+
+def test_large_export_is_chunked():
+    chunks = collect(FakeCursor(20000), ExportFormat.NDJSON)
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2 * EXPORT_CHUNK_BYTES for chunk in chunks)
+    assert sum(chunk.count("\n") for chunk in chunks) == 20000
+
+def test_csv_neutralizes_formulas():
+    class FormulaCursor(FakeCursor):
+        async def __anext__(self):
+            doc = await super().__anext__()
+            doc["transcription"] = "=HYPERLINK(\"x\")"
+            return doc
+
+    rows = list(csv.reader(io.StringIO("".join(collect(FormulaCursor(1), ExportFormat.CSV)))))
+    assert rows[1][1].startswith("'=")
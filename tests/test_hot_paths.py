@@ -0,0 +1,94 @@
+"""Hot paths run under LoopWatchdog: login, a voice turn, usage recording and the TTS cache never block the event loop.
+
+The MongoDB-backed cases run against the MONGO_URL scratch database and are skipped when none is reachable.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("server")
+
+from fastapi import BackgroundTasks, HTTPException  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from server import LoopWatchdog, TTSCache, TokenData  # noqa: E402
+
+# Above scheduler jitter, far below a bcrypt hash or a synchronous multi-megabyte file write
+THRESHOLD = 0.1
+AUDIO = b"x" * 4_000_000
+USER = TokenData(user_id="u1", tenant_id="t1", email="u1@praxis.de")
+
+async def without_blocking(awaitable):
+    async with LoopWatchdog(THRESHOLD) as watchdog:
+        result = await awaitable
+    assert not watchdog.blocks, watchdog.blocks[0]["stack"]
+    return result
+
+def login_request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/api/auth/login", "headers": [], "client": ("198.51.100.7", 40000)})
+
+def test_tts_cache_disk_tier_does_not_block(tmp_path):
+    cache = TTSCache(tmp_path, memory_bytes=0, disk_bytes=3 * len(AUDIO))
+
+    async def scenario():
+        for phrase in ("eins", "zwei", "drei", "vier"):  # the fourth put evicts
+            await cache.put(phrase, AUDIO)
+        return await cache.get("vier")
+
+    assert asyncio.run(without_blocking(scenario())) == AUDIO
+
+def test_login_does_not_block(server):
+    hashed = server.get_password_hash("richtig")
+    server.login_failures.clear()
+
+    async def scenario():
+        await server.db.super_admins.insert_one(
+            {"id": "a1", "email": "chef@buchungsbutler.de", "username": "chef", "hashed_password": hashed}
+        )
+        token = await server.login(server.LoginRequest(email="chef@buchungsbutler.de", password="richtig"), login_request())
+        with pytest.raises(HTTPException):
+            await server.login(server.LoginRequest(email="chef@buchungsbutler.de", password="falsch"), login_request())
+        return token
+
+    assert asyncio.run(without_blocking(scenario())).is_super_admin
+    server.login_failures.clear()
+
+@pytest.fixture
+def voice_turn(server, monkeypatch, tmp_path):
+    async def get_calendar_context(tenant_id):
+        return ""
+    async def generate_ai_response(transcription, calendar_context):
+        return {"response": "Guten Tag. Bis bald.", "calendar_action": None}
+    async def synthesize_speech(text):
+        await asyncio.sleep(0.01)
+        return AUDIO
+    monkeypatch.setattr(server, "get_calendar_context", get_calendar_context)
+    monkeypatch.setattr(server, "generate_ai_response", generate_ai_response)
+    monkeypatch.setattr(server, "synthesize_speech", synthesize_speech)
+    monkeypatch.setattr(server, "tts_cache", TTSCache(tmp_path, memory_bytes=0, disk_bytes=10 * len(AUDIO)))
+    monkeypatch.setattr(server, "usage_buffer", server.UsageWriteBuffer(
+        server.db.usage_records, 100, 0.05,
+        on_written=server.apply_usage_aggregates, on_retry=server.reapply_usage_aggregates
+    ))
+    return server
+
+def test_voice_turn_and_usage_recording_do_not_block(voice_turn):
+    server = voice_turn
+
+    async def scenario():
+        await server.db.tenants.insert_one({"id": "t1", "status": "approved", "metered": True, "minutes_balance": 10.0})
+        server.tenant_cache.clear()
+        background_tasks = BackgroundTasks()
+        response = await server.process_voice(
+            server.VoiceProcessRequest(transcription="Hallo"), background_tasks, current_user=USER
+        )
+        await background_tasks()  # record_usage
+        for _ in range(250):
+            await server.record_usage("t1", "u1", 30, price_per_minute=0.15)
+        await server.usage_buffer.flush()
+        return response
+
+    response = asyncio.run(without_blocking(scenario()))
+    assert response.audio_base64 is not None
+    assert len(voice_turn.usage_buffer) == 0
@@ -0,0 +1,138 @@
+"""Every filtered/sorted query issued by backend/server.py must be index-covered.
+
+Runs explain() against a scratch database on the MongoDB from MONGO_URL and
+fails on any COLLSCAN. Skipped when no MongoDB is reachable.
+"""
+
+import os
+
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+# Keyset continuation added by fetch_page when a cursor is passed
+KEYSET_AFTER = {"$or": [
+    {"created_at": {"$lt": "2026-01-31"}},
+    {"created_at": "2026-01-31", "id": {"$lt": "x"}},
+]}
+
+# Billing run tenant scan: billable statuses plus any tenant with usage in the period
+BILLING_RUN_TENANTS = {"$or": [
+    {"status": {"$in": ["approved", "suspended"]}},
+    {"id": {"$in": ["t1", "t2"]}},
+]}
+
+# Invoices of a billing period, including those from before billing_period was stored
+INVOICED_FOR_PERIOD = {"$or": [
+    {"billing_period": "2026-01-01/2026-01-31"},
+    {"period_start": "2026-01-01", "period_end": "2026-01-31"},
+]}
+
+# (collection, filter, sort) for every query pattern in server.py.
+# Unfiltered reads of the small config collections (pricing_plans, minute_packages) and the
+# invoice hold lookups on the handful of counters documents are omitted.
+QUERY_PATTERNS = [
+    ("super_admins", {"email": "a@example.com"}, None),
+    ("super_admins", {"id": "x"}, None),
+    ("tenants", {"id": "x"}, None),
+    ("tenants", {"email": "a@example.com"}, None),
+    ("tenants", {"status": "approved"}, None),
+    ("tenants", {"status": "pending"}, [("created_at", -1), ("id", -1)]),
+    ("tenants", {}, [("created_at", -1), ("id", -1)]),
+    ("tenants", {"$and": [{"status": "approved"}, KEYSET_AFTER]}, [("created_at", -1), ("id", -1)]),
+    ("tenants", {"$and": [{}, KEYSET_AFTER]}, [("created_at", -1), ("id", -1)]),
+    ("tenants", {"minute_reservations.lease_until": {"$lt": "2026-01-31"}}, None),
+    ("tenants", BILLING_RUN_TENANTS, [("id", 1)]),
+    ("tenants", {"$and": [BILLING_RUN_TENANTS, {"id": {"$gt": "t1"}}]}, [("id", 1)]),
+    ("tenants", {"minutes_balance": {"$gt": 0}, "metered": {"$exists": False}}, None),
+    ("users", {"email": "a@example.com"}, None),
+    ("users", {"id": "x", "tenant_id": "t"}, None),
+    ("users", {"tenant_id": "t"}, None),
+    ("pricing_plans", {"id": "x"}, None),
+    ("pricing_plans", {"id": "x", "is_active": True}, None),
+    ("pricing_plans", {"is_active": True}, None),
+    ("minute_packages", {"id": "x"}, None),
+    ("minute_packages", {"id": "x", "is_active": True}, None),
+    ("minute_packages", {"is_active": True}, None),
+    ("invoices", {"id": "x"}, None),
+    ("invoices", {}, [("created_at", -1), ("id", -1)]),
+    ("invoices", {"status": "created"}, [("created_at", -1), ("id", -1)]),
+    ("invoices", {"tenant_id": "t"}, [("created_at", -1)]),
+    ("invoices", {"tenant_id": "t"}, [("created_at", -1), ("id", -1)]),
+    ("invoices", {"$and": [{"status": "created"}, KEYSET_AFTER]}, [("created_at", -1), ("id", -1)]),
+    ("invoices", {"invoice_number": {"$gte": "BB-2026-", "$lt": "BB-2026-\uffff"}}, None),
+    ("invoices", {"invoice_number": {"$in": ["BB-2026-00001", "BB-2026-00002"]}}, None),
+    ("invoices", {"tenant_id": "t", **INVOICED_FOR_PERIOD}, None),
+    ("invoices", {"tenant_id": {"$in": ["t1", "t2"]}, **INVOICED_FOR_PERIOD}, None),
+    ("billing_runs", {"id": "r"}, None),
+    ("billing_runs", {"period_start": "2026-01-01", "period_end": "2026-01-31"}, None),
+    ("billing_runs", {"status": "running"}, None),
+    ("billing_runs", {}, [("created_at", -1)]),
+    ("usage_records", {"timestamp": {"$gte": "2026-01-01T12:00", "$lte": "2026-01-01T18:00"}}, None),
+    ("usage_records", {"tenant_id": "t", "timestamp": {"$gte": "2026-01-01", "$lte": "2026-01-31"}}, None),
+    ("usage_records", {"tenant_id": "t", "timestamp": {"$gte": "2026-01-01"}}, None),
+    ("usage_records", {"tenant_id": "t", "$or": [
+        {"timestamp": {"$gte": "2026-01-01T12:00", "$lt": "2026-01-02"}},
+        {"timestamp": {"$gte": "2026-01-31", "$lte": "2026-01-31T12:00"}},
+    ]}, None),
+    ("usage_records", {"tenant_id": "t"}, [("timestamp", 1)]),
+    ("usage_records", {"timestamp": {"$gte": "2026-01-01"}}, [("timestamp", 1)]),
+    ("usage_rollups", {"tenant_id": "t", "period": "month", "bucket": "2026-01"}, None),
+    ("usage_rollups", {"tenant_id": "t", "period": "day", "bucket": {"$gte": "2026-01-01", "$lte": "2026-01-31"}}, None),
+    ("conversations", {"tenant_id": "t"}, [("created_at", -1), ("id", -1)]),
+    ("conversations", {"$and": [{"tenant_id": "t"}, KEYSET_AFTER]}, [("created_at", -1), ("id", -1)]),
+    ("conversations", {"tenant_id": "t", "created_at": {"$gte": "2026-01-01"}}, [("created_at", 1), ("id", 1)]),
+    ("conversations", {"id": "x", "tenant_id": "t"}, None),
+    ("appointments", {"tenant_id": "t"}, [("start_time", 1)]),
+    ("appointments", {"id": "x", "tenant_id": "t"}, None),
+    ("calendar_credentials", {"tenant_id": "t"}, None),
+    ("calendar_credentials", {"id": "x", "tenant_id": "t"}, None),
+    ("system_config", {"type": "telephony"}, None),
+    ("lexoffice_outbox", {"invoice_id": "x"}, None),
+    ("lexoffice_outbox", {"status": "pending", "next_attempt_at": {"$lte": "2026-01-31"}}, [("next_attempt_at", 1)]),
+    ("lexoffice_outbox", {"status": "failed"}, [("created_at", -1)]),
+    ("lexoffice_outbox", {}, [("created_at", -1)]),
+    ("lexoffice_outbox", {"$or": [
+        {"status": "pending", "next_attempt_at": {"$lte": "2026-01-31"}},
+        {"status": "processing", "lease_until": {"$lt": "2026-01-31"}},
+    ]}, [("next_attempt_at", 1)]),
+    ("lexoffice_outbox", {"invoice_id": "x", "$or": [
+        {"status": {"$in": ["pending", "failed"]}},
+        {"status": "processing", "lease_until": {"$lt": "2026-01-31"}},
+    ]}, None),
+]
+
+@pytest.fixture(scope="module")
+def scratch_db():
+    client = pymongo.MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except pymongo.errors.PyMongoError:
+        pytest.skip("MongoDB not reachable")
+
+    from server import INDEX_REGISTRY
+
+    database = client[f"{os.environ['DB_NAME']}_index_test"]
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        database[collection_name].create_indexes(indexes)
+    yield database
+    client.drop_database(database.name)
+    client.close()
+
+def plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+@pytest.mark.parametrize("collection_name,query,sort", QUERY_PATTERNS)
+def test_query_is_index_covered(scratch_db, collection_name, query, sort):
+    cursor = scratch_db[collection_name].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = list(plan_stages(winning_plan))
+    assert "COLLSCAN" not in stages, f"{collection_name} {query} sort={sort} uses {stages}"
+    assert "SORT" not in stages, f"{collection_name} {query} sort={sort} sorts in memory: {stages}"
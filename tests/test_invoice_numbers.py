@@ -0,0 +1,41 @@
+"""Invoice numbering: the yearly counter is seeded numerically from existing invoices, and numbers
+a holder took but never used are issued again.
+
+Runs against the MongoDB from MONGO_URL (scratch database); skipped when none is reachable.
+"""
+
+import asyncio
+
+def test_counter_is_seeded_past_six_digit_numbers(server):
+    async def scenario():
+        await server.db.invoices.insert_many([
+            {"id": "a", "invoice_number": "BB-2026-99999"},
+            {"id": "b", "invoice_number": "BB-2026-100000"},
+            {"id": "c", "invoice_number": "BB-2025-100500"},
+        ])
+        await server.ensure_invoice_counter(2026)
+        return await server.db.counters.find_one({"_id": "invoice-2026"})
+
+    assert asyncio.run(scenario())["value"] == 100000
+
+def test_existing_counter_is_not_reseeded(server):
+    async def scenario():
+        await server.db.counters.insert_one({"_id": "invoice-2026", "value": 42})
+        await server.db.invoices.insert_one({"id": "a", "invoice_number": "BB-2026-00007"})
+        await server.ensure_invoice_counter(2026)
+        return await server.db.counters.find_one({"_id": "invoice-2026"})
+
+    assert asyncio.run(scenario())["value"] == 42
+
+def test_numbers_a_holder_did_not_use_are_issued_again(server):
+    async def scenario():
+        taken = await server.hold_invoice_numbers("crashed", 3)
+        await server.db.invoices.insert_one({"id": "a", "invoice_number": taken[0]})
+        # The holder died before inserting the other two
+        await server.release_invoice_numbers("crashed")
+        reissued = await server.hold_invoice_numbers("next", 3)
+        return taken, reissued, await server.db.counters.find_one({"_id": f"invoice-{taken[0][3:7]}"})
+
+    taken, reissued, counter = asyncio.run(scenario())
+    assert reissued == taken[1:] + [taken[2][:-5] + "00004"]
+    assert counter["value"] == 4 and counter["spare"] == []
@@ -0,0 +1,190 @@
+"""LexofficeClient against a local fake Lexoffice server (retries, Retry-After, throttling, pooling)."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("server")
+
+from server import LexofficeClient  # noqa: E402
+
+class FakeLexoffice(BaseHTTPRequestHandler):
+    """Replies with the scripted statuses in order, then 201"""
+    protocol_version = "HTTP/1.1"
+    script = []
+    requests = []
+    connections = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        FakeLexoffice.requests.append((self.path, self.headers.get("Authorization"), json.loads(body)))
+        FakeLexoffice.connections.add(self.client_address)
+        status = FakeLexoffice.script.pop(0) if FakeLexoffice.script else 201
+        payload = json.dumps({"id": "lex-123"} if status == 201 else {"message": "error"}).encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fake_lexoffice():
+    FakeLexoffice.script = []
+    FakeLexoffice.requests = []
+    FakeLexoffice.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLexoffice)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_retries_rate_limit_and_server_errors(fake_lexoffice):
+    FakeLexoffice.script = [429, 503]
+
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=100, backoff_base=0.01)
+        try:
+            return await client.create_invoice({"voucherDate": "2026-01-31"})
+        finally:
+            await client.aclose()
+
+    response = run(scenario())
+    assert response.status_code == 201
+    assert response.json() == {"id": "lex-123"}
+    assert len(FakeLexoffice.requests) == 3
+    assert all(path == "/v1/invoices" and auth == "Bearer key" for path, auth, _ in FakeLexoffice.requests)
+
+def test_gives_up_after_max_retries(fake_lexoffice):
+    FakeLexoffice.script = [503] * 10
+
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=100, max_retries=2, backoff_base=0.01)
+        try:
+            return await client.create_contact({"version": 0})
+        finally:
+            await client.aclose()
+
+    assert run(scenario()).status_code == 503
+    assert len(FakeLexoffice.requests) == 3
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_ambiguous_post_failures_are_not_retried(fake_lexoffice, status):
+    # The invoice may already exist in Lexoffice; a retry would create a duplicate
+    FakeLexoffice.script = [status]
+
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=100, backoff_base=0.01)
+        try:
+            return await client.create_invoice({})
+        finally:
+            await client.aclose()
+
+    assert run(scenario()).status_code == status
+    assert len(FakeLexoffice.requests) == 1
+
+def mock_client(handler, **kwargs) -> LexofficeClient:
+    return LexofficeClient("key", base_url="https://lexoffice.test/v1", rate_limit=100, backoff_base=0.001,
+                           transport=httpx.MockTransport(handler), **kwargs)
+
+def test_post_retries_only_errors_before_sending():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if len(calls) == 2:
+            raise httpx.ReadTimeout("no answer", request=request)
+        return httpx.Response(201, json={"id": "lex-1"})
+
+    async def scenario():
+        client = mock_client(handler)
+        try:
+            await client.create_invoice({})
+        finally:
+            await client.aclose()
+
+    with pytest.raises(httpx.ReadTimeout):
+        run(scenario())
+    assert calls == ["POST", "POST"]
+
+def test_get_retries_timeouts_and_server_errors():
+    responses = [httpx.ReadTimeout("slow"), httpx.Response(502), httpx.Response(200, json={})]
+
+    def handler(request):
+        outcome = responses.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def scenario():
+        client = mock_client(handler)
+        try:
+            return await client.request("GET", "/contacts")
+        finally:
+            await client.aclose()
+
+    assert run(scenario()).status_code == 200
+    assert responses == []
+
+def test_retry_after_is_capped():
+    client = mock_client(lambda request: httpx.Response(200), max_retry_after=2)
+    try:
+        assert client._backoff(0, httpx.Response(429, headers={"Retry-After": "86400"})) == 2
+        assert client._backoff(0, httpx.Response(429, headers={"Retry-After": "1"})) == 1
+    finally:
+        run(client.aclose())
+
+def test_client_errors_are_not_retried(fake_lexoffice):
+    FakeLexoffice.script = [400]
+
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=100, backoff_base=0.01)
+        try:
+            return await client.create_contact({"version": 0})
+        finally:
+            await client.aclose()
+
+    assert run(scenario()).status_code == 400
+    assert len(FakeLexoffice.requests) == 1
+
+def test_reuses_keepalive_connection(fake_lexoffice):
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=100)
+        try:
+            for _ in range(6):
+                await client.create_invoice({})
+        finally:
+            await client.aclose()
+
+    run(scenario())
+    assert len(FakeLexoffice.requests) == 6
+    assert len(FakeLexoffice.connections) == 1
+
+def test_token_bucket_spaces_requests(fake_lexoffice):
+    async def scenario():
+        client = LexofficeClient("key", base_url=fake_lexoffice, rate_limit=2)
+        try:
+            started = time.monotonic()
+            for _ in range(4):
+                await client.create_invoice({})
+            return time.monotonic() - started
+        finally:
+            await client.aclose()
+
+    # Capacity 2 allows two immediate requests, the next two wait ~0.5 s each
+    assert run(scenario()) >= 0.9
@@ -0,0 +1,67 @@
+"""Lexoffice outbox: unexpected errors end the job instead of stranding it, and inline sends respect in-flight jobs.
+
+Runs against the MongoDB from MONGO_URL (scratch database); skipped when none is reachable.
+"""
+
+import asyncio
+
+import pytest
+
+INVOICE = {"id": "i1", "tenant_id": "t1", "status": "draft"}
+TENANT = {"id": "t1", "company_name": "Praxis Nord"}
+
+async def seed(server):
+    await server.db.tenants.insert_one(dict(TENANT))
+    await server.db.invoices.insert_one(dict(INVOICE))
+    await server.enqueue_lexoffice_invoices([INVOICE])
+
+def test_unexpected_error_marks_the_job_failed(server, monkeypatch):
+    async def submit(invoice, tenant):
+        return server.build_lexoffice_contact_payload(tenant)  # tenant lacks contact fields -> KeyError
+    monkeypatch.setattr(server, "submit_invoice_to_lexoffice", submit)
+
+    async def scenario():
+        await seed(server)
+        job = await server.claim_outbox_job()
+        await server.process_outbox_job(job)
+        return await server.db.lexoffice_outbox.find_one({"invoice_id": "i1"})
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["lease_until"] is None
+    assert job["last_error"].startswith("KeyError")
+
+def test_inline_send_is_rejected_while_the_outbox_job_is_in_flight(server, monkeypatch):
+    submitted = []
+    async def submit(invoice, tenant):
+        submitted.append(invoice["id"])
+        return "lex-1"
+    monkeypatch.setattr(server, "submit_invoice_to_lexoffice", submit)
+    monkeypatch.setattr(server, "LEXOFFICE_API_KEY", "key")
+
+    async def scenario():
+        await seed(server)
+        await server.claim_outbox_job()
+        with pytest.raises(server.HTTPException) as excinfo:
+            await server.send_invoice_to_lexoffice("i1", current_user=None)
+        return excinfo.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 409
+    assert submitted == []
+
+def test_inline_send_claims_and_completes_the_outbox_job(server, monkeypatch):
+    async def submit(invoice, tenant):
+        return "lex-1"
+    monkeypatch.setattr(server, "submit_invoice_to_lexoffice", submit)
+    monkeypatch.setattr(server, "LEXOFFICE_API_KEY", "key")
+
+    async def scenario():
+        await seed(server)
+        await server.send_invoice_to_lexoffice("i1", current_user=None)
+        return await server.db.lexoffice_outbox.find_one({"invoice_id": "i1"}), await server.claim_outbox_job()
+
+    job, next_job = asyncio.run(scenario())
+    assert job["status"] == "sent"
+    assert job["lexoffice_id"] == "lex-1"
+    assert next_job is None
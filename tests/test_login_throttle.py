@@ -0,0 +1,78 @@
+"""Login throttling: per account and client IP, client IP from trusted X-Forwarded-For only;
+one bcrypt check per login attempt."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("server")
+
+from starlette.requests import Request  # noqa: E402
+
+import server  # noqa: E402
+
+ADMIN = "admin@buchungsbutler.de"
+
+def request_from(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "method": "POST", "path": "/api/auth/login", "headers": headers, "client": (peer, 40000)})
+
+@pytest.fixture(autouse=True)
+def clean_counters():
+    server.login_failures.clear()
+    yield
+    server.login_failures.clear()
+
+def fail(email: str, ip: str, times: int):
+    for _ in range(times):
+        server.record_login_failure(server.login_throttle_keys(email, ip))
+
+def test_attacker_cannot_lock_out_the_admin():
+    fail(ADMIN, "203.0.113.9", server.LOGIN_MAX_FAILURES)
+    assert server.login_throttled(server.login_throttle_keys(ADMIN, "203.0.113.9"))
+    assert not server.login_throttled(server.login_throttle_keys(ADMIN, "198.51.100.7"))
+
+def test_per_ip_limit_spans_accounts():
+    for i in range(server.LOGIN_MAX_FAILURES_PER_IP):
+        fail(f"user{i}@example.com", "203.0.113.9", 1)
+    assert server.login_throttled(server.login_throttle_keys("new@example.com", "203.0.113.9"))
+    assert not server.login_throttled(server.login_throttle_keys("new@example.com", "198.51.100.7"))
+
+def test_success_clears_account_and_ip_counters():
+    fail(ADMIN, "198.51.100.7", server.LOGIN_MAX_FAILURES - 1)
+    keys = server.login_throttle_keys(ADMIN, "198.51.100.7")
+    server.clear_login_failures(keys)
+    assert all(server.login_failures.get(key) is None for key, _ in keys)
+
+def test_failures_do_not_extend_the_window():
+    server.login_failures.increment("k")
+    expires_at = server.login_failures._entries["k"][0]
+    assert server.login_failures.increment("k") == 2
+    assert server.login_failures._entries["k"][0] == expires_at
+
+def test_client_ip_from_trusted_proxy_only():
+    # Behind the ingress: the hop the proxy appended is the client, earlier entries are client-controlled
+    assert server.client_ip(request_from("10.1.2.3", "1.2.3.4, 203.0.113.9")) == "203.0.113.9"
+    assert server.client_ip(request_from("10.1.2.3", "203.0.113.9, 10.0.0.8")) == "203.0.113.9"
+    assert server.client_ip(request_from("10.1.2.3")) == "10.1.2.3"
+    # Direct connection: a forged header is ignored
+    assert server.client_ip(request_from("198.51.100.7", "1.2.3.4")) == "198.51.100.7"
+
+def test_wrong_password_is_checked_against_one_principal_only(monkeypatch):
+    HTTPException = pytest.importorskip("fastapi").HTTPException
+    checked = []
+    async def find_login_principals(email):
+        return [
+            {"principal": "super_admin", "id": "a1", "email": email, "hashed_password": "admin-hash"},
+            {"principal": "user", "id": "u1", "email": email, "hashed_password": "user-hash"},
+        ]
+    async def verify_password_async(plain_password, hashed_password):
+        checked.append(hashed_password)
+        return False
+    monkeypatch.setattr(server, "find_login_principals", find_login_principals)
+    monkeypatch.setattr(server, "verify_password_async", verify_password_async)
+
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(server.login(server.LoginRequest(email=ADMIN, password="falsch"), request_from("198.51.100.7")))
+    assert rejected.value.status_code == 401
+    assert checked == ["admin-hash"]
@@ -0,0 +1,46 @@
+"""LoopWatchdog: blocking calls on the event loop are reported with their stack, awaited work is not."""
+
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+pytest.importorskip("server")
+
+from server import EVENT_LOOP_BLOCKS, LoopWatchdog  # noqa: E402
+
+THRESHOLD = 0.05
+
+def slow_sync_hash(data: bytes) -> bytes:
+    """Stands in for bcrypt or a file write called directly from a coroutine"""
+    time.sleep(0.3)
+    return hashlib.sha256(data).digest()
+
+def test_blocking_call_is_reported_with_its_stack():
+    async def handler():
+        await asyncio.sleep(THRESHOLD)
+        slow_sync_hash(b"secret")
+        await asyncio.sleep(THRESHOLD)
+
+    async def scenario():
+        async with LoopWatchdog(THRESHOLD) as watchdog:
+            await handler()
+        return list(watchdog.blocks)
+
+    blocks = asyncio.run(scenario())
+    assert len(blocks) == 1
+    assert blocks[0]["location"].startswith("test_loop_watchdog.py:")
+    assert blocks[0]["location"].endswith("slow_sync_hash")
+    assert "slow_sync_hash(b\"secret\")" in blocks[0]["stack"]
+    assert blocks[0]["stalled_seconds"] > THRESHOLD
+    assert any("slow_sync_hash" in line for line in EVENT_LOOP_BLOCKS.samples())
+
+def test_offloaded_and_awaited_work_is_not_reported():
+    async def scenario():
+        async with LoopWatchdog(THRESHOLD) as watchdog:
+            await asyncio.to_thread(slow_sync_hash, b"secret")
+            await asyncio.gather(*(asyncio.sleep(0.1) for _ in range(50)))
+        return list(watchdog.blocks)
+
+    assert asyncio.run(scenario()) == []
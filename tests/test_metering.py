@@ -0,0 +1,63 @@
+"""Minutes metering: concurrent reservations never overdraw past running turns, settlement debits actual use.
+
+Runs against the MongoDB from MONGO_URL (scratch database); skipped when none is reachable.
+"""
+
+import asyncio
+
+import pytest
+
+def test_reservations_and_settlement(server):
+    from fastapi import HTTPException
+
+    async def scenario():
+        tenants = server.db.tenants
+        await tenants.insert_one({"id": "prepaid", "status": "approved", "metered": True, "minutes_balance": 3.0})
+        await tenants.insert_one({"id": "postpaid", "status": "approved", "minutes_balance": 0})
+        server.tenant_cache.clear()
+
+        # Unmetered tenants are never blocked or debited
+        unmetered = await server.reserve_minutes("postpaid")
+        await unmetered.settle(600)
+
+        # 3 minutes with 2-minute reservations: the first two turns start, the third is rejected
+        results = await asyncio.gather(*(server.reserve_minutes("prepaid") for _ in range(3)), return_exceptions=True)
+        reservations = [r for r in results if isinstance(r, server.MinutesReservation)]
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(reservations) == 2 and [r.status_code for r in rejected] == [402]
+
+        await reservations[0].settle(30)  # half a minute used
+        await reservations[1].release()   # failed turn
+        await reservations[1].settle(60)  # no-op after release
+
+        tenant = await tenants.find_one({"id": "prepaid"})
+        postpaid = await tenants.find_one({"id": "postpaid"})
+        return tenant, postpaid
+
+    tenant, postpaid = asyncio.run(scenario())
+    assert tenant["minutes_balance"] == pytest.approx(2.5)
+    assert tenant["minutes_reserved"] == pytest.approx(0)
+    assert postpaid["minutes_balance"] == 0
+
+def test_expired_reservations_are_released(server):
+    from datetime import datetime, timedelta, timezone
+
+    async def scenario():
+        tenants = server.db.tenants
+        await tenants.insert_one({"id": "crashed", "status": "approved", "metered": True, "minutes_balance": 5.0})
+        server.tenant_cache.clear()
+
+        abandoned = await server.reserve_minutes("crashed")  # never settled: the process "crashed"
+        running = await server.reserve_minutes("crashed")
+        assert await server.release_expired_reservations() == 0  # leases still valid
+
+        later = datetime.now(timezone.utc) + timedelta(seconds=server.METERING_LEASE_SECONDS + 1)
+        assert await server.release_expired_reservations(later) == 2
+        await running.settle(60)  # already returned by the sweeper: not applied twice
+        assert abandoned.id != running.id
+        return await tenants.find_one({"id": "crashed"})
+
+    tenant = asyncio.run(scenario())
+    assert tenant["minutes_balance"] == pytest.approx(5.0)
+    assert tenant["minutes_reserved"] == pytest.approx(0)
+    assert tenant["minute_reservations"] == []
@@ -0,0 +1,84 @@
+"""Metrics collectors: Prometheus text exposition, cumulative histogram buckets, per-observation overhead,
+the loop lag sampler and the token-guarded scrape endpoint."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("server")
+
+import server  # noqa: E402
+from server import METRICS_REGISTRY, Counter, Histogram, render_metrics  # noqa: E402
+
+@pytest.fixture
+def registry():
+    """Drop metrics created by a test from the global registry afterwards"""
+    before = list(METRICS_REGISTRY)
+    yield
+    METRICS_REGISTRY[:] = before
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("test_latency_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="llm")
+
+    lines = histogram.samples()
+    assert 'test_latency_seconds_bucket{stage="llm",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="llm",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="llm"} 4' in lines
+    assert any(line.startswith('test_latency_seconds_sum{stage="llm"} 3.65') for line in lines)
+
+def test_render_includes_help_type_and_escaped_labels(registry):
+    counter = Counter("test_errors_total", "Test errors", ("provider",))
+    counter.inc(provider='lex"office\n')
+    counter.inc(2, provider='lex"office\n')
+
+    text = render_metrics()
+    assert "# HELP test_errors_total Test errors\n# TYPE test_errors_total counter\n" in text
+    assert 'test_errors_total{provider="lex\\"office\\n"} 3\n' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert text.endswith("\n")
+
+def test_observe_overhead_is_microseconds(registry):
+    histogram = Histogram("test_overhead_seconds", "Overhead", ("endpoint",))
+    iterations = 2000
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for i in range(iterations):
+            histogram.observe(0.02, endpoint="/api/voice/process")
+        timings.append((time.perf_counter() - started) / iterations)
+    # A few microseconds per call; the best of five runs against a 100x margin keeps a loaded CI host from failing it
+    assert min(timings) < 500e-6
+
+def test_loop_lag_is_sampled_without_the_watchdog(registry, monkeypatch):
+    lag = Histogram("test_loop_lag_seconds", "Loop lag", buckets=(0.1,))
+    monkeypatch.setattr(server, "EVENT_LOOP_LAG_SECONDS", lag)
+
+    async def scenario():
+        monitor = asyncio.create_task(server.run_loop_lag_monitor(0.01))
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # blocks the loop
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+
+    asyncio.run(scenario())
+    lines = lag.samples()
+    within = next(int(line.split()[-1]) for line in lines if 'le="0.1"' in line)
+    total = next(int(line.split()[-1]) for line in lines if 'le="+Inf"' in line)
+    assert total - within >= 1
+
+def test_metrics_endpoint_is_closed_without_a_token(monkeypatch):
+    HTTPException = pytest.importorskip("fastapi").HTTPException
+    monkeypatch.setattr(server, "METRICS_TOKEN", None)
+    with pytest.raises(HTTPException) as unset:
+        asyncio.run(server.get_metrics(authorization=None))
+    assert unset.value.status_code == 403
+
+    monkeypatch.setattr(server, "METRICS_TOKEN", "geheim")
+    with pytest.raises(HTTPException) as wrong:
+        asyncio.run(server.get_metrics(authorization="Bearer falsch"))
+    assert wrong.value.status_code == 401
+    assert asyncio.run(server.get_metrics(authorization="Bearer geheim")).status_code == 200
@@ -0,0 +1,41 @@
+"""gather_queries: independent queries are all in flight at once, up to the fan-out limit.
+
+Concurrency is asserted on the peak number of queries in flight, not on wall-clock time."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("server")
+
+from server import gather_queries  # noqa: E402
+
+QUERY_SECONDS = 0.1
+
+async def fake_count(value: int, in_flight: list) -> int:
+    """Stands in for a count_documents round trip"""
+    in_flight[0] += 1
+    in_flight[1] = max(in_flight[1], in_flight[0])
+    await asyncio.sleep(QUERY_SECONDS)
+    in_flight[0] -= 1
+    return value
+
+def test_dashboard_counts_run_concurrently():
+    in_flight = [0, 0]
+    result = asyncio.run(gather_queries(*(fake_count(n, in_flight) for n in range(4))))
+    assert result == [0, 1, 2, 3]
+    # Sequential awaits never had more than one query in flight
+    assert in_flight == [0, 4]
+
+def test_fan_out_is_bounded_per_call():
+    in_flight = [0, 0]
+    result = asyncio.run(gather_queries(*(fake_count(n, in_flight) for n in range(6)), limit=2))
+    assert result == list(range(6))
+    assert in_flight == [0, 2]
+
+def test_errors_propagate():
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(gather_queries(fake_count(1, [0, 0]), failing()))
@@ -0,0 +1,55 @@
+"""Verified-token cache: revoking a tenant or user rejects its earlier tokens even after they leave the cache."""
+
+import time
+
+import pytest
+
+pytest.importorskip("server")
+
+from fastapi import HTTPException  # noqa: E402
+
+import server  # noqa: E402
+
+def token_for(user_id: str, tenant_id: str) -> str:
+    return server.create_access_token({"sub": user_id, "tenant_id": tenant_id, "email": f"{user_id}@praxis.de"})
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(server, "token_cache", server.VerifiedTokenCache(100, 3600))
+
+def test_decoded_tokens_are_served_from_cache():
+    token = token_for("u1", "t1")
+    first = server.decode_access_token(token)
+    assert server.token_cache.get(token) is first
+    assert server.decode_access_token(token) is first
+
+def test_revoked_tenant_token_is_not_re_admitted_on_decode():
+    token = token_for("u1", "t1")
+    server.decode_access_token(token)
+    server.token_cache.revoke_tenant("t1")
+
+    assert server.token_cache.get(token) is None
+    with pytest.raises(HTTPException) as excinfo:
+        server.decode_access_token(token)
+    assert excinfo.value.status_code == 401
+
+def test_revoked_user_token_is_rejected_but_others_are_not():
+    revoked, other = token_for("u1", "t1"), token_for("u2", "t1")
+    server.token_cache.revoke_user("u1")
+
+    with pytest.raises(HTTPException):
+        server.decode_access_token(revoked)
+    assert server.decode_access_token(other).user_id == "u2"
+
+def test_tokens_issued_after_revocation_are_accepted():
+    server.token_cache.revoke_tenant("t1")
+    time.sleep(0.01)
+    assert server.decode_access_token(token_for("u1", "t1")).tenant_id == "t1"
+
+def test_old_revocations_are_forgotten_after_a_token_lifetime(monkeypatch):
+    cache = server.VerifiedTokenCache(100, token_lifetime_seconds=60)
+    cache.revoke_user("u1")
+    now = time.time()
+    monkeypatch.setattr(server.time, "time", lambda: now + 120)
+    cache.revoke_user("u2")
+    assert set(cache._revoked_before) == {"user:u2"}
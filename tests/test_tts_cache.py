@@ -0,0 +1,68 @@
+"""TTS disk cache: size-bounded eviction from the in-memory index, oldest files first,
+and conversation audio served from the cache without calling the provider."""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("server")
+
+from fastapi import HTTPException  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from server import TTSCache, TokenData  # noqa: E402
+
+USER = TokenData(user_id="u1", tenant_id="t1", email="u1@praxis.de")
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    cache = TTSCache(tmp_path, memory_bytes=0, disk_bytes=250)
+
+    async def scenario():
+        for phrase in ("eins", "zwei"):
+            await cache.put(phrase, b"x" * 100)
+        assert await cache.get("eins") is not None  # now more recent than "zwei"
+        await cache.put("drei", b"x" * 100)
+
+    asyncio.run(scenario())
+    assert cache._path(TTSCache.key("eins")).exists()
+    assert not cache._path(TTSCache.key("zwei")).exists()
+    assert cache._path(TTSCache.key("drei")).exists()
+    assert cache._disk_size == 200
+
+def test_existing_files_are_indexed_once_by_age(tmp_path):
+    seeded = TTSCache(tmp_path, memory_bytes=0, disk_bytes=10_000)
+    asyncio.run(seeded.put("alt", b"x" * 100))
+    old = seeded._path(TTSCache.key("alt"))
+    os.utime(old, (1, 1))
+
+    cache = TTSCache(tmp_path, memory_bytes=0, disk_bytes=150)
+    asyncio.run(cache.put("neu", b"x" * 100))
+    assert not old.exists()
+    assert list(cache._disk_index) == [TTSCache.key("neu")]
+
+def audio_request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/voice/audio/c1", "headers": []})
+
+def test_conversation_audio_is_read_from_the_cache_only(server, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "tts_cache", TTSCache(tmp_path, memory_bytes=10_000, disk_bytes=10_000))
+    async def synthesize_speech(text):
+        raise AssertionError("the audio endpoint must not call the TTS provider")
+    monkeypatch.setattr(server, "synthesize_speech", synthesize_speech)
+
+    async def scenario():
+        await server.tts_cache.put("Guten Tag.", b"one")
+        await server.tts_cache.put("Bis bald.", b"two")
+        keys = server.reply_audio_keys(["Guten Tag.", "Bis bald.", "Stumm."], [b"one", b"two", None])
+        conv_id = await server.save_conversation("t1", "u1", "Hallo", "Guten Tag. Bis bald.", 4, audio_keys=keys)
+        response = await server.get_conversation_audio(conv_id, audio_request(), current_user=USER)
+
+        server.tts_cache._memory.clear()
+        server.tts_cache._unlink_disk([TTSCache.key("Bis bald.")])
+        with pytest.raises(HTTPException) as excinfo:
+            await server.get_conversation_audio(conv_id, audio_request(), current_user=USER)
+        return response, excinfo.value
+
+    response, expired = asyncio.run(scenario())
+    assert response.body == b"onetwo"
+    assert expired.status_code == 410
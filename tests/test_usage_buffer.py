@@ -0,0 +1,174 @@
+"""UsageWriteBuffer: size/time flushing, idempotency keys, retries (with and without a unique id index) and the shutdown flush."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("server")
+
+from pymongo.errors import AutoReconnect, BulkWriteError  # noqa: E402
+from server import UsageWriteBuffer  # noqa: E402
+
+class FakeUsageCollection:
+    """insert_many with a unique index on id; optionally fails the next call"""
+    def __init__(self):
+        self.docs = {}
+        self.calls = 0
+        self.fail_next = None
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        if self.fail_next == "network":
+            self.fail_next = None
+            self.docs.update((doc["id"], doc) for doc in docs[:1])  # partially applied
+            raise AutoReconnect("connection reset")
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc["id"] in self.docs:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.docs[doc["id"]] = doc
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+class FakeTimeseriesCollection:
+    """Time-series collection: no unique index, so inserting an id again duplicates it"""
+    def __init__(self):
+        self.docs = []
+        self.fail_next = False
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(dict(doc) for doc in docs)
+        if self.fail_next:
+            self.fail_next = False
+            raise AutoReconnect("connection reset after the write was applied")
+
+    def find(self, query, projection=None):
+        ids = set(query["id"]["$in"])
+        matches = [{"id": doc["id"]} for doc in self.docs if doc["id"] in ids]
+
+        async def cursor():
+            for doc in matches:
+                yield doc
+        return cursor()
+
+def record(record_id, seconds=60):
+    return {"id": record_id, "tenant_id": "t1", "duration_seconds": seconds, "cost": 0.15, "timestamp": "2026-01-01T10:00:00"}
+
+def make_buffer(collection, written, max_records=3, max_delay=0.05):
+    async def on_written(records):
+        written.extend(r["id"] for r in records)
+    return UsageWriteBuffer(collection, max_records, max_delay, on_written=on_written)
+
+def test_flushes_on_size_in_one_insert():
+    collection, written = FakeUsageCollection(), []
+
+    async def scenario():
+        buffer = make_buffer(collection, written, max_delay=60)
+        for i in range(3):
+            await buffer.add(record(f"u{i}"))
+        return len(buffer)
+
+    assert asyncio.run(scenario()) == 0
+    assert collection.calls == 1
+    assert written == ["u0", "u1", "u2"]
+
+def test_flushes_after_delay():
+    collection, written = FakeUsageCollection(), []
+
+    async def scenario():
+        buffer = make_buffer(collection, written)
+        await buffer.add(record("u1"))
+        assert collection.calls == 0
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert written == ["u1"]
+
+def test_idempotency_key_is_billed_once():
+    collection, written = FakeUsageCollection(), []
+
+    async def scenario():
+        buffer = make_buffer(collection, written)
+        await buffer.add(record("conv-1"))
+        await buffer.add(record("conv-1"))  # same turn within one batch
+        await buffer.flush()
+        await buffer.add(record("conv-1"))  # retried after it was written
+        await buffer.add(record("conv-2"))
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert written == ["conv-1", "conv-2"]
+    assert sorted(collection.docs) == ["conv-1", "conv-2"]
+
+def test_network_error_retries_without_losing_or_double_counting():
+    collection, written = FakeUsageCollection(), []
+    collection.fail_next = "network"
+
+    async def scenario():
+        buffer = make_buffer(collection, written)
+        await buffer.add(record("u1"))
+        await buffer.add(record("u2"))
+        await buffer.flush()
+        assert written == []
+        assert len(buffer) == 2
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert sorted(written) == ["u1", "u2"]
+    assert sorted(collection.docs) == ["u1", "u2"]
+
+def test_close_flushes_pending_records():
+    collection, written = FakeUsageCollection(), []
+
+    async def scenario():
+        buffer = make_buffer(collection, written, max_delay=60)
+        await buffer.add(record("u1"))
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert written == ["u1"]
+
+def test_aggregate_failure_does_not_reach_the_caller_and_is_retried():
+    collection, written, retried = FakeUsageCollection(), [], []
+    failures = [RuntimeError("rollup bulk_write timed out")]
+
+    async def on_written(records):
+        if failures:
+            raise failures.pop()
+        written.extend(r["id"] for r in records)
+
+    async def on_retry(records):
+        retried.extend(r["id"] for r in records)
+
+    async def scenario():
+        buffer = UsageWriteBuffer(collection, 2, 0.05, on_written=on_written, on_retry=on_retry)
+        await buffer.add(record("u1"))
+        await buffer.add(record("u2"))  # size flush in the caller's request: must not raise
+        await asyncio.sleep(0.1)  # retried by the timer
+        await buffer.add(record("u3"))
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert sorted(collection.docs) == ["u1", "u2", "u3"]
+    assert retried == ["u1", "u2"]
+    assert written == ["u3"]
+
+def test_timeseries_retry_does_not_insert_a_written_batch_again():
+    collection, written = FakeTimeseriesCollection(), []
+    collection.fail_next = True
+
+    async def on_written(records):
+        written.extend(r["id"] for r in records)
+
+    async def scenario():
+        buffer = UsageWriteBuffer(collection, 3, 0.05, on_written=on_written, unique_ids=False)
+        await buffer.add(record("u1"))
+        await buffer.add(record("u2"))
+        await buffer.flush()
+        await buffer.add(record("u3"))
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert sorted(doc["id"] for doc in collection.docs) == ["u1", "u2", "u3"]
+    assert sorted(written) == ["u1", "u2", "u3"]
@@ -0,0 +1,133 @@
+"""Voice session turns run as tasks: a new utterance cancels the running reply (barge-in),
+and every way a reply can end bills what was already sent."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("server")
+
+from fastapi import WebSocketDisconnect  # noqa: E402
+
+import server  # noqa: E402
+from server import TokenData, VoiceSession  # noqa: E402
+
+class FakeWebSocket:
+    def __init__(self, log=None, disconnect_on=None):
+        self.events = []
+        self.log = log if log is not None else []
+        self.disconnect_on = disconnect_on
+
+    async def send_json(self, data):
+        if data["type"] == self.disconnect_on:
+            raise WebSocketDisconnect(1001)
+        self.events.append(data)
+        self.log.append(data["type"])
+
+    async def send_bytes(self, data):
+        self.events.append(data)
+
+class FakeReservation:
+    def __init__(self):
+        self.settled = None
+
+    async def settle(self, duration_seconds):
+        if self.settled is None:
+            self.settled = duration_seconds
+
+    async def release(self):
+        await self.settle(0)
+
+@pytest.fixture
+def turn_env(monkeypatch):
+    env = {"reservation": FakeReservation(), "usage": [], "saved": [], "log": [], "pause": 30}
+
+    async def reserve_minutes(tenant_id):
+        return env["reservation"]
+
+    async def stream_voice_reply(transcription, calendar_context, timer=None):
+        yield "Gern, einen Moment.", None
+        if "first_sentence_sent" in env:
+            env["first_sentence_sent"].set()
+        try:
+            await asyncio.sleep(env["pause"])  # the rest of the reply is still being generated
+            yield "Ihr Termin ist am Montag.", None
+        except asyncio.CancelledError:
+            env["generation_cancelled"] = True
+            raise
+
+    async def save_conversation(tenant_id, user_id, transcription, response, duration_seconds, **kwargs):
+        env["saved"].append(response)
+        return "c1"
+
+    async def record_usage(tenant_id, user_id, duration_seconds, **kwargs):
+        env["usage"].append(duration_seconds)
+        env["log"].append("usage")
+
+    monkeypatch.setattr(server, "reserve_minutes", reserve_minutes)
+    monkeypatch.setattr(server, "stream_voice_reply", stream_voice_reply)
+    monkeypatch.setattr(server, "save_conversation", save_conversation)
+    monkeypatch.setattr(server, "record_usage", record_usage)
+    return env
+
+def new_session() -> VoiceSession:
+    user = TokenData(user_id="u1", tenant_id="t1", email="u1@praxis.de")
+    return VoiceSession(user, {"company_name": "Praxis Nord"}, None, "")
+
+def test_new_utterance_interrupts_the_running_reply(turn_env):
+    websocket = FakeWebSocket()
+    session = new_session()
+
+    async def scenario():
+        turn_env["first_sentence_sent"] = asyncio.Event()
+        session.start_turn(session.run_turn(websocket, "Wann ist mein Termin?", 2.0))
+        await asyncio.wait_for(turn_env["first_sentence_sent"].wait(), timeout=5)
+        return await session.cancel_turn()
+
+    assert asyncio.run(scenario()) is True
+    assert turn_env.get("generation_cancelled") is True
+    # Only what the caller actually heard is stored and billed; no "done" for the interrupted turn
+    assert turn_env["saved"] == ["Gern, einen Moment."]
+    assert turn_env["usage"] == [2.0]
+    assert turn_env["reservation"].settled == 2.0
+    assert [e["type"] for e in websocket.events if isinstance(e, dict)] == ["transcription", "sentence"]
+
+def test_cancel_without_a_running_turn_is_a_no_op():
+    assert asyncio.run(new_session().cancel_turn()) is False
+
+def test_disconnect_mid_reply_bills_the_sentences_sent(turn_env):
+    websocket = FakeWebSocket(disconnect_on="sentence")
+    asyncio.run(new_session().run_turn(websocket, "Wann ist mein Termin?", 2.0))
+
+    assert turn_env["saved"] == ["Gern, einen Moment."]
+    assert turn_env["usage"] == [2.0]
+    assert turn_env["reservation"].settled == 2.0
+
+def test_usage_is_recorded_before_done_is_sent(turn_env):
+    turn_env["pause"] = 0
+    websocket = FakeWebSocket(log=turn_env["log"])
+    asyncio.run(new_session().run_turn(websocket, "Wann ist mein Termin?", 2.0))
+
+    assert turn_env["saved"] == ["Gern, einen Moment. Ihr Termin ist am Montag."]
+    assert turn_env["log"] == ["transcription", "sentence", "sentence", "usage", "done"]
+
+def test_stream_client_disconnect_bills_the_emitted_sentences_once(turn_env, monkeypatch):
+    async def get_calendar_context(tenant_id):
+        return ""
+    monkeypatch.setattr(server, "get_calendar_context", get_calendar_context)
+    user = TokenData(user_id="u1", tenant_id="t1", email="u1@praxis.de")
+    request = server.VoiceProcessRequest(transcription="Wann ist mein Termin?")
+
+    async def scenario():
+        response = await server.process_voice_stream(request, current_user=user)
+        body = response.body_iterator
+        first = await body.__anext__()
+        await body.aclose()  # client went away while the reply was still being generated
+        await response.background()
+        return first
+
+    first = asyncio.run(scenario())
+    assert '"Gern, einen Moment."' in first
+    assert turn_env["saved"] == ["Gern, einen Moment."]
+    assert len(turn_env["usage"]) == 1
+    assert turn_env["reservation"].settled == turn_env["usage"][0]